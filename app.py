@@ -5,13 +5,42 @@ A Flask microservice that scrapes UK government data using the pdpy library.
 
 from __future__ import annotations
 
+import contextlib
+import contextvars
+import gc
+import hashlib
+import itertools
+import json
 import logging
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import FIRST_EXCEPTION, Executor, ThreadPoolExecutor, wait
+from contextvars import ContextVar
 from datetime import datetime, timezone
+from functools import partial
+from http import HTTPStatus
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, NamedTuple
 
+import numpy as np
 import pandas as pd
 from flask import Flask, jsonify, request
+from werkzeug.http import parse_etags, quote_etag
+
+from cache import FileCache, SingleFlight, TTLCache
+from config import get_config
+from intervals import IntervalIndex
+from pagination import InvalidPageError, Page, paginate
+from persons import PersonModel
+from scheduler import RefreshScheduler
+from serialization import FastJSONProvider
+from snapshot import Snapshot, SnapshotHolder, SnapshotStore, content_hash
+from views import InvalidFieldsError, TableView, decode_categories, encode_categories, project
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Mapping
 
 # Import pdpy modules for scraping UK parliamentary data
 try:
@@ -23,6 +52,8 @@ except ImportError as e:
     print("Make sure pdpy is installed: pip install pdpy")
 
 app = Flask(__name__)
+settings = get_config(os.environ.get("FLASK_CONFIG"))
+app.json = FastJSONProvider(app, backend=settings.JSON_BACKEND)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -32,195 +63,880 @@ logger = logging.getLogger(__name__)
 DataDict = dict[str, Any]
 FileList = list[str]
 
+# Content type of newline-delimited JSON responses (format=ndjson)
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+# pdpy fetch functions holding the full membership history behind each house's member table
+MEMBERSHIP_FETCHES = {
+    "fetch_mps": "fetch_commons_memberships",
+    "fetch_lords": "fetch_lords_memberships",
+}
+
+# Start and end date columns of each pdpy table with time-bound rows
+TABLE_DATE_COLUMNS = {
+    "fetch_commons_memberships": ("seat_incumbency_start_date", "seat_incumbency_end_date"),
+    "fetch_lords_memberships": ("seat_incumbency_start_date", "seat_incumbency_end_date"),
+    "fetch_mps_government_roles": ("government_incumbency_start_date", "government_incumbency_end_date"),
+    "fetch_lords_government_roles": ("government_incumbency_start_date", "government_incumbency_end_date"),
+    "fetch_mps_committee_memberships": ("committee_membership_start_date", "committee_membership_end_date"),
+    "fetch_lords_committee_memberships": ("committee_membership_start_date", "committee_membership_end_date"),
+}
+
+# pdpy tables behind each dataset combined by scrape_all_data, refreshed together by the scheduler
+DATASET_TABLES = {
+    "mps": ("fetch_mps", "fetch_commons_memberships"),
+    "lords": ("fetch_lords", "fetch_lords_memberships"),
+    "government_roles": ("fetch_mps_government_roles", "fetch_lords_government_roles"),
+    "committees": ("fetch_mps_committee_memberships", "fetch_lords_committee_memberships"),
+}
+
+# Section (and key within it) of the all-data payload holding each table's rows
+NORMALIZED_SECTIONS = {
+    "fetch_mps": ("members_of_parliament", None),
+    "fetch_lords": ("house_of_lords", None),
+    "fetch_mps_government_roles": ("government_roles", "mps_government_roles"),
+    "fetch_lords_government_roles": ("government_roles", "lords_government_roles"),
+    "fetch_mps_committee_memberships": ("committee_memberships", "mps_committee_memberships"),
+    "fetch_lords_committee_memberships": ("committee_memberships", "lords_committee_memberships"),
+}
+
+# Section and key of each table's rows in a person profile; member tables first, as the person model expects
+PROFILE_SECTIONS = {
+    "fetch_mps": ("commons", "member"),
+    "fetch_lords": ("lords", "member"),
+    "fetch_commons_memberships": ("commons", "memberships"),
+    "fetch_lords_memberships": ("lords", "memberships"),
+    "fetch_mps_government_roles": ("government_roles", "commons"),
+    "fetch_lords_government_roles": ("government_roles", "lords"),
+    "fetch_mps_committee_memberships": ("committee_memberships", "commons"),
+    "fetch_lords_committee_memberships": ("committee_memberships", "lords"),
+}
+
+# Prefix of the person_id URIs in pdpy tables; /person/ also accepts ids without it
+PERSON_ID_PREFIX = "https://id.parliament.uk/"
+
+# (age in seconds, "HIT" | "STALE" | "MISS") for each cache lookup made by the current request
+_cache_lookups: ContextVar[list[tuple[float, str]] | None] = ContextVar("cache_lookups", default=None)
+
+
+def _record_cache_lookup(age: float, state: str) -> None:
+    """Remember a cache lookup so the response can report its age and staleness."""
+    lookups = _cache_lookups.get()
+    if lookups is not None:
+        lookups.append((age, state))
+
+
+# (table name, content hash) for each snapshot table entry the current request's response was built from
+_tables_read: ContextVar[list[tuple[str, str | None]] | None] = ContextVar("tables_read", default=None)
+
+
+def _record_table_read(name: str, digest: str | None) -> None:
+    """Remember a table entry a response is built from, so its ETag can name that entry's contents."""
+    tables_read = _tables_read.get()
+    if tables_read is not None:
+        tables_read.append((name, digest))
+
+
+class RequestReads(NamedTuple):
+    """What a request's response was built from, for its Age, X-Cache and ETag headers.
+
+    Attributes:
+        lookups: (age in seconds, "HIT" | "STALE" | "MISS") for each cache lookup
+        tables: (table name, content hash) for each snapshot table entry read
+    """
+
+    lookups: list[tuple[float, str]]
+    tables: list[tuple[str, str | None]]
+
+
+@contextlib.contextmanager
+def track_reads() -> Iterator[RequestReads]:
+    """Collect the cache lookups made, and table entries read, within the block."""
+    reads = RequestReads([], [])
+    lookups_token = _cache_lookups.set(reads.lookups)
+    tables_token = _tables_read.set(reads.tables)
+    try:
+        yield reads
+    finally:
+        _tables_read.reset(tables_token)
+        _cache_lookups.reset(lookups_token)
+
+
+def record_reads(reads: RequestReads) -> None:
+    """Record reads collected elsewhere, e.g. by a pool job, as made by the current request."""
+    for age, state in reads.lookups:
+        _record_cache_lookup(age, state)
+    for name, digest in reads.tables:
+        _record_table_read(name, digest)
+
 
 class UKGovernmentScraper:
     """Main scraper class for UK government data."""
 
-    def __init__(self) -> None:
-        """Initialize the scraper with empty cache."""
-        self.cache: dict[str, Any] = {}
-        self.last_updated: datetime | None = None
+    def __init__(self, cache_timeout: int | None = None, cache_max_bytes: int | None = None,
+                 cache_max_stale: int | None = None, shared_cache: FileCache | None = None,
+                 snapshot_store: SnapshotStore | None = None) -> None:
+        """Initialize the scraper with empty cache.
+
+        Args:
+            cache_timeout: Seconds each cache entry stays fresh (defaults to CACHE_TIMEOUT)
+            cache_max_bytes: Size budget for the cache in bytes (defaults to CACHE_MAX_BYTES)
+            cache_max_stale: Seconds a stale entry is still served while it is refreshed
+                (defaults to CACHE_MAX_STALE)
+            shared_cache: Cache of fetched tables shared with other processes (defaults to
+                one in SHARED_CACHE_DIR, or none if that is unset)
+            snapshot_store: Where fetched tables are persisted for restore_tables (defaults to
+                SNAPSHOT_DIR, or none if that is unset)
+        """
+        self.soft_ttl = settings.CACHE_TIMEOUT if cache_timeout is None else cache_timeout
+        max_stale = settings.CACHE_MAX_STALE if cache_max_stale is None else cache_max_stale
+        self.cache = TTLCache(
+            ttl=self.soft_ttl + max_stale,
+            max_bytes=settings.CACHE_MAX_BYTES if cache_max_bytes is None else cache_max_bytes,
+        )
+        if shared_cache is None and settings.SHARED_CACHE_DIR:
+            try:
+                shared_cache = FileCache(settings.SHARED_CACHE_DIR, ttl=self.cache.ttl)
+            except PermissionError:
+                logger.exception("Not sharing fetched tables through %s", settings.SHARED_CACHE_DIR)
+        self.shared_cache = shared_cache
+        if snapshot_store is None and settings.SNAPSHOT_DIR:
+            snapshot_store = SnapshotStore(settings.SNAPSHOT_DIR)
+        self.snapshot_store = snapshot_store
+        self._snapshots = SnapshotHolder()
+        self._versions = itertools.count(1)
+        # Whether stale tables are refreshed by this process; off in workers whose
+        # snapshot is refreshed elsewhere and inherited by fork
+        self.refresh_stale = True
+        # Seconds taken by the most recent upstream call of each pdpy fetch function
+        self.fetch_durations: dict[str, float] = {}
+        # Wall-clock fetch time of the copy of each table last saved to the snapshot store
+        self._persisted: dict[str, float] = {}
+        self._start_workers()
+
+    def _start_workers(self) -> None:
+        """Create the thread pools and the locks coordinating them."""
+        self.inflight = SingleFlight()
+        self._refreshing: set[str] = set()
+        self._refresh_lock = threading.Lock()
+        self._refresh_executor = ThreadPoolExecutor(
+            max_workers=settings.CACHE_REFRESH_WORKERS, thread_name_prefix="cache-refresh",
+        )
+        # Table fetches and whole-dataset scrapes run on separate pools, so a scrape
+        # waiting on its tables never holds a worker those tables need
+        self._fetch_executor = ThreadPoolExecutor(
+            max_workers=settings.FETCH_WORKERS, thread_name_prefix="upstream-fetch",
+        )
+        self._scrape_executor = ThreadPoolExecutor(
+            max_workers=len(DATASET_TABLES), thread_name_prefix="dataset-scrape",
+        )
+
+    def after_fork(self, refresh_stale: bool = False) -> None:
+        """Prepare a forked child process to use this scraper.
+
+        Threads do not survive fork, so the pools (and any lock a parent thread
+        held at fork time, including the caches') are replaced. The inherited
+        snapshot is kept as is, sharing its memory with the parent copy-on-write.
+
+        Args:
+            refresh_stale: Whether this process should refresh stale tables itself
+        """
+        self._snapshots = SnapshotHolder(self._snapshots.current)
+        self.cache.after_fork()
+        if self.shared_cache is not None:
+            self.shared_cache.after_fork()
+        self.refresh_stale = refresh_stale
+        self._start_workers()
+
+    def refresh_all(self, jobs: Mapping[str, Callable[[], Any]]) -> dict[str, Any]:
+        """Run per-dataset refresh jobs concurrently and return their results by dataset name.
+
+        The jobs run on the pool whole-dataset scrapes use, which has a worker for
+        every dataset; if one raises, the jobs not yet started are cancelled and
+        its error is raised.
+        """
+        return self._fan_out(self._scrape_executor, dict(jobs))
+
+    def _fan_out(self, executor: Executor, calls: dict[str, Callable[[], Any]]) -> dict[str, Any]:
+        """Run calls concurrently on executor and return their results by name.
+
+        The caller's context (and with it the request's cache tracking) is carried
+        into each call. If any call fails, calls that have not started yet are
+        cancelled and the first error is raised without waiting for the rest.
+        """
+        futures = {
+            executor.submit(contextvars.copy_context().run, call): name
+            for name, call in calls.items()
+        }
+        done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in done:
+            error = future.exception()
+            if error is not None:
+                for other in pending:
+                    other.cancel()
+                raise error
+        return {name: future.result() for future, name in futures.items()}
+
+    @property
+    def snapshot(self) -> Snapshot:
+        """The current immutable snapshot of fetched tables and the last full scrape."""
+        return self._snapshots.current
+
+    @property
+    def last_updated(self) -> datetime | None:
+        """When the last full scrape finished, or None."""
+        return self._snapshots.current.last_updated
+
+    def _live_table(self, snapshot: Snapshot, fetch_name: str) -> Mapping[str, Any] | None:
+        """Return a snapshot's entry for a table unless it is past the hard TTL.
+
+        Entries past the soft TTL are still returned immediately, and a single
+        background refresh is scheduled to replace them.
+        """
+        entry = snapshot.tables.get(fetch_name)
+        if entry is None:
+            return None
+        age = time.monotonic() - entry["stored_at"]
+        if age >= self.cache.ttl:
+            return None
+
+        stale = age >= self.soft_ttl
+        if stale and self.refresh_stale:
+            self._schedule_refresh(fetch_name)
+        _record_cache_lookup(age, "STALE" if stale else "HIT")
+        return entry
+
+    def _schedule_refresh(self, fetch_name: str) -> None:
+        """Refresh a table in the background unless a refresh is already queued."""
+        with self._refresh_lock:
+            if fetch_name in self._refreshing:
+                return
+            self._refreshing.add(fetch_name)
+        self._refresh_executor.submit(self._refresh_table, fetch_name)
+
+    def _refresh_table(self, fetch_name: str) -> None:
+        """Reload a table, keeping the stale data if the reload fails."""
+        try:
+            self.refresh_tables([fetch_name])
+        except Exception:
+            logger.exception("Background refresh failed for %s", fetch_name)
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(fetch_name)
+
+    def _store_data(self, cache_key: str, data: Any, **extra: Any) -> DataDict:
+        """Store data in the cache together with its scrape timestamp and a new version."""
+        entry = {
+            "data": data,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "version": next(self._versions),
+            **extra,
+        }
+        self.cache[cache_key] = entry
+        return entry
+
+    def _publish_tables(self, tables: dict[str, Any],
+                        fetched_at: Mapping[str, float] | None = None) -> Mapping[str, Mapping[str, Any]]:
+        """Publish fetched tables in one snapshot swap and return their entries.
+
+        Args:
+            tables: Table data by pdpy fetch function name
+            fetched_at: Wall-clock time each table was fetched upstream, if earlier
+                than now (e.g. when taken from the shared cache)
+        """
+        now, monotonic_now = time.time(), time.monotonic()
+        entries = {}
+        for name, data in tables.items():
+            fetched = min(now, (fetched_at or {}).get(name, now))
+            entries[name] = {
+                "data": data,
+                "timestamp": datetime.fromtimestamp(fetched, timezone.utc).isoformat(),
+                "version": next(self._versions),
+                "fetched_at": fetched,
+                # Age from the upstream fetch, so entries from the shared cache expire on time
+                "stored_at": monotonic_now - (now - fetched),
+                "content_hash": content_hash(data),
+            }
+        return self._snapshots.publish(lambda snapshot: snapshot.with_tables(entries)).tables
+
+    def _cached_view(self, cache_key: str, fetch_names: list[str], build: Callable[..., Any],
+                     params: Any = None) -> Any:
+        """Return data derived from cached tables, rebuilding it when any table is refreshed.
+
+        The view is stored under cache_key and reused while its source tables keep
+        the same versions and it was built for the same params. Lookups never wait
+        for the cache lock; only storing a rebuilt view does.
+        """
+        tables = self._table_entries(fetch_names)
+        sources = (tuple(table["version"] for table in tables), params)
+        view = self.cache.peek(cache_key)
+        if view is not None and view.get("sources") == sources:
+            return view["data"]
+
+        data = build(*(table["data"] for table in tables))
+        self._store_data(cache_key, data, sources=sources)
+        return data
+
+    def _date_kwargs(self, current: bool, from_date: str | None, to_date: str | None,
+                     on_date: str | None) -> dict[str, str]:
+        """Build normalized pdpy date filter kwargs for member queries."""
+        kwargs = {}
+
+        # Handle date filtering parameters - they can be combined
+        if from_date:
+            kwargs["from_date"] = from_date
+        if to_date:
+            kwargs["to_date"] = to_date
+        if on_date:
+            kwargs["on_date"] = on_date
+
+        # If current=True and no on_date is specified, use today's date
+        # Note: current=True with on_date specified will use the specified on_date
+        if current and not on_date:
+            kwargs["on_date"] = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        return kwargs
+
+    def _table_entries(self, fetch_names: list[str]) -> list[Mapping[str, Any]]:
+        """Return the entries holding the full, unfiltered tables from pdpy fetch functions.
+
+        Cached tables are all read from one snapshot, so a view never mixes tables
+        from before and after a refresh. Missing tables are fetched concurrently,
+        sharing identical in-flight upstream calls, and each is published before
+        its flight ends.
+        """
+        snapshot = self._snapshots.current
+        entries = {name: self._live_table(snapshot, name) for name in fetch_names}
+        missing = [name for name, entry in entries.items() if entry is None]
+        if missing:
+            for _ in missing:
+                _record_cache_lookup(0.0, "MISS")
+            entries.update(self._publish_fetched(self._fetch_tables(missing, publish=True)))
+        for name in fetch_names:
+            _record_table_read(name, entries[name].get("content_hash"))
+        return [entries[name] for name in fetch_names]
+
+    def _fetch_tables(self, fetch_names: list[str] | tuple[str, ...],
+                      newer_than: Mapping[str, float] | None = None, *,
+                      publish: bool = False) -> dict[str, tuple[Any, float]]:
+        """Load tables, concurrently when there are several.
+
+        Args:
+            fetch_names: pdpy fetch function names
+            newer_than: Only reuse a shared copy of a table fetched after this wall-clock time
+            publish: Publish each missing table inside its flight, so a caller that
+                found it missing just before it was published cannot fetch it again
+
+        Returns:
+            (data, wall-clock fetch time) by pdpy fetch function name
+        """
+        calls = {
+            name: partial(self.inflight.do, name, partial(self._load_and_publish, name) if publish
+                          else partial(self._load_table, name, (newer_than or {}).get(name)))
+            for name in fetch_names
+        }
+        if len(calls) == 1:
+            return {name: call() for name, call in calls.items()}
+        return self._fan_out(self._fetch_executor, calls)
+
+    def _load_table(self, fetch_name: str, newer_than: float | None = None) -> tuple[Any, float]:
+        """Fetch a table upstream, or take it from the shared cache if another process has.
+
+        Args:
+            fetch_name: pdpy fetch function name
+            newer_than: Only reuse a shared copy fetched after this wall-clock time
+
+        Returns:
+            (data, wall-clock fetch time)
+        """
+        if self.shared_cache is None:
+            return self._fetch_encoded(fetch_name), time.time()
+        return self.shared_cache.do(fetch_name, partial(self._fetch_encoded, fetch_name), newer_than=newer_than)
+
+    def _load_and_publish(self, fetch_name: str) -> tuple[Any, float]:
+        """Load a missing table and publish it, unless a flight that ended meanwhile has.
+
+        Returns:
+            (data, wall-clock fetch time)
+        """
+        entry = self._snapshots.current.tables.get(fetch_name)
+        if entry is not None and time.monotonic() - entry["stored_at"] < self.cache.ttl:
+            return entry["data"], entry["fetched_at"]
+        fetched = {fetch_name: self._load_table(fetch_name)}
+        self._publish_fetched(fetched)
+        return fetched[fetch_name]
+
+    def _fetch_encoded(self, fetch_name: str) -> Any:
+        """Fetch a table upstream and dictionary-encode its repetitive string columns."""
+        return encode_categories(self._timed_fetch(fetch_name), exclude=TABLE_DATE_COLUMNS.get(fetch_name, ()))
+
+    def _publish_fetched(self, fetched: dict[str, tuple[Any, float]]) -> Mapping[str, Mapping[str, Any]]:
+        """Publish tables returned by _fetch_tables, then persist them.
+
+        Tables that are already in the current snapshot keep their entries, and
+        with them their versions and the views built on them.
+        """
+        current = self._snapshots.current.tables
+        fetched = {name: table for name, table in fetched.items()
+                   if name not in current or current[name]["data"] is not table[0]}
+        if not fetched:
+            return current
+        entries = self._publish_tables(
+            {name: data for name, (data, _) in fetched.items()},
+            {name: fetched_at for name, (_, fetched_at) in fetched.items()},
+        )
+        self._persist_tables(fetched)
+        return entries
+
+    def _persist_tables(self, fetched: dict[str, tuple[Any, float]]) -> None:
+        """Save newly fetched tables to the snapshot store; failures are logged, not raised."""
+        if self.snapshot_store is None:
+            return
+        for name, (data, fetched_at) in fetched.items():
+            if self._persisted.get(name) == fetched_at:
+                continue
+            try:
+                self.snapshot_store.save(name, data, fetched_at)
+                self._persisted[name] = fetched_at
+            except Exception:
+                logger.exception("Failed to persist %s", name)
+
+    def restore_tables(self) -> list[str]:
+        """Publish the tables saved in the snapshot store, skipping any past the hard TTL.
+
+        Returns:
+            Names of the restored tables
+        """
+        if self.snapshot_store is None:
+            return []
+        started = time.perf_counter()
+        try:
+            saved = self.snapshot_store.load()
+        except Exception:
+            logger.exception("Failed to load persisted snapshot")
+            return []
+
+        now = time.time()
+        live = {
+            name: (encode_categories(data, exclude=TABLE_DATE_COLUMNS.get(name, ())), fetched_at)
+            for name, (data, fetched_at) in saved.items() if now - fetched_at < self.cache.ttl
+        }
+        if live:
+            self._publish_tables(
+                {name: data for name, (data, _) in live.items()},
+                {name: fetched_at for name, (_, fetched_at) in live.items()},
+            )
+            self._persisted.update({name: fetched_at for name, (_, fetched_at) in live.items()})
+        logger.info("Restored %d persisted tables in %.3fs", len(live), time.perf_counter() - started)
+        return sorted(live)
+
+    def content_etag(self, dataset: str, params: Mapping[str, str],
+                     tables_read: list[tuple[str, str | None]] | None = None) -> str | None:
+        """Return the ETag of a dataset endpoint's response, from its tables' content hashes.
+
+        Each of the dataset's tables contributes the hash of the entry the response
+        read, or, for tables it did not read, of the current snapshot's entry (or
+        that none is loaded). Before a response is built, every table is taken
+        from the snapshot, so a conditional request is answered without
+        scraping or serializing; this has no side effects, scheduling no
+        refresh and recording no cache lookup.
+
+        Args:
+            dataset: Name of the dataset in DATASET_TABLES
+            params: The request's query parameters
+            tables_read: (table name, content hash) of the entries the response was built from
+
+        Returns:
+            The unquoted ETag, or None if none of the dataset's tables is loaded, one
+            of them could not be hashed, or the response read two versions of one
+        """
+        read: dict[str, str | None] = {}
+        for name, digest in tables_read or ():
+            if read.setdefault(name, digest) != digest:
+                return None
+        tables, now = self._snapshots.current.tables, time.monotonic()
+        hashes = []
+        for name in DATASET_TABLES[dataset]:
+            if name in read:
+                digest = read[name]
+            else:
+                entry = tables.get(name)
+                if entry is None or now - entry["stored_at"] >= self.cache.ttl:
+                    hashes.append([name, None])
+                    continue
+                digest = entry.get("content_hash")
+            if digest is None:
+                return None
+            hashes.append([name, digest])
+        if all(digest is None for _, digest in hashes):
+            return None
+        # current=true filters by today's date, so the same query can select other rows tomorrow
+        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        key = json.dumps([dataset, sorted(params.items()), today, hashes])
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+    def revalidate(self, dataset: str) -> None:
+        """Schedule a background refresh of each of a dataset's tables that is past the soft TTL.
+
+        A conditional request answered from content_etag alone never reads its
+        tables, so it would otherwise keep getting 304 for stale data until the
+        hard TTL.
+
+        Args:
+            dataset: Name of the dataset in DATASET_TABLES
+        """
+        if not self.refresh_stale:
+            return
+        tables, now = self._snapshots.current.tables, time.monotonic()
+        for name in DATASET_TABLES[dataset]:
+            entry = tables.get(name)
+            if entry is not None and self.soft_ttl <= now - entry["stored_at"] < self.cache.ttl:
+                self._schedule_refresh(name)
+
+    def fresh_tables(self, fetch_names: tuple[str, ...] | list[str], max_age: float | None = None) -> bool:
+        """Return whether every named table is in the snapshot and younger than max_age.
+
+        Args:
+            fetch_names: pdpy fetch function names
+            max_age: Age limit in seconds (defaults to the soft TTL)
+        """
+        max_age = self.soft_ttl if max_age is None else max_age
+        tables = self._snapshots.current.tables
+        return all(
+            name in tables and time.monotonic() - tables[name]["stored_at"] < max_age
+            for name in fetch_names
+        )
+
+    def _timed_fetch(self, fetch_name: str) -> Any:
+        """Call a pdpy fetch function, recording how long the upstream call took."""
+        started = time.perf_counter()
+        try:
+            return getattr(pdpy, fetch_name)()
+        finally:
+            elapsed = time.perf_counter() - started
+            self.fetch_durations[fetch_name] = elapsed
+            logger.info("Fetched %s in %.2fs", fetch_name, elapsed)
+
+    def refresh_tables(self, fetch_names: tuple[str, ...] | list[str]) -> None:
+        """Fetch tables from upstream and publish them in one snapshot swap.
+
+        All tables are fetched before any is published, so a failed fetch leaves
+        every cached table untouched. A table another process refreshed since
+        this one last loaded it is taken from the shared cache instead.
+        """
+        tables = self._snapshots.current.tables
+        held = {name: tables[name]["fetched_at"] for name in fetch_names if name in tables}
+        self._publish_fetched(self._fetch_tables(fetch_names, newer_than=held))
+        self._rebuild_person_model()
+
+    def _rebuild_person_model(self) -> None:
+        """Rebuild the person model after a refresh, once every table it reads is loaded.
+
+        Failures are logged; the model is then rebuilt by the next lookup instead.
+        """
+        if not all(name in self._snapshots.current.tables for name in PROFILE_SECTIONS):
+            return
+        try:
+            self.person_model()
+        except Exception:
+            logger.exception("Failed to rebuild the person model")
+
+    def _interval_index(self, fetch_name: str, table: pd.DataFrame) -> IntervalIndex:
+        """Return the interval index over a table's date columns, built once per fetched table."""
+        cache_key = f"interval_index_{fetch_name}"
+        view = self.cache.peek(cache_key)
+        if view is not None and view["table"]() is table:
+            return view["data"]
+
+        index = IntervalIndex.from_frame(table, *TABLE_DATE_COLUMNS[fetch_name])
+        self._store_data(cache_key, index, table=weakref.ref(table))
+        return index
+
+    def _rows_in_window(self, fetch_name: str, table: pd.DataFrame,
+                        window: tuple[str | None, str | None]) -> TableView:
+        """Return a view of the rows of a time-bound table whose period overlaps the date window (inclusive)."""
+        if table.empty:
+            return TableView(table)
+        return TableView(table, self._interval_index(fetch_name, table).overlapping(*window))
+
+    def _date_window(self, current: bool, from_date: str | None, to_date: str | None,
+                     on_date: str | None) -> tuple[str | None, str | None] | None:
+        """Resolve member query parameters to a (from, to) date window, or None if unfiltered."""
+        kwargs = self._date_kwargs(current, from_date, to_date, on_date)
+
+        # As in pdpy, on_date takes priority over from_date and to_date
+        window = (kwargs.get("on_date", kwargs.get("from_date")), kwargs.get("on_date", kwargs.get("to_date")))
+        return window if any(window) else None
+
+    def _members_in_window(self, fetch_name: str, members: pd.DataFrame, memberships: pd.DataFrame,
+                           window: tuple[str | None, str | None]) -> TableView:
+        """Return a view of the members holding a seat at some point within the date window."""
+        if memberships.empty:
+            return TableView(members, np.empty(0, dtype=np.intp))
+        matching = self._rows_in_window(MEMBERSHIP_FETCHES[fetch_name], memberships, window)
+        return TableView(members).where(members["person_id"].isin(matching.column("person_id")))
+
+    def _member_view(self, fetch_name: str, cache_key: str, current: bool, from_date: str | None,
+                     to_date: str | None, on_date: str | None) -> TableView | Any:
+        """Answer a member query locally from the house's full member and membership tables."""
+        window = self._date_window(current, from_date, to_date, on_date)
+        if window is None:
+            return self._as_view(self._table_entries([fetch_name])[0]["data"])
+        return self._cached_view(
+            cache_key,
+            [fetch_name, MEMBERSHIP_FETCHES[fetch_name]],
+            lambda members, memberships: self._members_in_window(fetch_name, members, memberships, window),
+            params=window,
+        )
+
+    def _as_view(self, data: Any) -> TableView | Any:
+        """Wrap a DataFrame in a view of all its rows; return anything else unchanged."""
+        return TableView(data) if isinstance(data, pd.DataFrame) else data
 
     def _convert_to_dict(self, data: Any) -> list[dict[str, Any]] | Any:
-        """Convert pandas DataFrame to dict if possible, otherwise return as-is."""
+        """Convert a TableView or pandas DataFrame to row dicts if possible, otherwise return as-is.
+
+        Views are cached as row positions into the snapshot tables; this takes
+        the rows and builds their dicts only when a response needs them.
+        """
+        if isinstance(data, TableView):
+            return data.records()
+        if isinstance(data, pd.DataFrame):
+            return decode_categories(data).to_dict("records")
         return data.to_dict("records") if hasattr(data, "to_dict") else data
 
-    def _filter_current_members(self, data: list[dict[str, Any]], end_date_field: str) -> list[dict[str, Any]]:
-        """Filter data to only include current members based on end date field."""
-        filtered_data = []
-        for record in data:
-            end_date = record.get(end_date_field)
-            # Keep record if end_date is None, empty string, or NaN
-            if end_date is None or end_date == "":
-                filtered_data.append(record)
-            else:
-                try:
-                    # Check if it's a pandas NaN value
-                    if pd.isna(end_date):
-                        filtered_data.append(record)
-                except (TypeError, ValueError):
-                    # If pd.isna fails, keep the record if it's falsy
-                    if not end_date:
-                        filtered_data.append(record)
-        return filtered_data
-
-    def scrape_mps(self, current: bool = False, from_date: str | None = None,
-                   to_date: str | None = None, on_date: str | None = None) -> list[dict[str, Any]]:
+    def _current_mask(self, end_dates: pd.Series, as_of: str | None = None) -> pd.Series:
+        """Return a boolean mask of end dates that are missing or, given as_of, not yet reached."""
+        mask = end_dates.isna()
+        if end_dates.dtype == object:
+            mask |= end_dates.eq("")
+        if as_of:
+            parsed = pd.to_datetime(end_dates, errors="coerce")
+            if parsed.dt.tz is not None:
+                parsed = parsed.dt.tz_localize(None)
+            mask |= parsed >= pd.Timestamp(as_of)
+        return mask
+
+    def _filter_current_members(self, data: Any, end_date_field: str, as_of: str | None = None) -> Any:
+        """Filter data to only include current records based on end date field.
+
+        A record is current if its end date is missing (None, NaN/NaT or an
+        empty string) or, when as_of is given, falls on or after that date.
+        DataFrames are filtered with one columnar mask; lists of record dicts
+        keep their order, and views are narrowed without copying rows. Anything
+        else is returned unchanged.
+
+        Args:
+            data: TableView, DataFrame or list of record dicts to filter
+            end_date_field: Name of the column holding each record's end date
+            as_of: Optional reference date (YYYY-MM-DD format); current then means not ended as of this date
+
+        Returns:
+            The current records, in the same form as data
+        """
+        if isinstance(data, TableView):
+            if end_date_field not in data.columns:
+                return data
+            return data.where(self._current_mask(data.column(end_date_field), as_of).to_numpy())
+        if isinstance(data, pd.DataFrame):
+            if end_date_field not in data.columns:
+                return data
+            return data[self._current_mask(data[end_date_field], as_of).to_numpy()]
+        if isinstance(data, list):
+            end_dates = pd.Series([record.get(end_date_field) for record in data], dtype=object)
+            mask = self._current_mask(end_dates, as_of).tolist()
+            return [record for record, keep in zip(data, mask) if keep]
+        return data
+
+    def scrape_mps(self, current: bool = False, from_date: str | None = None, to_date: str | None = None,
+                   on_date: str | None = None, fields: tuple[str, ...] | None = None) -> list[dict[str, Any]]:
         """Scrape Members of Parliament (MPs) from House of Commons.
+
+        Date filters are answered locally from the full MP and Commons membership
+        tables, so each distinct date does not cost an upstream query.
         
         Args:
             current: If True, filter to only current members (uses today's date)
             from_date: Get members from this date onwards (YYYY-MM-DD format)
             to_date: Get members up to this date (YYYY-MM-DD format)
             on_date: Get members who were serving on this specific date (YYYY-MM-DD format)
+            fields: Columns to return, in order (defaults to every column)
             
         Returns:
             List of MP records as dictionaries
         """
         try:
-            # Build kwargs for pdpy function
-            kwargs = {}
-            
-            # Handle date filtering parameters - they can be combined
-            if from_date:
-                kwargs["from_date"] = from_date
-            if to_date:
-                kwargs["to_date"] = to_date
-            if on_date:
-                kwargs["on_date"] = on_date
-            
-            # If current=True and no on_date is specified, use today's date
-            # Note: current=True with on_date specified will use the specified on_date
-            if current and not on_date:
-                kwargs["on_date"] = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-
-            data = pdpy.fetch_mps(**kwargs)  # type: ignore[attr-defined]
-            data_dict = self._convert_to_dict(data)
-
-            # Cache the data
-            cache_key = f"mps_current_{current}_from_{from_date}_to_{to_date}_on_{on_date}"
-            self.cache[cache_key] = {
-                "data": data_dict,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            }
+            data_dict = self._convert_to_dict(project(self.mps_view(current, from_date, to_date, on_date), fields))
 
+        except InvalidFieldsError:
+            raise
         except Exception:
             logger.exception("Error scraping MPs")
             raise
         else:
             return data_dict if isinstance(data_dict, list) else []
 
-    def scrape_lords(self, current: bool = False, from_date: str | None = None,
-                     to_date: str | None = None, on_date: str | None = None) -> list[dict[str, Any]]:
+    def mps_view(self, current: bool = False, from_date: str | None = None,
+                 to_date: str | None = None, on_date: str | None = None) -> TableView:
+        """Return the cached view of the MPs matching scrape_mps's filters."""
+        cache_key = f"mps_current_{current}_from_{from_date}_to_{to_date}_on_{on_date}"
+        return self._member_view("fetch_mps", cache_key, current, from_date, to_date, on_date)
+
+    def scrape_lords(self, current: bool = False, from_date: str | None = None, to_date: str | None = None,
+                     on_date: str | None = None, fields: tuple[str, ...] | None = None) -> list[dict[str, Any]]:
         """Scrape Members of House of Lords.
+
+        Date filters are answered locally from the full Lords and Lords membership
+        tables, so each distinct date does not cost an upstream query.
         
         Args:
             current: If True, filter to only current members (uses today's date)
             from_date: Get members from this date onwards (YYYY-MM-DD format)
             to_date: Get members up to this date (YYYY-MM-DD format)
             on_date: Get members who were serving on this specific date (YYYY-MM-DD format)
+            fields: Columns to return, in order (defaults to every column)
             
         Returns:
             List of Lords records as dictionaries
         """
         try:
-            # Build kwargs for pdpy function
-            kwargs = {}
-            
-            # Handle date filtering parameters - they can be combined
-            if from_date:
-                kwargs["from_date"] = from_date
-            if to_date:
-                kwargs["to_date"] = to_date
-            if on_date:
-                kwargs["on_date"] = on_date
-            
-            # If current=True and no on_date is specified, use today's date
-            # Note: current=True with on_date specified will use the specified on_date
-            if current and not on_date:
-                kwargs["on_date"] = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-
-            data = pdpy.fetch_lords(**kwargs)  # type: ignore[attr-defined]
-            data_dict = self._convert_to_dict(data)
-
-            # Cache the data
-            cache_key = f"lords_current_{current}_from_{from_date}_to_{to_date}_on_{on_date}"
-            self.cache[cache_key] = {
-                "data": data_dict,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            }
+            data_dict = self._convert_to_dict(project(self.lords_view(current, from_date, to_date, on_date), fields))
 
+        except InvalidFieldsError:
+            raise
         except Exception:
             logger.exception("Error scraping Lords")
             raise
         else:
             return data_dict if isinstance(data_dict, list) else []
 
-    def scrape_government_roles(self, current: bool = False) -> dict[str, Any]:
+    def lords_view(self, current: bool = False, from_date: str | None = None,
+                   to_date: str | None = None, on_date: str | None = None) -> TableView:
+        """Return the cached view of the Lords matching scrape_lords's filters."""
+        cache_key = f"lords_current_{current}_from_{from_date}_to_{to_date}_on_{on_date}"
+        return self._member_view("fetch_lords", cache_key, current, from_date, to_date, on_date)
+
+    def scrape_government_roles(self, current: bool = False, from_date: str | None = None, to_date: str | None = None,
+                                on_date: str | None = None, fields: tuple[str, ...] | None = None) -> dict[str, Any]:
         """Scrape government roles for both MPs and Lords.
         
         Args:
             current: If True, filter to only current roles (those without end dates)
+            from_date: Get roles held at some point from this date onwards (YYYY-MM-DD format)
+            to_date: Get roles held at some point up to this date (YYYY-MM-DD format)
+            on_date: Get roles held on this specific date (YYYY-MM-DD format)
+            fields: Columns to return, in order (defaults to every column)
             
         Returns:
             Dictionary containing MPs and Lords government roles
         """
         try:
-            mps_gov_roles = pdpy.fetch_mps_government_roles()  # type: ignore[attr-defined]
-            lords_gov_roles = pdpy.fetch_lords_government_roles()  # type: ignore[attr-defined]
-
-            # Convert DataFrames to dicts
-            mps_roles = self._convert_to_dict(mps_gov_roles)
-            lords_roles = self._convert_to_dict(lords_gov_roles)
-
-            # Filter for current roles if requested
-            if current:
-                if isinstance(mps_roles, list):
-                    mps_roles = self._filter_current_members(mps_roles, "government_incumbency_end_date")
-                if isinstance(lords_roles, list):
-                    lords_roles = self._filter_current_members(lords_roles, "government_incumbency_end_date")
-
+            views = project(self.government_roles_views(current, from_date, to_date, on_date), fields)
+            return {key: self._convert_to_dict(view) for key, view in views.items()}
+        except InvalidFieldsError:
+            raise
         except Exception:
             logger.exception("Error scraping government roles")
             raise
-        else:
-            return {
-                "mps_government_roles": mps_roles,
-                "lords_government_roles": lords_roles,
-            }
 
-    def scrape_committee_memberships(self, current: bool = False) -> dict[str, Any]:
+    def government_roles_views(self, current: bool = False, from_date: str | None = None,
+                               to_date: str | None = None, on_date: str | None = None) -> dict[str, TableView]:
+        """Return the cached views behind scrape_government_roles."""
+        window = self._date_window(current=False, from_date=from_date, to_date=to_date, on_date=on_date)
+        return self._cached_view(
+            f"government_roles_current_{current}_from_{from_date}_to_{to_date}_on_{on_date}",
+            ["fetch_mps_government_roles", "fetch_lords_government_roles"],
+            lambda mps_table, lords_table: self._build_government_roles(mps_table, lords_table, current, window),
+            params=window,
+        )
+
+    def _build_government_roles(self, mps_table: Any, lords_table: Any, current: bool,
+                                window: tuple[str | None, str | None] | None) -> dict[str, Any]:
+        """Build views of the government roles matching the filters in both houses' tables."""
+        if window is None:
+            mps_table, lords_table = self._as_view(mps_table), self._as_view(lords_table)
+        else:
+            mps_table = self._rows_in_window("fetch_mps_government_roles", mps_table, window)
+            lords_table = self._rows_in_window("fetch_lords_government_roles", lords_table, window)
+
+        # Filter for current roles if requested
+        if current:
+            mps_table = self._filter_current_members(mps_table, "government_incumbency_end_date")
+            lords_table = self._filter_current_members(lords_table, "government_incumbency_end_date")
+
+        return {
+            "mps_government_roles": mps_table,
+            "lords_government_roles": lords_table,
+        }
+
+    def scrape_committee_memberships(self, current: bool = False, from_date: str | None = None,
+                                     to_date: str | None = None, on_date: str | None = None,
+                                     fields: tuple[str, ...] | None = None) -> dict[str, Any]:
         """Scrape committee memberships.
         
         Args:
             current: If True, filter to only current memberships (those without end dates)
+            from_date: Get memberships held at some point from this date onwards (YYYY-MM-DD format)
+            to_date: Get memberships held at some point up to this date (YYYY-MM-DD format)
+            on_date: Get memberships held on this specific date (YYYY-MM-DD format)
+            fields: Columns to return, in order (defaults to every column)
             
         Returns:
             Dictionary containing MPs and Lords committee memberships
         """
         try:
-            mps_committees = pdpy.fetch_mps_committee_memberships()  # type: ignore[attr-defined]
-            lords_committees = pdpy.fetch_lords_committee_memberships()  # type: ignore[attr-defined]
-
-            # Convert DataFrames to dicts
-            mps_comm = self._convert_to_dict(mps_committees)
-            lords_comm = self._convert_to_dict(lords_committees)
-
-            # Filter for current memberships if requested
-            if current:
-                if isinstance(mps_comm, list):
-                    mps_comm = self._filter_current_members(mps_comm, "committee_membership_end_date")
-                if isinstance(lords_comm, list):
-                    lords_comm = self._filter_current_members(lords_comm, "committee_membership_end_date")
-
+            views = project(self.committee_membership_views(current, from_date, to_date, on_date), fields)
+            return {key: self._convert_to_dict(view) for key, view in views.items()}
+        except InvalidFieldsError:
+            raise
         except Exception:
             logger.exception("Error scraping committee memberships")
             raise
+
+    def committee_membership_views(self, current: bool = False, from_date: str | None = None,
+                                   to_date: str | None = None, on_date: str | None = None) -> dict[str, TableView]:
+        """Return the cached views behind scrape_committee_memberships."""
+        window = self._date_window(current=False, from_date=from_date, to_date=to_date, on_date=on_date)
+        return self._cached_view(
+            f"committees_current_{current}_from_{from_date}_to_{to_date}_on_{on_date}",
+            ["fetch_mps_committee_memberships", "fetch_lords_committee_memberships"],
+            lambda mps_table, lords_table: self._build_committee_memberships(mps_table, lords_table, current, window),
+            params=window,
+        )
+
+    def _build_committee_memberships(self, mps_table: Any, lords_table: Any, current: bool,
+                                     window: tuple[str | None, str | None] | None) -> dict[str, Any]:
+        """Build views of the committee memberships matching the filters in both houses' tables."""
+        if window is None:
+            mps_table, lords_table = self._as_view(mps_table), self._as_view(lords_table)
         else:
-            return {
-                "mps_committee_memberships": mps_comm,
-                "lords_committee_memberships": lords_comm,
-            }
+            mps_table = self._rows_in_window("fetch_mps_committee_memberships", mps_table, window)
+            lords_table = self._rows_in_window("fetch_lords_committee_memberships", lords_table, window)
+
+        # Filter for current memberships if requested
+        if current:
+            mps_table = self._filter_current_members(mps_table, "committee_membership_end_date")
+            lords_table = self._filter_current_members(lords_table, "committee_membership_end_date")
+
+        return {
+            "mps_committee_memberships": mps_table,
+            "lords_committee_memberships": lords_table,
+        }
+
+    def cached_all_data(self) -> DataDict | None:
+        """Return the last full scrape unless it is past the soft TTL, recording the cache lookup.
+
+        Past the soft TTL, None is returned so the caller scrapes again; that
+        rebuilds the payload from the snapshot tables, which serve stale data
+        and refresh it in the background as for every other dataset.
+        """
+        all_data = self._snapshots.current.all_data
+        if all_data is None:
+            return None
+        age = time.monotonic() - all_data["stored_at"]
+        if age >= self.soft_ttl:
+            return None
+        _record_cache_lookup(age, "HIT")
+        return all_data["data"]
 
     def scrape_all_data(self, current: bool = False) -> dict[str, Any]:
         """Scrape all available UK government and parliamentary data.
@@ -234,46 +950,34 @@ class UKGovernmentScraper:
         try:
             logger.info("Starting comprehensive data scrape")
 
-            # Scrape all data types
-            mps = self.scrape_mps(current=current)
-            lords = self.scrape_lords(current=current)
-            government_roles = self.scrape_government_roles(current=current)
-            committees = self.scrape_committee_memberships(current=current)
+            # Scrape all data types concurrently; wall time follows the slowest upstream fetch
+            results = self._fan_out(
+                self._scrape_executor,
+                {
+                    "mps": lambda: self.scrape_mps(current=current),
+                    "lords": lambda: self.scrape_lords(current=current),
+                    "government_roles": lambda: self.scrape_government_roles(current=current),
+                    "committees": lambda: self.scrape_committee_memberships(current=current),
+                },
+            )
+            mps = results["mps"]
+            lords = results["lords"]
+            government_roles = results["government_roles"]
+            committees = results["committees"]
 
             data = {
-                "metadata": {
-                    "scraped_at": datetime.now(timezone.utc).isoformat(),
-                    "scraper_version": "1.0.0",
-                    "data_source": "UK Parliament API via pdpy library",
-                },
+                "metadata": self._all_data_metadata(),
                 "members_of_parliament": mps,
                 "house_of_lords": lords,
                 "government_roles": government_roles,
                 "committee_memberships": committees,
             }
+            data["summary"] = self._all_data_summary(mps, lords, government_roles, committees)
 
-            # Add summary statistics with safe length calculation
-            def safe_len(obj: Any) -> int:
-                """Safely get length of object, return 0 if not possible."""
-                try:
-                    # Only count valid list-like structures, not strings
-                    if obj is None or isinstance(obj, str):
-                        return 0
-                    return len(obj)
-                except (TypeError, AttributeError):
-                    return 0
-
-            data["summary"] = {
-                "total_mps": safe_len(mps),
-                "total_lords": safe_len(lords),
-                "total_mps_gov_roles": safe_len(government_roles.get("mps_government_roles", [])),
-                "total_lords_gov_roles": safe_len(government_roles.get("lords_government_roles", [])),
-                "total_mps_committee_memberships": safe_len(committees.get("mps_committee_memberships", [])),
-                "total_lords_committee_memberships": safe_len(committees.get("lords_committee_memberships", [])),
-            }
-
-            self.cache["all"] = data
-            self.last_updated = datetime.now(timezone.utc)
+            all_data = {"data": data, "stored_at": time.monotonic()}
+            self._snapshots.publish(
+                lambda snapshot: snapshot.with_all_data(all_data, datetime.now(timezone.utc)),
+            )
 
             logger.info(
                 "Scraping completed. Found %d MPs and %d Lords",
@@ -287,6 +991,163 @@ class UKGovernmentScraper:
         else:
             return data
 
+    def all_data_views(self, current: bool = False) -> dict[str, Any]:
+        """Return the all-data payload with views in place of its row lists, for streaming.
+
+        Holds the same rows as scrape_all_data, with metadata first and the
+        summary last, but each dataset is the cached view behind it, so no rows
+        are built until the response is written (see FastJSONProvider.stream).
+        Unlike scrape_all_data, the result is not kept as the last full scrape.
+
+        Args:
+            current: If True, filter to only current members/roles (those without end dates)
+        """
+        def members(view: Any) -> Any:
+            if isinstance(view, TableView):
+                return view
+            records = self._convert_to_dict(view)
+            return records if isinstance(records, list) else []
+
+        try:
+            results = self._fan_out(
+                self._scrape_executor,
+                {
+                    "mps": lambda: members(self.mps_view(current)),
+                    "lords": lambda: members(self.lords_view(current)),
+                    "government_roles": lambda: self.government_roles_views(current),
+                    "committees": lambda: self.committee_membership_views(current),
+                },
+            )
+        except Exception:
+            logger.exception("Error building views for a streamed scrape")
+            raise
+        return {
+            "metadata": self._all_data_metadata(),
+            "members_of_parliament": results["mps"],
+            "house_of_lords": results["lords"],
+            "government_roles": results["government_roles"],
+            "committee_memberships": results["committees"],
+            "summary": self._all_data_summary(
+                results["mps"], results["lords"], results["government_roles"], results["committees"],
+            ),
+        }
+
+    def _all_data_metadata(self) -> dict[str, str]:
+        """Return the metadata block of the all-data payload."""
+        return {
+            "scraped_at": datetime.now(timezone.utc).isoformat(),
+            "scraper_version": "1.0.0",
+            "data_source": "UK Parliament API via pdpy library",
+        }
+
+    def _all_data_summary(self, mps: Any, lords: Any, government_roles: Any, committees: Any) -> dict[str, int]:
+        """Return the summary counts of the all-data payload from its datasets (lists or views)."""
+        def safe_len(obj: Any) -> int:
+            """Safely get length of object, return 0 if not possible."""
+            try:
+                # Only count valid list-like structures, not strings
+                if obj is None or isinstance(obj, str):
+                    return 0
+                return len(obj)
+            except (TypeError, AttributeError):
+                return 0
+
+        return {
+            "total_mps": safe_len(mps),
+            "total_lords": safe_len(lords),
+            "total_mps_gov_roles": safe_len(government_roles.get("mps_government_roles", [])),
+            "total_lords_gov_roles": safe_len(government_roles.get("lords_government_roles", [])),
+            "total_mps_committee_memberships": safe_len(committees.get("mps_committee_memberships", [])),
+            "total_lords_committee_memberships": safe_len(committees.get("lords_committee_memberships", [])),
+        }
+
+    def person_model(self) -> PersonModel:
+        """Return the person model over the cached tables, rebuilt when any of them is refreshed."""
+        fetch_names = list(PROFILE_SECTIONS)
+        return self._cached_view(
+            "person_model", fetch_names, lambda *tables: PersonModel(dict(zip(fetch_names, tables))),
+        )
+
+    def scrape_normalized_data(self, current: bool = False) -> dict[str, Any]:
+        """Return the all-data payload with each person's identity listed once.
+
+        Holds the same rows as scrape_all_data, but the identity columns each
+        table repeats (see persons.PERSON_COLUMNS) are moved into a "persons"
+        list; every other row keeps only person_id to reference it.
+
+        Args:
+            current: If True, filter to only current members/roles (those without end dates)
+
+        Returns:
+            Dictionary containing the persons referenced and all scraped data
+        """
+        try:
+            model = self.person_model()
+            views = {
+                "fetch_mps": self.mps_view(current=current),
+                "fetch_lords": self.lords_view(current=current),
+            }
+            roles = self.government_roles_views(current=current)
+            committees = self.committee_membership_views(current=current)
+            for fetch_name, (_, key) in NORMALIZED_SECTIONS.items():
+                if key is not None:
+                    views[fetch_name] = (roles if key in roles else committees)[key]
+
+            data: dict[str, Any] = {"metadata": {**self._all_data_metadata(), "normalized": True}}
+            referenced = []
+            for fetch_name, view in views.items():
+                section, key = NORMALIZED_SECTIONS[fetch_name]
+                if isinstance(view, TableView) and "person_id" in view.columns:
+                    referenced.append(model.person_rows(fetch_name, view))
+                    rows = view.records(columns=model.fact_columns(view.columns))
+                else:
+                    rows = self._convert_to_dict(view)
+                if key is None:
+                    data[section] = rows
+                else:
+                    data.setdefault(section, {})[key] = rows
+
+            data["persons"] = model.persons_records(
+                np.concatenate(referenced) if referenced else np.empty(0, dtype=np.intp),
+            )
+            data["summary"] = {
+                "total_persons": len(data["persons"]),
+                **self._all_data_summary(data["members_of_parliament"], data["house_of_lords"],
+                                         data["government_roles"], data["committee_memberships"]),
+            }
+        except Exception:
+            logger.exception("Error building normalized data")
+            raise
+        else:
+            return data
+
+    def person_profile(self, person_id: str) -> dict[str, Any] | None:
+        """Return everything known about one person, found through the person model's indexes.
+
+        Args:
+            person_id: The person's pdpy person_id, with or without the PERSON_ID_PREFIX
+
+        Returns:
+            The person's identity and their member rows, memberships, government roles and
+            committee memberships in each house, or None if the person is unknown
+        """
+        try:
+            model = self.person_model()
+            found = model.person(person_id)
+            if found is None and not person_id.startswith(PERSON_ID_PREFIX):
+                person_id = PERSON_ID_PREFIX + person_id
+                found = model.person(person_id)
+        except Exception:
+            logger.exception("Error looking up person %s", person_id)
+            raise
+        if found is None:
+            return None
+
+        profile: dict[str, Any] = {"person_id": person_id, "person": found["person"]}
+        for fetch_name, (section, key) in PROFILE_SECTIONS.items():
+            profile.setdefault(section, {})[key] = found["facts"].get(fetch_name, [])
+        return profile
+
     def _create_outputs_dir(self) -> Path:
         """Create and return the outputs directory path."""
         outputs_dir = Path(__file__).parent / "outputs"
@@ -409,224 +1270,696 @@ class UKGovernmentScraper:
             return exported_files
 
 
-# Initialize the scraper
+# Initialize the scraper, reloading the tables persisted before the last restart
 scraper = UKGovernmentScraper()
+scraper.restore_tables()
+
+# Keeps each dataset's tables fresh in the background; started by the serving entry points
+refresh_scheduler = RefreshScheduler(
+    {name: partial(scraper.refresh_tables, tables) for name, tables in DATASET_TABLES.items()},
+    settings.REFRESH_SCHEDULE,
+)
+
+
+# Set once the startup warm-up has tried to load every dataset; see readiness_payload
+warm_up_done = threading.Event()
+
+
+def stale_datasets() -> list[str]:
+    """Return the scheduled datasets whose tables are missing or past the soft TTL."""
+    return [name for name in refresh_scheduler.jobs if not scraper.fresh_tables(DATASET_TABLES.get(name, ()))]
+
+
+def unavailable_datasets() -> list[str]:
+    """Return the datasets with a table missing from the snapshot or past the hard TTL."""
+    return [
+        name for name, tables in DATASET_TABLES.items()
+        if not scraper.fresh_tables(tables, max_age=scraper.cache.ttl)
+    ]
+
+
+def start_background_refresh() -> bool:
+    """Start the refresh scheduler if REFRESH_ENABLED; return whether it is running.
+
+    Datasets restored fresh from the snapshot store wait out their interval
+    before their first refresh; the rest are refreshed at once.
+    """
+    if settings.REFRESH_ENABLED:
+        refresh_scheduler.start(run_immediately=stale_datasets())
+    return refresh_scheduler.running
+
+
+def warm_up() -> bool:
+    """Load every dataset that was not restored fresh from disk, then mark warm-up finished.
+
+    Returns:
+        Whether every dataset loaded
+    """
+    started = time.perf_counter()
+    try:
+        return warm_snapshot()
+    except Exception:
+        logger.exception("Warm-up failed")
+        return False
+    finally:
+        warm_up_done.set()
+        logger.info("Warm-up finished in %.2fs", time.perf_counter() - started)
+
+
+def start_warm_up() -> threading.Thread:
+    """Warm up in a background thread, then start the refresh scheduler.
+
+    The server starts answering at once; /ready reports 503 until warm-up
+    finishes, so load balancers hold traffic back until then. Datasets that
+    failed to load are retried straight away by the scheduler.
+    """
+    def run() -> None:
+        warm_up()
+        start_background_refresh()
+
+    thread = threading.Thread(target=run, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def warm_snapshot() -> bool:
+    """Refresh every stale dataset now, concurrently; return whether all of them succeeded."""
+    results = scraper.refresh_all({name: partial(refresh_scheduler.refresh, name) for name in stale_datasets()})
+    return all(results.values())
+
+
+def start_preforked_refresh(reload_workers: Callable[[], Any]) -> None:
+    """Load the snapshot in a pre-fork server's master process and keep it fresh there.
+
+    Workers forked afterwards share the master's snapshot copy-on-write instead
+    of each holding and refreshing their own. After each scheduled refresh the
+    master calls reload_workers so that replacement workers are forked with the
+    new snapshot, again without scraping it themselves.
+
+    Datasets due within the largest refresh jitter of each other are refreshed
+    as one cycle, with a single reload after it, so the workers (and any long
+    streamed responses they are serving) are replaced once per cycle rather
+    than once per dataset.
+
+    Args:
+        reload_workers: Gracefully replaces the worker processes with fresh forks
+    """
+    warm_up()
+    # Keep the garbage collector from touching (and so copying) the shared objects
+    gc.freeze()
+    if settings.REFRESH_ENABLED:
+        def reload_after_cycle(_names: list[str]) -> None:
+            gc.freeze()
+            reload_workers()
+
+        refresh_scheduler.batch_window = max(
+            (jitter for _, jitter in refresh_scheduler.schedule.values()), default=0,
+        )
+        refresh_scheduler.on_cycle = reload_after_cycle
+        refresh_scheduler.start(run_immediately=False)
+
+
+def after_fork() -> None:
+    """Prepare a worker forked from a master running start_preforked_refresh."""
+    scraper.after_fork(refresh_stale=False)
+    refresh_scheduler.after_fork()
+
+
+# Error responses for each route: (error, message)
+ROUTE_ERRORS = {
+    "scrape_all": ("Failed to scrape data", "An error occurred while scraping data"),
+    "scrape_mps": ("Failed to scrape MPs data", "An error occurred while scraping MPs data"),
+    "scrape_lords": ("Failed to scrape Lords data", "An error occurred while scraping Lords data"),
+    "scrape_committees": ("Failed to scrape committees data", "An error occurred while scraping committees data"),
+    "scrape_government_roles": ("Failed to scrape government roles data",
+                                "An error occurred while scraping government roles data"),
+    "export_csv": ("Failed to export CSV files", "An error occurred while exporting CSV files"),
+    "person": ("Failed to look up person", "An error occurred while looking up the person"),
+    "person_not_found": ("Person not found", "No person with this person_id is in the cached data"),
+    "not_found": ("Endpoint not found", "The requested endpoint does not exist"),
+    "internal_error": ("Internal server error", "An unexpected error occurred"),
+}
+
+# Data types accepted by /export/csv
+EXPORT_TYPES = ["all", "mps", "lords", "government-roles", "committees"]
+
+# Dataset behind each endpoint whose responses carry content-hash ETags
+ETAG_DATASETS = {
+    "/scrape/mps": "mps",
+    "/scrape/lords": "lords",
+    "/scrape/government-roles": "government_roles",
+    "/scrape/committees": "committees",
+}
+
+
+# Response payloads, shared by the WSGI routes below and the ASGI app in asgi.py
+
+
+def query_flag(args: Mapping[str, str], name: str) -> bool:
+    """Read a true/false query parameter, defaulting to false."""
+    return args.get(name, "false").lower() == "true"
+
+
+def query_date_filters(args: Mapping[str, str]) -> dict[str, str]:
+    """Collect the non-empty date filter query parameters."""
+    return {name: args[name] for name in ("from_date", "to_date", "on_date") if args.get(name)}
+
+
+def query_fields(args: Mapping[str, str]) -> dict[str, tuple[str, ...]]:
+    """Collect the fields= projection as a fields argument, or nothing if it is absent or empty."""
+    fields = tuple(dict.fromkeys(name.strip() for name in args.get("fields", "").split(",") if name.strip()))
+    return {"fields": fields} if fields else {}
+
+
+def query_page(args: Mapping[str, str]) -> tuple[int, str | None] | None:
+    """Read the limit and after pagination parameters, or None if neither is given.
+
+    Raises:
+        InvalidPageError: If limit is not a whole number from 1 to PAGE_MAX_SIZE
+    """
+    limit, after = args.get("limit"), args.get("after") or None
+    if limit is None and after is None:
+        return None
+    if limit is None:
+        return settings.PAGE_SIZE, after
+    # isdecimal alone accepts non-ASCII digits such as Arabic-Indic ones
+    if not (limit.isascii() and limit.isdecimal()) or not 1 <= int(limit) <= settings.PAGE_MAX_SIZE:
+        raise InvalidPageError(f"limit must be a whole number from 1 to {settings.PAGE_MAX_SIZE}")
+    return int(limit), after
+
+
+def cache_headers(lookups: list[tuple[float, str]] | None) -> dict[str, str]:
+    """Build the Age and X-Cache headers reporting the cached data a request served."""
+    if not lookups:
+        return {}
+    states = {state for _, state in lookups}
+    return {
+        "Age": str(int(max(age for age, _ in lookups))),
+        "X-Cache": "STALE" if "STALE" in states else "MISS" if "MISS" in states else "HIT",
+    }
+
+
+def dataset_etag(source: UKGovernmentScraper, path: str, args: Mapping[str, str],
+                 tables_read: list[tuple[str, str | None]] | None = None) -> str | None:
+    """Return the ETag of a request's response, or None if its path has none or its data is not loaded.
+
+    Args:
+        source: Scraper holding the snapshot
+        path: Request path
+        args: Query parameters
+        tables_read: Table entries the response was built from (see UKGovernmentScraper.content_etag);
+            None before it is built
+    """
+    dataset = ETAG_DATASETS.get(path)
+    return None if dataset is None else source.content_etag(dataset, args, tables_read)
+
+
+def etag_header(etag: str) -> str:
+    """Return the ETag header value for an ETag.
+
+    ETags are weak: they cover a response's rows and parameters, but not its
+    metadata.scraped_at, which differs from one response to the next.
+    """
+    return quote_etag(etag, weak=True)
+
+
+def not_modified(if_none_match: str | None, etag: str | None) -> bool:
+    """Return whether an If-None-Match header matches etag, comparing weakly as RFC 9110 requires."""
+    return etag is not None and bool(if_none_match) and parse_etags(if_none_match).contains_weak(etag)
+
+
+def stream_json(payload: Any) -> Iterator[bytes]:
+    """Yield payload as a streamed JSON response body (see FastJSONProvider.stream).
+
+    The status line has gone out before the body is built, so a failure part
+    way through can only cut the body short; it is logged here.
+    """
+    try:
+        yield from app.json.stream(payload)
+        yield b"\n"
+    except Exception:
+        logger.exception("Error streaming response")
+        raise
+
+
+def stream_ndjson(rows: Any) -> Iterator[bytes]:
+    """Yield rows as a newline-delimited JSON response body, one row per line.
+
+    Args:
+        rows: A view (or DataFrame or list of row dicts), or a dict of them by
+            dataset name; a dict's datasets are written one after another, each
+            row with a "dataset" field naming its dataset
+    """
+    try:
+        if isinstance(rows, dict):
+            for name, dataset in rows.items():
+                yield from app.json.stream_lines(dataset, fields={"dataset": name})
+        else:
+            yield from app.json.stream_lines(rows)
+    except Exception:
+        logger.exception("Error streaming response")
+        raise
+
+
+def query_ndjson(args: Mapping[str, str]) -> bool:
+    """Return whether a request asks for newline-delimited JSON (format=ndjson)."""
+    return args.get("format", "").lower() == "ndjson"
+
+
+def error_payload(route: str) -> DataDict:
+    """Build the error response body for a route."""
+    error, message = ROUTE_ERRORS[route]
+    return {
+        "error": error,
+        "message": message,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def index_payload() -> DataDict:
+    """Build the service information response body."""
+    return {
+        "service": "UK Government Members Scraper",
+        "status": "active",
+        "version": "1.0.0",
+        "endpoints": {
+            "/scrape/all": "Scrape all government members and employees "
+                           "(supports ?current=true&cache=true&normalized=true)",
+            "/scrape/mps": "Scrape only MPs from House of Commons "
+                           "(supports ?current=true&from_date=YYYY-MM-DD&to_date=YYYY-MM-DD&on_date=YYYY-MM-DD)",
+            "/scrape/lords": "Scrape only members of House of Lords "
+                             "(supports ?current=true&from_date=YYYY-MM-DD&to_date=YYYY-MM-DD&on_date=YYYY-MM-DD)",
+            "/scrape/committees": "Scrape committee memberships "
+                                  "(supports ?current=true&from_date=YYYY-MM-DD&to_date=YYYY-MM-DD&on_date=YYYY-MM-DD)",
+            "/scrape/government-roles": "Scrape government roles "
+                                        "(supports ?current=true&from_date=YYYY-MM-DD&to_date=YYYY-MM-DD"
+                                        "&on_date=YYYY-MM-DD)",
+            "/person/<person_id>": "Everything about one person: memberships, government roles "
+                                   "and committee memberships in both houses",
+            "/health": "Service health check",
+            "/ready": "Readiness check; 503 until every dataset is loaded into memory",
+            "/export/csv": "Export scraped data to CSV files "
+                           "(supports ?type=all|mps|lords|government-roles|committees&current=true)",
+        },
+        "query_parameters": {
+            "current": "Boolean - filter to only current members/roles (default: false)",
+            "from_date": "String - get members from this date onwards (YYYY-MM-DD format)",
+            "to_date": "String - get members up to this date (YYYY-MM-DD format)",
+            "on_date": "String - get members serving on specific date (YYYY-MM-DD format)",
+            "cache": "Boolean - use cached data if available (default: false, only for /scrape/all)",
+            "normalized": "Boolean - list each person once under persons, referenced by person_id "
+                          "(default: false, only for /scrape/all)",
+            "stream": "Boolean - stream the response as it is built, for large pulls "
+                      "(default: false, only for /scrape/all)",
+            "format": "String - ndjson for one row per line, streamed (default: json, only for "
+                      "/scrape/mps, /scrape/lords, /scrape/government-roles and /scrape/committees)",
+            "limit": "Integer - page through the rows, this many at a time (only for /scrape/mps, "
+                     "/scrape/lords, /scrape/government-roles and /scrape/committees)",
+            "after": "String - next_cursor of the previous page, to fetch the page after it",
+            "fields": "String - comma-separated columns to return, e.g. person_id,display_name (only for "
+                      "/scrape/mps, /scrape/lords, /scrape/government-roles and /scrape/committees)",
+            "type": "String - data type to export (default: all, only for /export/csv)",
+        },
+        "last_updated": scraper.last_updated.isoformat() if scraper.last_updated else None,
+    }
+
+
+def health_payload() -> DataDict:
+    """Build the health check response body."""
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "cache_status": "populated" if scraper.snapshot.tables or scraper.cache else "empty",
+        "cache_stats": scraper.cache.stats(),
+        "shared_cache": scraper.shared_cache.stats() if scraper.shared_cache is not None else None,
+        "snapshot": {
+            "generation": scraper.snapshot.generation,
+            "tables": sorted(scraper.snapshot.tables),
+            "persisted": scraper.snapshot_store.metadata() if scraper.snapshot_store is not None else None,
+        },
+        "refresh": {
+            "scheduler_running": refresh_scheduler.running,
+            "datasets": refresh_scheduler.status(),
+        },
+    }
+
+
+def readiness_payload() -> DataDict:
+    """Build the readiness response body; serve it with 503 unless "ready" is true.
+
+    An instance is ready once its startup warm-up has finished and every
+    dataset can be answered from memory.
+    """
+    missing = unavailable_datasets()
+    warmed_up = warm_up_done.is_set()
+    ready = warmed_up and not missing
+    return {
+        "status": "ready" if ready else ("warming_up" if not warmed_up else "not_ready"),
+        "ready": ready,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "warm_up_finished": warmed_up,
+        "unavailable_datasets": missing,
+    }
+
+
+def members_payload(data_type: str, data_key: str, members: list[dict[str, Any]], current: bool,
+                    from_date: str | None, to_date: str | None, on_date: str | None) -> DataDict:
+    """Build the response body for a house's member list."""
+    return {
+        "metadata": {
+            "scraped_at": datetime.now(timezone.utc).isoformat(),
+            "data_type": data_type,
+            "filter_current": current,
+            "from_date": from_date,
+            "to_date": to_date,
+            "on_date": on_date,
+        },
+        data_key: members,
+        "summary": {
+            "total_count": len(members),
+        },
+    }
+
+
+def committees_payload(committees_data: DataDict, current: bool, date_filters: dict[str, str]) -> DataDict:
+    """Build the committee memberships response body."""
+    return {
+        "metadata": {
+            "scraped_at": datetime.now(timezone.utc).isoformat(),
+            "data_type": "Committee Memberships",
+            "filter_current": current,
+            "from_date": date_filters.get("from_date"),
+            "to_date": date_filters.get("to_date"),
+            "on_date": date_filters.get("on_date"),
+        },
+        "committee_memberships": committees_data,
+        "summary": {
+            "total_mps_committee_memberships": len(committees_data.get("mps_committee_memberships", [])),
+            "total_lords_committee_memberships": len(committees_data.get("lords_committee_memberships", [])),
+        },
+    }
+
+
+def government_roles_payload(gov_roles_data: DataDict, current: bool, date_filters: dict[str, str]) -> DataDict:
+    """Build the government roles response body."""
+    return {
+        "metadata": {
+            "scraped_at": datetime.now(timezone.utc).isoformat(),
+            "data_type": "Government Roles",
+            "filter_current": current,
+            "from_date": date_filters.get("from_date"),
+            "to_date": date_filters.get("to_date"),
+            "on_date": date_filters.get("on_date"),
+        },
+        "government_roles": gov_roles_data,
+        "summary": {
+            "total_mps_government_roles": len(gov_roles_data.get("mps_government_roles", [])),
+            "total_lords_government_roles": len(gov_roles_data.get("lords_government_roles", [])),
+        },
+    }
+
+
+def paged_payload(payload: DataDict, page: Page, limit: int, after: str | None) -> DataDict:
+    """Add the pagination block to a response body built from one page of rows."""
+    payload["pagination"] = {
+        "limit": limit,
+        "after": after,
+        "next_cursor": page.next_cursor,
+        "total_count": page.total_count,
+    }
+    return payload
+
+
+def invalid_page_payload(error: InvalidPageError) -> DataDict:
+    """Build the error response body for pagination parameters that cannot be served."""
+    return {
+        "error": "Invalid pagination parameters",
+        "message": str(error),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def invalid_fields_payload(error: InvalidFieldsError) -> DataDict:
+    """Build the error response body for a fields projection naming no column of the data."""
+    return {
+        "error": "Invalid fields parameter",
+        "message": str(error),
+        "valid_fields": error.valid_fields,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def invalid_export_type_payload() -> DataDict:
+    """Build the error response body for an unknown export data type."""
+    return {
+        "error": "Invalid data type",
+        "message": f"Data type must be one of: {', '.join(EXPORT_TYPES)}",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def export_payload(data_type: str, exported_files: FileList) -> DataDict:
+    """Build the CSV export response body."""
+    return {
+        "success": True,
+        "message": f"Successfully exported {data_type} data to CSV",
+        "data_type": data_type,
+        "exported_files": [Path(f).name for f in exported_files],
+        "file_count": len(exported_files),
+        "output_directory": "outputs/",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+class DatasetResponse(NamedTuple):
+    """A /scrape/* route's response, built alike for the WSGI routes and the ASGI app.
+
+    Attributes:
+        body: Payload to send as JSON, or the data to pass to stream
+        status: HTTP status code
+        stream: stream_json or stream_ndjson to send body as it is built, or None to send it whole
+        mimetype: Content type of a streamed body
+    """
+
+    body: Any
+    status: int = 200
+    stream: Callable[[Any], Iterator[bytes]] | None = None
+    mimetype: str = "application/json"
+
+
+def dataset_response(source: UKGovernmentScraper, route: str, args: Mapping[str, str]) -> DatasetResponse:
+    """Build the response of a /scrape/* route from its query parameters.
+
+    Invalid pagination or fields parameters are answered with 400, and any
+    other error is logged and answered with 500.
+
+    Args:
+        source: Scraper answering the request
+        route: Route name in DATASET_ROUTES, which is also its key in ROUTE_ERRORS
+        args: Query parameters
+    """
+    try:
+        return DATASET_ROUTES[route](source, args)
+    except InvalidPageError as e:
+        return DatasetResponse(invalid_page_payload(e), 400)
+    except InvalidFieldsError as e:
+        return DatasetResponse(invalid_fields_payload(e), 400)
+    except Exception:
+        logger.exception("Error in %s endpoint", route)
+        return DatasetResponse(error_payload(route), 500)
+
+
+def _all_data_response(source: UKGovernmentScraper, args: Mapping[str, str]) -> DatasetResponse:
+    """Answer /scrape/all with the normalized, streamed, cached or freshly scraped all-data payload."""
+    current = query_flag(args, "current")
+    if query_flag(args, "normalized"):
+        return DatasetResponse(source.scrape_normalized_data(current=current))
+    if query_flag(args, "stream"):
+        return DatasetResponse(source.all_data_views(current=current), stream=stream_json)
+
+    cached = source.cached_all_data() if query_flag(args, "cache") else None
+    if cached is not None:
+        logger.info("Returning cached data")
+        return DatasetResponse(cached)
+    return DatasetResponse(source.scrape_all_data(current=current))
+
+
+def _table_response(args: Mapping[str, str], views: Callable[[], Any], scrape: Callable[..., Any],
+                    payload: Callable[[Any], DataDict], key: str | None = None) -> DatasetResponse:
+    """Answer a table route as NDJSON, as one page of rows, or with all its rows, projected to fields=.
+
+    Args:
+        args: Query parameters
+        views: Returns the route's view, or its views by dataset name
+        scrape: Returns the route's rows, given the fields projection
+        payload: Builds the response body from the rows
+        key: Dataset name under which a route with a single view is paginated
+    """
+    projection = query_fields(args)
+    if query_ndjson(args):
+        rows = project(views(), projection.get("fields"))
+        return DatasetResponse(rows, stream=stream_ndjson, mimetype=NDJSON_MIMETYPE)
+
+    page_params = query_page(args)
+    if page_params is None:
+        return DatasetResponse(payload(scrape(**projection)))
+    datasets = project(views(), projection.get("fields"))
+    page = paginate(datasets if key is None else {key: datasets}, *page_params)
+    rows = page.rows if key is None else page.rows[key]
+    return DatasetResponse(paged_payload(payload(rows), page, *page_params))
+
+
+def _members_response(args: Mapping[str, str], views: Callable[..., Any], scrape: Callable[..., Any],
+                      data_type: str, data_key: str) -> DatasetResponse:
+    """Answer a house's member route (/scrape/mps or /scrape/lords)."""
+    current = query_flag(args, "current")
+    dates = {name: args.get(name) for name in ("from_date", "to_date", "on_date")}
+    return _table_response(
+        args,
+        partial(views, current=current, **dates),
+        partial(scrape, current=current, **dates),
+        lambda rows: members_payload(data_type, data_key, rows, current, **dates),
+        key=data_key,
+    )
+
+
+def _grouped_response(args: Mapping[str, str], views: Callable[..., Any], scrape: Callable[..., Any],
+                      payload: Callable[[Any, bool, dict[str, str]], DataDict]) -> DatasetResponse:
+    """Answer a route whose rows are grouped by house (/scrape/committees or /scrape/government-roles)."""
+    current = query_flag(args, "current")
+    date_filters = query_date_filters(args)
+    return _table_response(
+        args,
+        partial(views, current=current, **date_filters),
+        partial(scrape, current=current, **date_filters),
+        lambda rows: payload(rows, current, date_filters),
+    )
+
+
+# Route name -> builds the route's DatasetResponse from the scraper and query parameters
+DATASET_ROUTES: dict[str, Callable[[UKGovernmentScraper, Mapping[str, str]], DatasetResponse]] = {
+    "scrape_all": _all_data_response,
+    "scrape_mps": lambda source, args: _members_response(
+        args, source.mps_view, source.scrape_mps, "Members of Parliament - House of Commons", "members_of_parliament",
+    ),
+    "scrape_lords": lambda source, args: _members_response(
+        args, source.lords_view, source.scrape_lords, "Members of House of Lords", "house_of_lords",
+    ),
+    "scrape_committees": lambda source, args: _grouped_response(
+        args, source.committee_membership_views, source.scrape_committee_memberships, committees_payload,
+    ),
+    "scrape_government_roles": lambda source, args: _grouped_response(
+        args, source.government_roles_views, source.scrape_government_roles, government_roles_payload,
+    ),
+}
+
+
+def dataset_view(route: str) -> tuple[Any, int]:
+    """Answer the current WSGI request to a /scrape/* route."""
+    response = dataset_response(scraper, route, request.args)
+    if response.stream is not None:
+        return app.response_class(response.stream(response.body), mimetype=response.mimetype), response.status
+    return jsonify(response.body), response.status
+
+
+@app.before_request
+def start_cache_tracking() -> None:
+    """Start collecting the cache lookups made, and table entries read, while handling this request."""
+    _cache_lookups.set([])
+    _tables_read.set([])
+
+
+@app.before_request
+def answer_not_modified() -> Any:
+    """Answer a conditional request for unchanged dataset data with 304 Not Modified, unserialized."""
+    etag = dataset_etag(scraper, request.path, request.args)
+    if not not_modified(request.headers.get("If-None-Match"), etag):
+        return None
+    scraper.revalidate(ETAG_DATASETS[request.path])
+    response = app.response_class(status=304)
+    response.headers["ETag"] = etag_header(etag)
+    return response
+
+
+@app.after_request
+def add_cache_headers(response: Any) -> Any:
+    """Report the age and staleness of cached data served by this request."""
+    response.headers.update(cache_headers(_cache_lookups.get()))
+    _cache_lookups.set(None)
+    return response
+
+
+@app.after_request
+def add_etag(response: Any) -> Any:
+    """Tag a dataset response with the ETag of the table entries it was built from."""
+    if response.status_code == HTTPStatus.OK:
+        etag = dataset_etag(scraper, request.path, request.args, _tables_read.get())
+        if etag is not None:
+            response.headers["ETag"] = etag_header(etag)
+    _tables_read.set(None)
+    return response
 
 
 @app.route("/")
 def index() -> Any:
     """Health check and API information endpoint."""
-    return jsonify(
-        {
-            "service": "UK Government Members Scraper",
-            "status": "active",
-            "version": "1.0.0",
-            "endpoints": {
-                "/scrape/all": "Scrape all government members and employees (supports ?current=true&cache=true)",
-                "/scrape/mps": "Scrape only MPs from House of Commons "
-                               "(supports ?current=true&from_date=YYYY-MM-DD&to_date=YYYY-MM-DD&on_date=YYYY-MM-DD)",
-                "/scrape/lords": "Scrape only members of House of Lords "
-                                 "(supports ?current=true&from_date=YYYY-MM-DD&to_date=YYYY-MM-DD&on_date=YYYY-MM-DD)",
-                "/scrape/committees": "Scrape committee memberships (supports ?current=true)",
-                "/scrape/government-roles": "Scrape government roles (supports ?current=true)",
-                "/health": "Service health check",
-                "/export/csv": "Export scraped data to CSV files "
-                               "(supports ?type=all|mps|lords|government-roles|committees&current=true)",
-            },
-            "query_parameters": {
-                "current": "Boolean - filter to only current members/roles (default: false)",
-                "from_date": "String - get members from this date onwards (YYYY-MM-DD format)",
-                "to_date": "String - get members up to this date (YYYY-MM-DD format)",
-                "on_date": "String - get members serving on specific date (YYYY-MM-DD format)",
-                "cache": "Boolean - use cached data if available (default: false, only for /scrape/all)",
-                "type": "String - data type to export (default: all, only for /export/csv)",
-            },
-            "last_updated": scraper.last_updated.isoformat() if scraper.last_updated else None,
-        },
-    )
+    return jsonify(index_payload())
 
 
 @app.route("/health")
 def health() -> Any:
     """Service health check."""
-    return jsonify(
-        {
-            "status": "healthy",
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "cache_status": "populated" if scraper.cache else "empty",
-        },
-    )
+    return jsonify(health_payload())
+
+
+@app.route("/ready")
+def ready() -> tuple[Any, int]:
+    """Readiness check for load balancers."""
+    payload = readiness_payload()
+    return jsonify(payload), 200 if payload["ready"] else 503
 
 
 @app.route("/scrape/all")
 def scrape_all() -> tuple[Any, int]:
     """Scrape all UK government members and employees."""
-    try:
-        # Check if we should use cached data (optional query parameter)
-        use_cache = request.args.get("cache", "false").lower() == "true"
-        current = request.args.get("current", "false").lower() == "true"
-
-        if use_cache and "all" in scraper.cache:
-            logger.info("Returning cached data")
-            return jsonify(scraper.cache["all"]), 200
-
-        # Perform fresh scrape
-        data = scraper.scrape_all_data(current=current)
-        return jsonify(data), 200
-
-    except Exception:
-        logger.exception("Error in scrape_all endpoint")
-        return jsonify(
-            {
-                "error": "Failed to scrape data",
-                "message": "An error occurred while scraping data",
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            },
-        ), 500
+    return dataset_view("scrape_all")
 
 
 @app.route("/scrape/mps")
 def scrape_mps_endpoint() -> tuple[Any, int]:
     """Scrape only Members of Parliament from House of Commons."""
-    try:
-        # Get optional query parameters
-        current = request.args.get("current", "false").lower() == "true"
-        from_date = request.args.get("from_date")
-        to_date = request.args.get("to_date")
-        on_date = request.args.get("on_date")
-
-        mps_data = scraper.scrape_mps(current=current, from_date=from_date, to_date=to_date, on_date=on_date)
-        
-        return jsonify(
-            {
-                "metadata": {
-                    "scraped_at": datetime.now(timezone.utc).isoformat(),
-                    "data_type": "Members of Parliament - House of Commons",
-                    "filter_current": current,
-                    "from_date": from_date,
-                    "to_date": to_date,
-                    "on_date": on_date,
-                },
-                "members_of_parliament": mps_data,
-                "summary": {
-                    "total_count": len(mps_data),
-                },
-            },
-        ), 200
-    except Exception:
-        logger.exception("Error in scrape_mps endpoint")
-        return jsonify(
-            {
-                "error": "Failed to scrape MPs data",
-                "message": "An error occurred while scraping MPs data",
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            },
-        ), 500
+    return dataset_view("scrape_mps")
 
 
 @app.route("/scrape/lords")
 def scrape_lords_endpoint() -> tuple[Any, int]:
     """Scrape only members of House of Lords."""
-    try:
-        # Get optional query parameters
-        current = request.args.get("current", "false").lower() == "true"
-        from_date = request.args.get("from_date")
-        to_date = request.args.get("to_date")
-        on_date = request.args.get("on_date")
-
-        lords_data = scraper.scrape_lords(current=current, from_date=from_date, to_date=to_date, on_date=on_date)
-        
-        return jsonify(
-            {
-                "metadata": {
-                    "scraped_at": datetime.now(timezone.utc).isoformat(),
-                    "data_type": "Members of House of Lords",
-                    "filter_current": current,
-                    "from_date": from_date,
-                    "to_date": to_date,
-                    "on_date": on_date,
-                },
-                "house_of_lords": lords_data,
-                "summary": {
-                    "total_count": len(lords_data),
-                },
-            },
-        ), 200
-    except Exception:
-        logger.exception("Error in scrape_lords endpoint")
-        return jsonify(
-            {
-                "error": "Failed to scrape Lords data",
-                "message": "An error occurred while scraping Lords data",
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            },
-        ), 500
+    return dataset_view("scrape_lords")
 
 
 @app.route("/scrape/committees")
 def scrape_committees() -> tuple[Any, int]:
     """Scrape committee memberships."""
-    try:
-        # Get optional query parameter for current filter
-        current = request.args.get("current", "false").lower() == "true"
-        
-        committees_data = scraper.scrape_committee_memberships(current=current)
-        return jsonify(
-            {
-                "metadata": {
-                    "scraped_at": datetime.now(timezone.utc).isoformat(),
-                    "data_type": "Committee Memberships",
-                    "filter_current": current,
-                },
-                "committee_memberships": committees_data,
-                "summary": {
-                    "total_mps_committee_memberships": len(committees_data.get("mps_committee_memberships", [])),
-                    "total_lords_committee_memberships": len(committees_data.get("lords_committee_memberships", [])),
-                },
-            },
-        ), 200
-    except Exception:
-        logger.exception("Error in scrape_committees endpoint")
-        return jsonify(
-            {
-                "error": "Failed to scrape committees data",
-                "message": "An error occurred while scraping committees data",
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            },
-        ), 500
+    return dataset_view("scrape_committees")
 
 
 @app.route("/scrape/government-roles")
 def scrape_government_roles_endpoint() -> tuple[Any, int]:
     """Scrape government roles."""
+    return dataset_view("scrape_government_roles")
+
+
+@app.route("/person/<path:person_id>")
+def person_endpoint(person_id: str) -> tuple[Any, int]:
+    """Consolidated profile of one person."""
     try:
-        # Get optional query parameter for current filter
-        current = request.args.get("current", "false").lower() == "true"
-        
-        gov_roles_data = scraper.scrape_government_roles(current=current)
-        return jsonify(
-            {
-                "metadata": {
-                    "scraped_at": datetime.now(timezone.utc).isoformat(),
-                    "data_type": "Government Roles",
-                    "filter_current": current,
-                },
-                "government_roles": gov_roles_data,
-                "summary": {
-                    "total_mps_government_roles": len(gov_roles_data.get("mps_government_roles", [])),
-                    "total_lords_government_roles": len(gov_roles_data.get("lords_government_roles", [])),
-                },
-            },
-        ), 200
+        profile = scraper.person_profile(person_id)
+        if profile is None:
+            return jsonify(error_payload("person_not_found")), 404
+        return jsonify(profile), 200
     except Exception:
-        logger.exception("Error in scrape_government_roles endpoint")
-        return jsonify(
-            {
-                "error": "Failed to scrape government roles data",
-                "message": "An error occurred while scraping government roles data",
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            },
-        ), 500
+        logger.exception("Error in person endpoint")
+        return jsonify(error_payload("person")), 500
 
 
 @app.route("/export/csv", methods=["POST", "GET"])
@@ -635,73 +1968,38 @@ def export_csv() -> tuple[Any, int]:
     try:
         # Get data type from query parameter, default to 'all'
         data_type = request.args.get("type", "all")
-        current = request.args.get("current", "false").lower() == "true"
-        
+        current = query_flag(request.args, "current")
+
         # Get date filtering parameters (only applicable for mps and lords)
         from_date = request.args.get("from_date")
         to_date = request.args.get("to_date")
         on_date = request.args.get("on_date")
 
         # Validate data type
-        valid_types = ["all", "mps", "lords", "government-roles", "committees"]
-        if data_type not in valid_types:
-            return jsonify(
-                {
-                    "error": "Invalid data type",
-                    "message": f"Data type must be one of: {', '.join(valid_types)}",
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                },
-            ), 400
+        if data_type not in EXPORT_TYPES:
+            return jsonify(invalid_export_type_payload()), 400
 
         # Export to CSV
         exported_files = scraper.export_to_csv(data_type, current, from_date, to_date, on_date)
-
-        return jsonify(
-            {
-                "success": True,
-                "message": f"Successfully exported {data_type} data to CSV",
-                "data_type": data_type,
-                "exported_files": [Path(f).name for f in exported_files],
-                "file_count": len(exported_files),
-                "output_directory": "outputs/",
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            },
-        ), 200
+        return jsonify(export_payload(data_type, exported_files)), 200
 
     except Exception:
         logger.exception("Error in export_csv endpoint")
-        return jsonify(
-            {
-                "error": "Failed to export CSV files",
-                "message": "An error occurred while exporting CSV files",
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            },
-        ), 500
+        return jsonify(error_payload("export_csv")), 500
 
 
 @app.errorhandler(404)
 def not_found(_error: Any) -> tuple[Any, int]:
     """Handle 404 errors."""
-    return jsonify(
-        {
-            "error": "Endpoint not found",
-            "message": "The requested endpoint does not exist",
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        },
-    ), 404
+    return jsonify(error_payload("not_found")), 404
 
 
 @app.errorhandler(500)
 def internal_error(_error: Any) -> tuple[Any, int]:
     """Handle 500 errors."""
-    return jsonify(
-        {
-            "error": "Internal server error",
-            "message": "An unexpected error occurred",
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        },
-    ), 500
+    return jsonify(error_payload("internal_error")), 500
 
 
 if __name__ == "__main__":
+    start_warm_up()
     app.run(debug=False, host="127.0.0.1", port=5001)
@@ -0,0 +1,432 @@
+"""ASGI serving mode for the UK Government Scraper.
+
+Serves the same routes as the WSGI ``app:app`` from an asyncio event loop, so
+slow upstream scrapes never block other requests and idle connections waiting
+on data cost a coroutine rather than a thread. Run with an ASGI server, e.g.::
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5001
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+from collections.abc import Awaitable, Callable, Hashable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http import HTTPStatus
+from typing import Any, NamedTuple
+from urllib.parse import parse_qsl
+
+import app as service
+from app import (
+    ETAG_DATASETS,
+    EXPORT_TYPES,
+    DataDict,
+    DatasetResponse,
+    FileList,
+    RequestReads,
+    UKGovernmentScraper,
+    cache_headers,
+    dataset_etag,
+    dataset_response,
+    error_payload,
+    etag_header,
+    export_payload,
+    health_payload,
+    index_payload,
+    invalid_export_type_payload,
+    not_modified,
+    query_flag,
+    readiness_payload,
+    record_reads,
+    settings,
+    track_reads,
+)
+
+logger = logging.getLogger(__name__)
+
+# ASGI send/receive callables and a handler's (body, status) result
+Send = Callable[[dict[str, Any]], Awaitable[None]]
+Receive = Callable[[], Awaitable[dict[str, Any]]]
+Handler = Callable[[dict[str, str]], Awaitable[tuple[Any, int]]]
+
+
+class Streamed(NamedTuple):
+    """A handler's response body to stream as it is built, and its content type."""
+
+    chunks: Iterator[bytes]
+    content_type: str = "application/json"
+
+
+def _tracked_call(fn: Callable[[], Any]) -> tuple[Any, RequestReads]:
+    """Run fn, returning its result with the cache lookups it made and the table entries it read."""
+    with track_reads() as reads:
+        return fn(), reads
+
+
+class AsyncUKGovernmentScraper:
+    """Asyncio counterpart to UKGovernmentScraper.
+
+    Each scrape runs the blocking synchronous scraper on a bounded thread pool,
+    sharing its cache. Identical scrapes awaited at the same time are
+    coalesced into one pool job, so many requests waiting on the same data
+    hold no threads.
+    """
+
+    def __init__(self, scraper: UKGovernmentScraper | None = None, max_workers: int | None = None) -> None:
+        """Initialize around a synchronous scraper.
+
+        Args:
+            scraper: Scraper whose cache and fetches are shared (defaults to the WSGI app's scraper)
+            max_workers: Scrapes allowed to run at once (defaults to ASGI_WORKERS)
+        """
+        self.scraper = service.scraper if scraper is None else scraper
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.ASGI_WORKERS if max_workers is None else max_workers,
+            thread_name_prefix="async-scrape",
+        )
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+
+    @property
+    def cache(self) -> Any:
+        """The shared scraper cache."""
+        return self.scraper.cache
+
+    async def _run(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """Run a scraper method off the event loop, joining an identical call in flight."""
+        key = (method, args, tuple(sorted(kwargs.items())))
+        return await self._join(key, partial(getattr(self.scraper, method), *args, **kwargs))
+
+    async def _join(self, key: Hashable, call: Callable[[], Any]) -> Any:
+        """Run call on the scrape pool, or join the call in flight under the same key."""
+        loop = asyncio.get_running_loop()
+        future = self._inflight.get(key)
+        if future is None or future.get_loop() is not loop:
+            future = loop.run_in_executor(
+                self._executor, contextvars.copy_context().run, _tracked_call, call,
+            )
+            self._inflight[key] = future
+            future.add_done_callback(partial(self._finish, key))
+
+        # Shield the shared call so one waiter's cancellation does not cancel it for the rest
+        result, reads = await asyncio.shield(future)
+        record_reads(reads)
+        return result
+
+    def _finish(self, key: Hashable, future: asyncio.Future) -> None:
+        """Forget a finished call unless a newer one has replaced it."""
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    async def scrape_mps(self, current: bool = False, from_date: str | None = None, to_date: str | None = None,
+                         on_date: str | None = None, **projection: tuple[str, ...]) -> list[dict[str, Any]]:
+        """Scrape Members of Parliament; see UKGovernmentScraper.scrape_mps."""
+        return await self._run("scrape_mps", current=current, from_date=from_date, to_date=to_date, on_date=on_date,
+                               **projection)
+
+    async def scrape_lords(self, current: bool = False, from_date: str | None = None, to_date: str | None = None,
+                           on_date: str | None = None, **projection: tuple[str, ...]) -> list[dict[str, Any]]:
+        """Scrape members of the House of Lords; see UKGovernmentScraper.scrape_lords."""
+        return await self._run("scrape_lords", current=current, from_date=from_date, to_date=to_date, on_date=on_date,
+                               **projection)
+
+    async def mps_view(self, current: bool = False, from_date: str | None = None,
+                       to_date: str | None = None, on_date: str | None = None) -> Any:
+        """Return the view behind scrape_mps; see UKGovernmentScraper.mps_view."""
+        return await self._run("mps_view", current=current, from_date=from_date, to_date=to_date, on_date=on_date)
+
+    async def lords_view(self, current: bool = False, from_date: str | None = None,
+                         to_date: str | None = None, on_date: str | None = None) -> Any:
+        """Return the view behind scrape_lords; see UKGovernmentScraper.lords_view."""
+        return await self._run("lords_view", current=current, from_date=from_date, to_date=to_date, on_date=on_date)
+
+    async def government_roles_views(self, current: bool = False, **date_filters: str) -> DataDict:
+        """Return the views behind scrape_government_roles; see UKGovernmentScraper.government_roles_views."""
+        return await self._run("government_roles_views", current=current, **date_filters)
+
+    async def committee_membership_views(self, current: bool = False, **date_filters: str) -> DataDict:
+        """Return committee membership views; see UKGovernmentScraper.committee_membership_views."""
+        return await self._run("committee_membership_views", current=current, **date_filters)
+
+    async def scrape_government_roles(self, current: bool = False, **filters: Any) -> DataDict:
+        """Scrape government roles; see UKGovernmentScraper.scrape_government_roles."""
+        return await self._run("scrape_government_roles", current=current, **filters)
+
+    async def scrape_committee_memberships(self, current: bool = False, **filters: Any) -> DataDict:
+        """Scrape committee memberships; see UKGovernmentScraper.scrape_committee_memberships."""
+        return await self._run("scrape_committee_memberships", current=current, **filters)
+
+    async def scrape_all_data(self, current: bool = False) -> DataDict:
+        """Scrape all datasets; see UKGovernmentScraper.scrape_all_data."""
+        return await self._run("scrape_all_data", current=current)
+
+    async def all_data_views(self, current: bool = False) -> DataDict:
+        """Build the views behind a streamed all-data payload; see UKGovernmentScraper.all_data_views."""
+        return await self._run("all_data_views", current=current)
+
+    async def health_payload(self) -> DataDict:
+        """Build the health payload off the event loop, as it reads the snapshot store's files.
+
+        It runs on the loop's default pool rather than the scrape pool, so health
+        checks are answered while every scrape worker is busy.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, health_payload)
+
+    async def dataset_response(self, route: str, args: dict[str, str]) -> DatasetResponse:
+        """Build a /scrape/* route's response off the event loop; see app.dataset_response."""
+        key = ("dataset_response", route, tuple(sorted(args.items())))
+        return await self._join(key, partial(dataset_response, self.scraper, route, dict(args)))
+
+    async def encode(self, body: Any) -> bytes:
+        """Encode a JSON response body off the event loop, as large payloads take a while to serialize.
+
+        Like health_payload it runs on the loop's default pool, so a health
+        check's body is still encoded while every scrape worker is busy.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, service.app.json.encode, body)
+
+    async def next_chunk(self, chunks: Iterator[bytes]) -> bytes | None:
+        """Build the next piece of a streamed response off the event loop; None once it is done."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, contextvars.copy_context().run, next, chunks, None,
+        )
+
+    async def scrape_normalized_data(self, current: bool = False) -> DataDict:
+        """Build the normalized all-data payload; see UKGovernmentScraper.scrape_normalized_data."""
+        return await self._run("scrape_normalized_data", current=current)
+
+    async def person_profile(self, person_id: str) -> DataDict | None:
+        """Look up one person's profile; see UKGovernmentScraper.person_profile."""
+        return await self._run("person_profile", person_id)
+
+    async def export_to_csv(self, data_type: str = "all", current: bool = False, from_date: str | None = None,
+                            to_date: str | None = None, on_date: str | None = None) -> FileList:
+        """Export data to CSV files; see UKGovernmentScraper.export_to_csv."""
+        return await self._run("export_to_csv", data_type, current, from_date, to_date, on_date)
+
+
+async_scraper = AsyncUKGovernmentScraper()
+
+
+async def index(_args: dict[str, str]) -> tuple[Any, int]:
+    """Health check and API information endpoint."""
+    return index_payload(), 200
+
+
+async def health(_args: dict[str, str]) -> tuple[Any, int]:
+    """Service health check."""
+    return await async_scraper.health_payload(), 200
+
+
+async def ready(_args: dict[str, str]) -> tuple[Any, int]:
+    """Readiness check for load balancers."""
+    payload = readiness_payload()
+    return payload, 200 if payload["ready"] else 503
+
+
+async def _dataset(route: str, args: dict[str, str]) -> tuple[Any, int]:
+    """Answer a /scrape/* route, streaming the body when its response asks for that."""
+    response = await async_scraper.dataset_response(route, args)
+    if response.stream is not None:
+        return Streamed(response.stream(response.body), response.mimetype), response.status
+    return response.body, response.status
+
+
+async def scrape_all(args: dict[str, str]) -> tuple[Any, int]:
+    """Scrape all UK government members and employees."""
+    return await _dataset("scrape_all", args)
+
+
+async def scrape_mps_endpoint(args: dict[str, str]) -> tuple[Any, int]:
+    """Scrape only Members of Parliament from House of Commons."""
+    return await _dataset("scrape_mps", args)
+
+
+async def scrape_lords_endpoint(args: dict[str, str]) -> tuple[Any, int]:
+    """Scrape only members of House of Lords."""
+    return await _dataset("scrape_lords", args)
+
+
+async def scrape_committees(args: dict[str, str]) -> tuple[Any, int]:
+    """Scrape committee memberships."""
+    return await _dataset("scrape_committees", args)
+
+
+async def scrape_government_roles_endpoint(args: dict[str, str]) -> tuple[Any, int]:
+    """Scrape government roles."""
+    return await _dataset("scrape_government_roles", args)
+
+
+async def person_endpoint(args: dict[str, str]) -> tuple[Any, int]:
+    """Consolidated profile of one person."""
+    try:
+        profile = await async_scraper.person_profile(args["person_id"])
+    except Exception:
+        logger.exception("Error in person endpoint")
+        return error_payload("person"), 500
+    else:
+        if profile is None:
+            return error_payload("person_not_found"), 404
+        return profile, 200
+
+
+async def export_csv(args: dict[str, str]) -> tuple[Any, int]:
+    """Export data to CSV files in outputs folder."""
+    try:
+        data_type = args.get("type", "all")
+        current = query_flag(args, "current")
+        if data_type not in EXPORT_TYPES:
+            return invalid_export_type_payload(), 400
+
+        exported_files = await async_scraper.export_to_csv(
+            data_type, current, args.get("from_date"), args.get("to_date"), args.get("on_date"),
+        )
+        return export_payload(data_type, exported_files), 200
+    except Exception:
+        logger.exception("Error in export_csv endpoint")
+        return error_payload("export_csv"), 500
+
+
+# path -> (allowed methods, handler), mirroring the WSGI routes
+ROUTES: dict[str, tuple[frozenset[str], Handler]] = {
+    "/": (frozenset({"GET", "HEAD"}), index),
+    "/health": (frozenset({"GET", "HEAD"}), health),
+    "/ready": (frozenset({"GET", "HEAD"}), ready),
+    "/scrape/all": (frozenset({"GET", "HEAD"}), scrape_all),
+    "/scrape/mps": (frozenset({"GET", "HEAD"}), scrape_mps_endpoint),
+    "/scrape/lords": (frozenset({"GET", "HEAD"}), scrape_lords_endpoint),
+    "/scrape/committees": (frozenset({"GET", "HEAD"}), scrape_committees),
+    "/scrape/government-roles": (frozenset({"GET", "HEAD"}), scrape_government_roles_endpoint),
+    "/export/csv": (frozenset({"GET", "HEAD", "POST"}), export_csv),
+}
+
+# path prefix -> (allowed methods, handler, argument receiving the rest of the path)
+PREFIX_ROUTES: dict[str, tuple[frozenset[str], Handler, str]] = {
+    "/person/": (frozenset({"GET", "HEAD"}), person_endpoint, "person_id"),
+}
+
+
+async def _send_json(send: Send, body: Any, status: int, headers: dict[str, str] | None = None,
+                     include_body: bool = True) -> None:
+    """Send a JSON response encoded the same way as the WSGI app's jsonify."""
+    encoded = await async_scraper.encode(body) + b"\n"
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": _raw_headers(headers, [(b"content-length", str(len(encoded)).encode("latin-1"))]),
+    })
+    await send({"type": "http.response.body", "body": encoded if include_body else b""})
+
+
+async def _send_stream(send: Send, body: Streamed, status: int, headers: dict[str, str] | None = None,
+                       include_body: bool = True) -> None:
+    """Send a streamed response, one body message per piece its chunks yield."""
+    raw_headers = _raw_headers(headers, content_type=body.content_type)
+    await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+    if include_body:
+        while (chunk := await async_scraper.next_chunk(body.chunks)) is not None:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _send_not_modified(send: Send, headers: dict[str, str]) -> None:
+    """Send a 304 Not Modified response, which has no body."""
+    await send({"type": "http.response.start", "status": 304, "headers": _raw_headers(headers, content_type=None)})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def _raw_headers(headers: dict[str, str] | None, extra: list[tuple[bytes, bytes]] | None = None,
+                 content_type: str | None = "application/json") -> list[tuple[bytes, bytes]]:
+    """Return a response's ASGI headers: content type (if any), extra, then headers."""
+    raw_headers = [] if content_type is None else [(b"content-type", content_type.encode("latin-1"))]
+    raw_headers += extra or []
+    raw_headers += [
+        (name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in (headers or {}).items()
+    ]
+    return raw_headers
+
+
+async def _lifespan(receive: Receive, send: Send) -> None:
+    """Start the warm-up and refresh scheduler with the server and stop the scheduler on shutdown."""
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            service.start_warm_up()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            service.refresh_scheduler.stop(timeout=5)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+def _route(path: str) -> tuple[frozenset[str], Handler, dict[str, str]] | None:
+    """Return the allowed methods, handler and path arguments of a path, or None if no route matches."""
+    route = ROUTES.get(path)
+    if route is not None:
+        return *route, {}
+    for prefix, (methods, handler, arg) in PREFIX_ROUTES.items():
+        if path.startswith(prefix) and len(path) > len(prefix):
+            return methods, handler, {arg: path[len(prefix):]}
+    return None
+
+
+def _query_args(scope: dict[str, Any]) -> dict[str, str]:
+    """Return a request's query parameters; the first value wins for repeated ones, as with Flask's request.args."""
+    args: dict[str, str] = {}
+    for name, value in parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True):
+        args.setdefault(name, value)
+    return args
+
+
+def _header(scope: dict[str, Any], name: bytes) -> str:
+    """Return a request header's values joined with commas, or an empty string if it is absent."""
+    return ", ".join(value.decode("latin-1") for key, value in scope.get("headers", []) if key.lower() == name)
+
+
+async def _handle(handler: Handler, args: dict[str, str], path: str) -> tuple[Any, int, dict[str, str]]:
+    """Run a route handler, returning its body and status with the cache and ETag headers for them."""
+    with track_reads() as reads:
+        try:
+            body, status = await handler(args)
+        except Exception:
+            logger.exception("Unhandled error serving %s", path)
+            body, status = error_payload("internal_error"), 500
+    headers = cache_headers(reads.lookups)
+    etag = dataset_etag(async_scraper.scraper, path, args, reads.tables) if status == HTTPStatus.OK else None
+    if etag is not None:
+        headers["ETag"] = etag_header(etag)
+    return body, status, headers
+
+
+async def app(scope: dict[str, Any], receive: Receive, send: Send) -> None:
+    """ASGI application serving the scraper routes."""
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    path, method = scope["path"], scope["method"]
+    route = _route(path)
+    if route is None:
+        await _send_json(send, error_payload("not_found"), 404)
+        return
+    methods, handler, path_args = route
+    if method not in methods:
+        await _send_json(send, {"error": "Method not allowed"}, 405, {"Allow": ", ".join(sorted(methods))})
+        return
+
+    args = {**_query_args(scope), **path_args}
+    etag = dataset_etag(async_scraper.scraper, path, args)
+    if not_modified(_header(scope, b"if-none-match"), etag):
+        async_scraper.scraper.revalidate(ETAG_DATASETS[path])
+        await _send_not_modified(send, {"ETag": etag_header(etag)})
+        return
+
+    body, status, headers = await _handle(handler, args, path)
+    if isinstance(body, Streamed):
+        await _send_stream(send, body, status, headers, include_body=method != "HEAD")
+        return
+    await _send_json(send, body, status, headers, include_body=method != "HEAD")
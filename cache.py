@@ -0,0 +1,486 @@
+"""Cache engine for the UK Government Scraper.
+
+Provides a thread-safe mapping with per-entry TTL, a byte-size budget with
+LRU eviction, and hit/miss/eviction counters, plus a single-flight helper that
+coalesces identical concurrent upstream fetches. FileCache extends both ideas
+across processes on one host, so server workers share upstream fetches.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import itertools
+import os
+import pickle
+import stat
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterator, MutableMapping
+from pathlib import Path
+from typing import Any, NamedTuple
+from urllib.parse import quote
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
+# Upper bound on how many items of a container are inspected when estimating size
+_SIZE_SAMPLE_LIMIT = 1000
+
+
+def estimate_size(value: Any) -> int:
+    """Estimate the resident size of a cached value in bytes.
+
+    DataFrames report their deep memory usage. Lists, tuples and dicts are
+    measured from a sample of their items and extrapolated, so estimating a
+    large records list stays cheap.
+    """
+    if hasattr(value, "memory_usage") and hasattr(value, "columns"):
+        return int(value.memory_usage(index=True, deep=True).sum())
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        sample = list(itertools.islice(value.items(), _SIZE_SAMPLE_LIMIT))
+        sampled = sum(estimate_size(k) + estimate_size(v) for k, v in sample)
+    elif isinstance(value, (list, tuple)):
+        sample = list(itertools.islice(value, _SIZE_SAMPLE_LIMIT))
+        sampled = sum(estimate_size(item) for item in sample)
+    else:
+        return size
+
+    if sample:
+        size += sampled * len(value) // len(sample)
+    return size
+
+
+class CacheEntry(NamedTuple):
+    """A stored value with its bookkeeping."""
+
+    value: Any
+    size: int
+    stored_at: float
+    expires_at: float
+
+
+class TTLCache(MutableMapping):
+    """Thread-safe mapping with per-entry TTL and an LRU-evicted byte budget.
+
+    Reads refresh an entry's recency; writes evict least recently used entries
+    until the total estimated size fits ``max_bytes``. Entries older than their
+    TTL are dropped lazily when touched and on every write.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_bytes: int,
+        sizeof: Callable[[Any], int] = estimate_size,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            ttl: Default time to live for entries, in seconds
+            max_bytes: Total size budget across all entries, in bytes
+            sizeof: Function estimating the size of a value in bytes
+            clock: Monotonic clock used for expiry, in seconds
+        """
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._clock = clock
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.RLock()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def after_fork(self) -> None:
+        """Replace the lock in a forked child process, where a parent thread may have held it at fork time."""
+        self._lock = threading.RLock()
+
+    def _remove(self, key: str) -> CacheEntry:
+        """Remove an entry and release its size. Caller holds the lock."""
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry.size
+        return entry
+
+    def _live_entry(self, key: str) -> CacheEntry | None:
+        """Return the entry for key if present and unexpired. Caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= self._clock():
+            self._remove(key)
+            self.expirations += 1
+            return None
+        return entry
+
+    def _purge_expired(self) -> None:
+        """Drop every expired entry. Caller holds the lock."""
+        now = self._clock()
+        for key in [k for k, e in self._entries.items() if e.expires_at <= now]:
+            self._remove(key)
+            self.expirations += 1
+
+    def __getitem__(self, key: str) -> Any:
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is None:
+                self.misses += 1
+                raise KeyError(key)
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.set(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return isinstance(key, str) and self._live_entry(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            self._purge_expired()
+            return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._purge_expired()
+            return len(self._entries)
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        """Store a value, optionally overriding the default TTL for this entry.
+
+        Values larger than the whole budget are not stored.
+        """
+        size = self._sizeof(value)
+        now = self._clock()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                self.evictions += 1
+                return
+            self._purge_expired()
+            while self._entries and self._total_bytes + size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= evicted.size
+                self.evictions += 1
+            self._entries[key] = CacheEntry(value, size, now, expires_at)
+            self._total_bytes += size
+
+    def lookup(self, key: str) -> tuple[Any, float] | None:
+        """Return (value, age in seconds) for key, or None if it is not cached."""
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value, self._clock() - entry.stored_at
+
+    def peek(self, key: str) -> Any | None:
+        """Return the value for key without waiting for the lock, or None if it is not cached.
+
+        The entry is read with a single dictionary lookup, which is atomic, so a
+        reader never blocks behind a writer. Recency and the hit and miss
+        counters are only updated when the lock is free at that moment.
+        """
+        entry = self._entries.get(key)
+        live = entry is not None and entry.expires_at > self._clock()
+        if self._lock.acquire(blocking=False):
+            try:
+                if not live:
+                    self.misses += 1
+                elif key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+            finally:
+                self._lock.release()
+        return entry.value if live else None
+
+    def age(self, key: str) -> float | None:
+        """Return seconds since key was stored, or None if it is not cached."""
+        with self._lock:
+            entry = self._live_entry(key)
+            return None if entry is None else self._clock() - entry.stored_at
+
+    def clear(self) -> None:
+        """Remove every entry without counting evictions."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    @property
+    def total_bytes(self) -> int:
+        """Estimated size of all stored entries in bytes."""
+        return self._total_bytes
+
+    def stats(self) -> dict[str, int]:
+        """Return a snapshot of cache counters and occupancy."""
+        with self._lock:
+            self._purge_expired()
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class _Flight:
+    """State shared by callers waiting on one in-flight call."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight block until it finishes and receive the same result or exception.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with no calls in flight."""
+        self._lock = threading.Lock()
+        self._flights: dict[Hashable, _Flight] = {}
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn for key unless an identical call is already in flight."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+    def in_flight(self) -> int:
+        """Return the number of keys currently being fetched."""
+        with self._lock:
+            return len(self._flights)
+
+
+def _check_private(directory: Path) -> None:
+    """Raise PermissionError unless directory is owned by this user and no one else can write to it.
+
+    Entries are unpickled, so anyone else able to write them could run code in this process.
+    """
+    if not hasattr(os, "geteuid"):  # pragma: no cover - POSIX permissions only
+        return
+    info = directory.stat()
+    if info.st_uid != os.geteuid():
+        raise PermissionError(f"Cache directory {directory} is owned by another user")
+    if info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(f"Cache directory {directory} is writable by other users")
+
+
+class FileCache:
+    """Cache shared by every process on a host through files in one directory.
+
+    Each key is one file holding its store time, expiry and pickled value,
+    replaced atomically on write so readers never see a partial entry. Point
+    the directory at a tmpfs such as /dev/shm to keep entries in shared memory.
+    The directory is created private to the current user, and one that another
+    user owns or can write to is refused, since entries are unpickled.
+    ``do`` is a cross-process single flight: while one process computes a
+    value, the others block on the key's lock file and then read its result.
+    Lock files are advisory (fcntl); without fcntl, calls are coalesced within
+    this process only.
+    """
+
+    def __init__(self, directory: str | os.PathLike[str], ttl: float,
+                 clock: Callable[[], float] = time.time) -> None:
+        """Initialize a cache in directory, creating it if needed.
+
+        Args:
+            directory: Directory holding the entry and lock files
+            ttl: Default time to live for entries, in seconds
+            clock: Wall clock shared by all processes, in seconds
+
+        Raises:
+            PermissionError: If the directory belongs to another user or others can write to it
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        _check_private(self.directory)
+        self.ttl = ttl
+        self._clock = clock
+        self._local = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.writes = 0
+
+    def after_fork(self) -> None:
+        """Replace the in-process single flight in a forked child, where a parent thread may have held its lock."""
+        self._local = SingleFlight()
+
+    def _path(self, key: str, suffix: str) -> Path:
+        """Return the file for key; keys are escaped into safe file names."""
+        return self.directory / f"{quote(key, safe='')}{suffix}"
+
+    def _read(self, key: str, newer_than: float | None) -> tuple[Any, float] | None:
+        """Return (value, stored_at) if key is unexpired and stored after newer_than.
+
+        An expired entry is deleted only while it is still the file at its path,
+        so a fresh entry another process has just written in its place is kept.
+        """
+        path = self._path(key, ".entry")
+        try:
+            with path.open("rb") as f:
+                # Safe to unpickle: only this user can write to the directory (see _check_private)
+                stored_at, expires_at = pickle.load(f)  # noqa: S301
+                if expires_at <= self._clock():
+                    if os.path.samestat(os.fstat(f.fileno()), path.stat()):
+                        path.unlink(missing_ok=True)
+                    return None
+                if newer_than is not None and stored_at <= newer_than:
+                    return None
+                return pickle.load(f), stored_at  # noqa: S301
+        except FileNotFoundError:
+            return None
+
+    def lookup(self, key: str, newer_than: float | None = None) -> tuple[Any, float] | None:
+        """Return (value, stored_at) for key, or None if it is not cached.
+
+        Args:
+            key: Cache key
+            newer_than: Only return an entry stored after this time
+        """
+        found = self._read(key, newer_than)
+        if found is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return found
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> float:
+        """Store a value, optionally overriding the default TTL; return its store time."""
+        stored_at = self._clock()
+        expires_at = stored_at + (self.ttl if ttl is None else ttl)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((stored_at, expires_at), f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            Path(tmp_name).replace(self._path(key, ".entry"))
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self.writes += 1
+        return stored_at
+
+    def delete(self, key: str) -> None:
+        """Remove key if present."""
+        self._path(key, ".entry").unlink(missing_ok=True)
+
+    @contextlib.contextmanager
+    def _locked(self, key: str) -> Iterator[None]:
+        """Hold the key's lock file exclusively across processes."""
+        if fcntl is None:
+            yield
+            return
+        with self._path(key, ".lock").open("a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def do(self, key: str, fn: Callable[[], Any], newer_than: float | None = None,
+           ttl: float | None = None) -> tuple[Any, float]:
+        """Return the cached value for key, computing and storing it with fn if needed.
+
+        Only one caller on the host runs fn for a key at a time; callers that
+        waited for it are answered from the entry it stored. If fn raises, the
+        next waiter runs it in turn.
+
+        Args:
+            key: Cache key
+            fn: Computes the value
+            newer_than: Ignore entries stored at or before this time, e.g. the
+                caller's own copy when refreshing it
+            ttl: Time to live for a newly stored entry (defaults to the cache TTL)
+
+        Returns:
+            (value, stored_at)
+        """
+        found = self.lookup(key, newer_than)
+        if found is not None:
+            return found
+        return self._local.do((key, newer_than), lambda: self._compute(key, fn, newer_than, ttl))
+
+    def _compute(self, key: str, fn: Callable[[], Any], newer_than: float | None,
+                 ttl: float | None) -> tuple[Any, float]:
+        """Run fn under the key's lock unless another process stored the value meanwhile."""
+        with self._locked(key):
+            found = self._read(key, newer_than)
+            if found is not None:
+                self.shared += 1
+                return found
+            value = fn()
+            return value, self.set(key, value, ttl)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        for path in self.directory.glob("*.entry"):
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> dict[str, Any]:
+        """Return this process's counters and the cache's on-disk occupancy."""
+        entries = list(self.directory.glob("*.entry"))
+        size = 0
+        for path in entries:
+            with contextlib.suppress(FileNotFoundError):
+                size += path.stat().st_size
+        return {
+            "directory": str(self.directory),
+            "entries": len(entries),
+            "bytes": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared": self.shared,
+            "writes": self.writes,
+        }
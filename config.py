@@ -1,6 +1,9 @@
 """Configuration settings for the UK Government Scraper."""
 
+from __future__ import annotations
+
 import os
+from types import MappingProxyType
 
 
 class Config:
@@ -17,13 +20,61 @@ class Config:
 
     # Cache settings
     CACHE_TIMEOUT = int(os.environ.get("CACHE_TIMEOUT", "3600"))  # 1 hour default
+    CACHE_MAX_BYTES = int(os.environ.get("CACHE_MAX_BYTES", str(256 * 1024 * 1024)))  # 256 MiB default
+    # Entries past CACHE_TIMEOUT are still served for this long while a background refresh runs
+    CACHE_MAX_STALE = int(os.environ.get("CACHE_MAX_STALE", "21600"))  # 6 hours default
+    CACHE_REFRESH_WORKERS = int(os.environ.get("CACHE_REFRESH_WORKERS", "2"))
+    # Directory of a cache of fetched tables shared by all processes on the host, e.g. under
+    # /dev/shm; unset to keep tables per process
+    SHARED_CACHE_DIR = os.environ.get("SHARED_CACHE_DIR", "")
+    # Directory where fetched tables are persisted and reloaded from on startup; unset to disable
+    SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", "")
 
     # Logging
     LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
 
+    # Background refresh scheduler: (interval, jitter) in seconds for each dataset. A dataset is
+    # refreshed every interval plus a random delay of up to jitter; keep intervals below CACHE_TIMEOUT
+    REFRESH_ENABLED = os.environ.get("REFRESH_ENABLED", "true").lower() == "true"
+    REFRESH_SCHEDULE = MappingProxyType({
+        "mps": (
+            int(os.environ.get("REFRESH_INTERVAL_MPS", "1800")),
+            int(os.environ.get("REFRESH_JITTER_MPS", "120")),
+        ),
+        "lords": (
+            int(os.environ.get("REFRESH_INTERVAL_LORDS", "1800")),
+            int(os.environ.get("REFRESH_JITTER_LORDS", "120")),
+        ),
+        "government_roles": (
+            int(os.environ.get("REFRESH_INTERVAL_GOVERNMENT_ROLES", "1800")),
+            int(os.environ.get("REFRESH_JITTER_GOVERNMENT_ROLES", "120")),
+        ),
+        "committees": (
+            int(os.environ.get("REFRESH_INTERVAL_COMMITTEES", "3000")),
+            int(os.environ.get("REFRESH_JITTER_COMMITTEES", "300")),
+        ),
+    })
+
+    # Upstream pdpy fetches allowed to run concurrently
+    FETCH_WORKERS = int(os.environ.get("FETCH_WORKERS", "6"))
+
+    # Blocking scrapes the ASGI app runs at once off its event loop
+    ASGI_WORKERS = int(os.environ.get("ASGI_WORKERS", "16"))
+
+    # JSON encoder for responses: "auto" (orjson if installed), "orjson" or "json" (stdlib)
+    JSON_BACKEND = os.environ.get("JSON_BACKEND", "auto")
+
+    # Cursor pagination of the dataset endpoints: rows per page without limit=, and the largest limit allowed
+    PAGE_SIZE = int(os.environ.get("PAGE_SIZE", "100"))
+    PAGE_MAX_SIZE = int(os.environ.get("PAGE_MAX_SIZE", "5000"))
+
     # Request timeout for external APIs
     REQUEST_TIMEOUT = int(os.environ.get("REQUEST_TIMEOUT", "30"))
 
+    @classmethod
+    def validate(cls) -> None:
+        """Check that required settings are present; the base configuration needs none."""
+
 
 class DevelopmentConfig(Config):
     """Development configuration."""
@@ -40,8 +91,14 @@ class ProductionConfig(Config):
 
     # Use environment variables for sensitive settings
     SECRET_KEY = os.environ.get("SECRET_KEY")
-    if not SECRET_KEY:
-        raise ValueError("No SECRET_KEY set for production")
+
+    SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", "snapshots")
+
+    @classmethod
+    def validate(cls) -> None:
+        """Ensure the settings required in production are present."""
+        if not cls.SECRET_KEY:
+            raise ValueError("No SECRET_KEY set for production")
 
 
 class TestingConfig(Config):
@@ -50,6 +107,10 @@ class TestingConfig(Config):
     TESTING = True
     DEBUG = True
     CACHE_TIMEOUT = 0  # No caching in tests
+    CACHE_MAX_STALE = 0
+    REFRESH_ENABLED = False
+    SHARED_CACHE_DIR = ""
+    SNAPSHOT_DIR = ""
 
 
 # Configuration dictionary
@@ -59,3 +120,10 @@ config = {
     "testing": TestingConfig,
     "default": DevelopmentConfig,
 }
+
+
+def get_config(name: str | None = None) -> type[Config]:
+    """Return the configuration class for name, defaulting to $FLASK_CONFIG."""
+    config_class = config[name or os.environ.get("FLASK_CONFIG", "default")]
+    config_class.validate()
+    return config_class
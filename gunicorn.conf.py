@@ -0,0 +1,60 @@
+"""Gunicorn settings for the UK Government Scraper.
+
+Loaded automatically by gunicorn from the working directory; command-line
+options (see start_gunicorn.sh) take precedence.
+
+By default the app is preloaded: the master process fetches the data snapshot
+once and keeps it fresh, and workers forked from it share that memory
+copy-on-write. After each refresh cycle the master reloads its workers once so
+they are re-forked with the new snapshot instead of each re-scraping. Set
+GUNICORN_PRELOAD=false to load the app in every worker instead, each running
+its own refresh scheduler; the workers then share fetched tables through a
+file cache in SHARED_CACHE_DIR (default: under /dev/shm), so each table is
+fetched upstream by one worker for all of them.
+"""
+
+import multiprocessing
+import os
+import signal
+import tempfile
+from pathlib import Path
+from typing import Any
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", str(multiprocessing.cpu_count())))
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() == "true"
+
+if not preload_app:
+    # Read by each worker's config when it imports the app
+    # A guessable path is safe here: the cache refuses directories other users own or can write to
+    shm = Path("/dev/shm")  # noqa: S108
+    if not shm.is_dir():
+        shm = Path(tempfile.gettempdir())
+    os.environ.setdefault("SHARED_CACHE_DIR", str(shm / f"uk-pep-scraper-cache-{os.geteuid()}"))
+
+
+def when_ready(server: Any) -> None:
+    """Warm the shared snapshot in the master before any worker is forked."""
+    if not server.cfg.preload_app:
+        return
+    # Deferred so the app is imported by gunicorn's preload, not when this config is read
+    from app import start_preforked_refresh  # noqa: PLC0415
+
+    # SIGHUP makes the master gracefully replace its workers with fresh forks
+    start_preforked_refresh(lambda: os.kill(os.getpid(), signal.SIGHUP))
+
+
+def post_fork(server: Any, _worker: Any) -> None:
+    """Set up the app in a newly forked worker.
+
+    Threads do not survive fork, so preloaded workers rebuild their thread
+    pools; workers that loaded the app themselves warm up and start their own
+    scheduler.
+    """
+    from app import after_fork, start_warm_up  # noqa: PLC0415
+
+    if server.cfg.preload_app:
+        after_fork()
+    else:
+        start_warm_up()
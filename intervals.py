@@ -0,0 +1,169 @@
+"""Interval index over start/end date columns.
+
+Answers point-in-time ("serving on D") and overlap ("serving at some point
+between A and B") queries in O(log n + k) using a static centered interval
+tree plus a start-sorted position array. Missing start or end dates are
+treated as open-ended.
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+# Day numbers standing in for missing (open-ended) start and end dates
+_OPEN_START = np.iinfo(np.int64).min
+_OPEN_END = np.iinfo(np.int64).max
+
+# Nodes with at most this many intervals are scanned directly instead of split further
+_LEAF_SIZE = 32
+
+
+def _to_days(values: Any) -> np.ndarray:
+    """Convert a date column to int64 day numbers, with NaT as the int64 minimum."""
+    dates = pd.to_datetime(pd.Series(values), errors="coerce")
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    return dates.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]").astype(np.int64)
+
+
+def _day(value: Any) -> int:
+    """Convert a single date to its day number."""
+    return int(np.datetime64(pd.Timestamp(value).date(), "D").astype(np.int64))
+
+
+class _Node:
+    """Centered interval tree node.
+
+    Inner nodes hold the intervals containing their center, ordered by start
+    and by end, plus subtrees for intervals entirely left or right of it.
+    Leaves hold a few unordered intervals that are scanned directly.
+    """
+
+    __slots__ = ("by_end", "by_start", "center", "ends", "left", "positions", "right", "starts")
+
+    def __init__(self, positions: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> None:
+        self.left: _Node | None = None
+        self.right: _Node | None = None
+        self.center: int | None = None
+        self.positions, self.starts, self.ends = positions, starts, ends
+        self.by_start = self.by_end = None
+
+        endpoints = np.concatenate([starts, ends])
+        finite = endpoints[(endpoints != _OPEN_START) & (endpoints != _OPEN_END)]
+        if len(positions) <= _LEAF_SIZE or not len(finite):
+            return
+
+        center = int(np.median(finite))
+        left = ends < center
+        right = starts > center
+        here = ~(left | right)
+
+        start_order = np.argsort(starts[here], kind="stable")
+        end_order = np.argsort(ends[here], kind="stable")
+        self.center = center
+        self.starts = starts[here][start_order]
+        self.by_start = positions[here][start_order]
+        self.ends = ends[here][end_order]
+        self.by_end = positions[here][end_order]
+        self.positions = None
+
+        if left.any():
+            self.left = _Node(positions[left], starts[left], ends[left])
+        if right.any():
+            self.right = _Node(positions[right], starts[right], ends[right])
+
+    def stab(self, day: int, out: list[np.ndarray]) -> None:
+        """Collect positions of intervals containing day."""
+        node: _Node | None = self
+        while node is not None:
+            if node.center is None:
+                out.append(node.positions[(node.starts <= day) & (node.ends >= day)])
+                return
+            if day < node.center:
+                out.append(node.by_start[: np.searchsorted(node.starts, day, side="right")])
+                node = node.left
+            elif day > node.center:
+                out.append(node.by_end[np.searchsorted(node.ends, day, side="left"):])
+                node = node.right
+            else:
+                out.append(node.by_start)
+                return
+
+
+class IntervalIndex:
+    """Static index of row intervals for point-in-time and overlap lookups.
+
+    Queries return row positions (suitable for ``DataFrame.iloc``) in
+    ascending order.
+    """
+
+    def __init__(self, starts: Any, ends: Any) -> None:
+        """Build the index from start and end date columns of equal length."""
+        start_days = _to_days(starts)
+        end_days = _to_days(ends)
+        end_days[end_days == _OPEN_START] = _OPEN_END
+        self._size = len(start_days)
+
+        # Rows ending before they start can never match a query
+        valid = start_days <= end_days
+        positions = np.flatnonzero(valid)
+        start_days, end_days = start_days[valid], end_days[valid]
+
+        self._root = _Node(positions, start_days, end_days)
+        start_order = np.argsort(start_days, kind="stable")
+        self._sorted_starts = start_days[start_order]
+        self._by_start = positions[start_order]
+
+    @classmethod
+    def from_frame(cls, table: pd.DataFrame, start_col: str, end_col: str) -> IntervalIndex:
+        """Build the index from two date columns of a DataFrame."""
+        return cls(table[start_col], table[end_col])
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __sizeof__(self) -> int:
+        # The tree is spread over many small nodes, each owning its own arrays
+        size = sys.getsizeof(object()) + self._sorted_starts.nbytes + self._by_start.nbytes
+        nodes = [self._root]
+        while nodes:
+            node = nodes.pop()
+            arrays = (node.positions, node.starts, node.ends, node.by_start, node.by_end)
+            size += sys.getsizeof(node) + sum(array.nbytes for array in arrays if array is not None)
+            nodes.extend(child for child in (node.left, node.right) if child is not None)
+        return size
+
+    def at(self, on_date: Any) -> np.ndarray:
+        """Return positions of rows whose interval contains on_date."""
+        found: list[np.ndarray] = []
+        self._root.stab(_day(on_date), found)
+        return self._merge(found)
+
+    def overlapping(self, from_date: Any = None, to_date: Any = None) -> np.ndarray:
+        """Return positions of rows whose interval overlaps [from_date, to_date] inclusively.
+
+        Either bound may be None for an open-ended window.
+        """
+        low = _OPEN_START if from_date is None else _day(from_date)
+        high = _OPEN_END if to_date is None else _day(to_date)
+        if low > high:
+            raise ValueError("to_date is before from_date")
+
+        # Rows containing the window start, plus rows starting inside the window
+        found: list[np.ndarray] = []
+        self._root.stab(low, found)
+        first = np.searchsorted(self._sorted_starts, low, side="right")
+        last = np.searchsorted(self._sorted_starts, high, side="right")
+        found.append(self._by_start[first:last])
+        return self._merge(found)
+
+    @staticmethod
+    def _merge(found: list[np.ndarray]) -> np.ndarray:
+        """Combine disjoint position arrays into one ascending array."""
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(found))
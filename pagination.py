@@ -0,0 +1,130 @@
+"""Cursor pagination over row views for the UK Government Scraper.
+
+A page is read straight from the cached views of a query: the cursor names
+the dataset and table position of the last row returned, which the next
+request finds again with a binary search, so a page costs O(log n + page
+size) however deep into the results it is. Cursors also carry the person_id
+of that row, and are refused if the row at that position has changed since,
+as it can when a refresh reorders the table.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import math
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+import pandas as pd
+
+from views import TableView, column_values
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+# Column whose value at a cursor's position must still match for the cursor to be accepted
+CURSOR_KEY = "person_id"
+
+
+class InvalidPageError(ValueError):
+    """Raised for pagination parameters that cannot be served."""
+
+
+class InvalidCursorError(InvalidPageError):
+    """Raised for an after cursor that is malformed or no longer matches the data."""
+
+
+class Page(NamedTuple):
+    """One page of rows from one or more datasets."""
+
+    rows: dict[str, list[dict[str, Any]]]
+    next_cursor: str | None
+    total_count: int
+
+
+def encode_cursor(dataset: str, position: int, key: Any) -> str:
+    """Return the opaque cursor of a dataset's row at a table position, whose CURSOR_KEY value is key."""
+    payload = json.dumps([dataset, position, key], separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int, Any]:
+    """Return the (dataset, position, key) of a cursor made by encode_cursor.
+
+    Raises:
+        InvalidCursorError: If the cursor is not one encode_cursor could have made
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        dataset, position, key = json.loads(payload)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise InvalidCursorError("Malformed cursor") from e
+    if not isinstance(dataset, str) or not isinstance(position, int) or position < 0:
+        raise InvalidCursorError("Malformed cursor")
+    return dataset, position, key
+
+
+def _row_key(view: TableView, position: int) -> Any:
+    """Return the CURSOR_KEY value of a table row, or None if the table has no such column."""
+    if CURSOR_KEY not in view.table.columns:
+        return None
+    key = column_values(view.table[CURSOR_KEY], [position])[0]
+    # A missing key round-trips through JSON as null; NaN would never compare equal
+    return None if isinstance(key, float) and math.isnan(key) else key
+
+
+def paginate(datasets: Mapping[str, Any], limit: int, after: str | None = None) -> Page:
+    """Return up to limit rows following a cursor, taking the datasets one after another.
+
+    Args:
+        datasets: Views (or DataFrames) by dataset name, in page order; anything else has no rows
+        limit: Most rows to return
+        after: Cursor of the last row of the previous page, or None for the first page
+
+    Returns:
+        The page's rows by dataset name (every dataset is listed), the cursor of
+        its last row if more rows follow (None otherwise), and the number of
+        rows across all pages
+
+    Raises:
+        InvalidCursorError: If after is malformed, names another dataset, or no longer
+            matches the row it was made from
+    """
+    views = {}
+    for name, data in datasets.items():
+        view = TableView(data) if isinstance(data, pd.DataFrame) else data
+        views[name] = view if isinstance(view, TableView) else TableView(pd.DataFrame(), [])
+    names = list(views)
+
+    first, start = 0, 0
+    if after is not None:
+        dataset, position, key = decode_cursor(after)
+        if dataset not in views:
+            raise InvalidCursorError("Cursor is for another dataset")
+        view = views[dataset]
+        if position >= len(view.table) or _row_key(view, position) != key:
+            raise InvalidCursorError("Cursor no longer matches the data; it has been refreshed since")
+        first, start = names.index(dataset), view.index_after(position)
+
+    rows: dict[str, list[dict[str, Any]]] = {name: [] for name in names}
+    remaining, last = limit, None
+    for number in range(first, len(names)):
+        name = names[number]
+        view = views[name]
+        stop = min(len(view), start + remaining)
+        if stop > start:
+            rows[name] = view.records(start, stop)
+            remaining -= stop - start
+            last = (number, name, stop)
+        if remaining == 0:
+            break
+        start = 0
+
+    next_cursor = None
+    if last is not None and remaining == 0:
+        number, name, stop = last
+        if stop < len(views[name]) or any(len(views[later]) for later in names[number + 1:]):
+            position = views[name].position(stop - 1)
+            next_cursor = encode_cursor(name, position, _row_key(views[name], position))
+    return Page(rows, next_cursor, sum(len(view) for view in views.values()))
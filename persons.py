@@ -0,0 +1,115 @@
+"""Person-centric model of the UK Government Scraper's tables.
+
+Every pdpy table repeats each person's identity columns (person_id, names and
+so on) on every row. The model holds them once, in a persons table, and
+treats the fetched tables as fact tables referencing it by integer row: each
+fact row's person row is precomputed, as is every person's list of fact rows,
+so joins are array lookups and finding everything about a person takes
+constant time per table.
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+
+from views import TableView
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+# Columns describing a person rather than a fact about them, in the order they are kept
+PERSON_COLUMNS = ("person_id", "mnis_id", "given_name", "family_name", "display_name", "full_title", "gender")
+
+
+class PersonModel:
+    """Persons table plus the fact tables referencing it.
+
+    Attributes:
+        persons: One row per person, with the PERSON_COLUMNS found in the tables
+        tables: Fact table by name; these are the fetched tables themselves, not copies
+    """
+
+    def __init__(self, tables: Mapping[str, Any]) -> None:
+        """Build the model from tables by name; tables without a person_id column are left out.
+
+        Identity columns are taken from the first table listing each person,
+        so pass the member tables first.
+        """
+        self.tables = {
+            name: table for name, table in tables.items()
+            if isinstance(table, pd.DataFrame) and "person_id" in table.columns
+        }
+        parts = [table[[c for c in PERSON_COLUMNS if c in table.columns]] for table in self.tables.values()]
+        persons = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=["person_id"])
+        persons = persons.drop_duplicates("person_id").reset_index(drop=True)
+        self.persons = persons.astype(object).where(persons.notna(), None)
+
+        self._records = self.persons.to_dict("records")
+        self._rows = pd.Index(self.persons["person_id"])
+        self._row_of = {person_id: row for row, person_id in enumerate(self.persons["person_id"])}
+        # Person row of each fact row, and each person's fact rows as order[offsets[p]:offsets[p + 1]]
+        self._person_rows: dict[str, np.ndarray] = {}
+        self._groups: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        for name, table in self.tables.items():
+            rows = self._rows.get_indexer(table["person_id"]).astype(np.intp)
+            self._person_rows[name] = rows
+            order = np.argsort(rows, kind="stable")
+            counts = np.bincount(rows[rows >= 0], minlength=len(self.persons))
+            self._groups[name] = (order[np.count_nonzero(rows < 0):], np.concatenate(([0], np.cumsum(counts))))
+
+    def __len__(self) -> int:
+        return len(self.persons)
+
+    def __sizeof__(self) -> int:
+        # The fact tables belong to the snapshot; the model owns the persons table and its indexes
+        arrays = [*self._person_rows.values(), *(a for group in self._groups.values() for a in group)]
+        return (
+            sys.getsizeof(object())
+            + int(self.persons.memory_usage(index=True, deep=True).sum())
+            + sum(array.nbytes for array in arrays)
+        )
+
+    def row(self, person_id: str) -> int | None:
+        """Return the persons table row of a person, or None if unknown."""
+        return self._row_of.get(person_id)
+
+    def fact_columns(self, columns: pd.Index | list[str]) -> list[str]:
+        """Return the columns of a fact table kept when it references the persons table."""
+        return [column for column in columns if column == "person_id" or column not in PERSON_COLUMNS]
+
+    def facts(self, name: str, row: int) -> TableView:
+        """Return a view of one person's rows in a fact table."""
+        table = self.tables[name]
+        order, offsets = self._groups[name]
+        return TableView(table, np.sort(order[offsets[row]:offsets[row + 1]]))
+
+    def person_rows(self, name: str, view: TableView) -> np.ndarray:
+        """Return the persons table rows referenced by a view of a fact table (-1 where unknown)."""
+        if self.tables.get(name) is view.table:
+            rows = self._person_rows[name]
+            return rows if view.positions is None else rows[view.positions]
+        # The view is of a different copy of the table than the model was built from
+        return self._rows.get_indexer(view.column("person_id")).astype(np.intp)
+
+    def persons_records(self, rows: np.ndarray | None = None) -> list[dict[str, Any]]:
+        """Return person rows (every person if None) as dicts, in persons table order."""
+        if rows is None:
+            return [dict(record) for record in self._records]
+        return [dict(self._records[row]) for row in np.unique(rows[rows >= 0]).tolist()]
+
+    def person(self, person_id: str) -> dict[str, Any] | None:
+        """Return a person's identity and their rows in every fact table, or None if unknown."""
+        row = self.row(person_id)
+        if row is None:
+            return None
+        return {
+            "person": dict(self._records[row]),
+            "facts": {
+                name: self.facts(name, row).records(columns=self.fact_columns(table.columns))
+                for name, table in self.tables.items()
+            },
+        }
@@ -0,0 +1,185 @@
+"""Background refresh scheduler for the UK Government Scraper.
+
+Runs one refresh job per dataset on its own cadence from a single daemon
+thread, so cached data is replaced ahead of expiry instead of being fetched
+on a request's hot path.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Collection, Mapping
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshScheduler:
+    """Periodically run named refresh jobs, each with its own interval and jitter.
+
+    Every job runs once as soon as the scheduler starts (unless the data was
+    just loaded), then again after its interval plus a random delay of up to
+    its jitter, so datasets sharing an interval do not hit the upstream API in
+    lockstep. A failed job is logged and retried on its normal cadence; the
+    previously cached data stays in place meanwhile.
+
+    When a job comes due, every other job due within ``batch_window`` seconds
+    runs with it, one after another, as a single refresh cycle.
+    """
+
+    def __init__(
+        self,
+        jobs: dict[str, Callable[[], Any]],
+        schedule: Mapping[str, tuple[float, float]],
+        clock: Callable[[], float] = time.monotonic,
+        rng: random.Random | None = None,
+        on_refresh: Callable[[str], Any] | None = None,
+        on_cycle: Callable[[list[str]], Any] | None = None,
+        batch_window: float = 0.0,
+    ) -> None:
+        """Initialize a stopped scheduler.
+
+        Args:
+            jobs: Refresh function for each dataset name
+            schedule: (interval, jitter) in seconds for each dataset name
+            clock: Monotonic clock used for scheduling, in seconds
+            rng: Random source for jitter
+            on_refresh: Called with the dataset name after each successful refresh
+            on_cycle: Called once after each refresh cycle with the names of the
+                datasets it refreshed, if any
+            batch_window: How much earlier than due a job may run to join a cycle, in seconds
+        """
+        missing = set(jobs) - set(schedule)
+        if missing:
+            raise ValueError(f"No refresh schedule for: {', '.join(sorted(missing))}")
+        self.jobs = jobs
+        self.schedule = schedule
+        self._clock = clock
+        # Jitter only spreads refreshes out, so it needs no cryptographic randomness
+        self._rng = rng or random.Random()  # noqa: S311
+        self.on_refresh = on_refresh
+        self.on_cycle = on_cycle
+        self.batch_window = batch_window
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._status: dict[str, dict[str, Any]] = {
+            name: {
+                "interval_seconds": schedule[name][0],
+                "jitter_seconds": schedule[name][1],
+                "last_refresh": None,
+                "duration_seconds": None,
+                "last_failure": None,
+            }
+            for name in jobs
+        }
+
+    @property
+    def running(self) -> bool:
+        """Whether the scheduler thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, run_immediately: bool | Collection[str] = True) -> bool:
+        """Start the scheduler thread; return False if it was already running.
+
+        Args:
+            run_immediately: Refresh every dataset at once, rather than first waiting
+                out its interval (e.g. when the data was just loaded), or only the
+                named datasets
+        """
+        with self._lock:
+            if self.running:
+                return False
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, args=(run_immediately,), name="refresh-scheduler", daemon=True,
+            )
+            self._thread.start()
+            return True
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Ask the scheduler thread to exit and wait for it."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def next_delay(self, name: str) -> float:
+        """Return seconds until the next refresh of a dataset: its interval plus random jitter."""
+        interval, jitter = self.schedule[name]
+        return interval + self._rng.uniform(0, jitter)
+
+    def refresh(self, name: str) -> bool:
+        """Run one dataset's refresh job now, recording its outcome; return whether it succeeded."""
+        started = self._clock()
+        try:
+            self.jobs[name]()
+        except Exception:
+            logger.exception("Scheduled refresh of %s failed", name)
+            with self._lock:
+                self._status[name]["last_failure"] = datetime.now(timezone.utc).isoformat()
+            return False
+
+        duration = self._clock() - started
+        with self._lock:
+            self._status[name]["last_refresh"] = datetime.now(timezone.utc).isoformat()
+            self._status[name]["duration_seconds"] = round(duration, 3)
+        logger.info("Refreshed %s in %.2fs", name, duration)
+        if self.on_refresh is not None:
+            try:
+                self.on_refresh(name)
+            except Exception:
+                logger.exception("Refresh callback for %s failed", name)
+        return True
+
+    def refresh_cycle(self, names: list[str]) -> list[str]:
+        """Refresh the named datasets one after another, then report them to on_cycle.
+
+        Returns:
+            Names of the datasets refreshed successfully
+        """
+        refreshed = [name for name in names if not self._stop.is_set() and self.refresh(name)]
+        if refreshed and self.on_cycle is not None:
+            try:
+                self.on_cycle(refreshed)
+            except Exception:
+                logger.exception("Refresh cycle callback failed")
+        return refreshed
+
+    def after_fork(self) -> None:
+        """Prepare a forked child process to use this scheduler.
+
+        Its thread does not survive fork, and a lock it held at fork time would
+        never be released, so the lock is replaced.
+        """
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def status(self) -> dict[str, dict[str, Any]]:
+        """Return each dataset's schedule and its last successful refresh time and duration."""
+        with self._lock:
+            return {name: dict(status) for name, status in self._status.items()}
+
+    def _run(self, run_immediately: bool | Collection[str]) -> None:
+        """Scheduler loop: run whichever dataset is due next until stopped."""
+        now = self._clock()
+        if isinstance(run_immediately, bool):
+            run_immediately = set(self.jobs) if run_immediately else set()
+        due = {name: now if name in run_immediately else now + self.next_delay(name) for name in self.jobs}
+        while not self._stop.is_set():
+            name = min(due, key=due.__getitem__)
+            wait = due[name] - self._clock()
+            if wait > 0:
+                self._stop.wait(wait)
+                continue
+            cutoff = self._clock() + self.batch_window
+            cycle = sorted((other for other in due if due[other] <= cutoff), key=due.__getitem__)
+            self.refresh_cycle(cycle)
+            for other in cycle:
+                due[other] = self._clock() + self.next_delay(other)
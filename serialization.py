@@ -0,0 +1,199 @@
+"""JSON serialization of the UK Government Scraper's responses.
+
+Flask's default provider encodes with the stdlib json module, which dominates
+the CPU cost of the large /scrape/* payloads. FastJSONProvider encodes with
+orjson when it is installed and falls back to the stdlib otherwise, or for
+anything orjson cannot encode. Both backends give the same JSON: keys sorted,
+dates as HTTP dates as Flask gives them, and pandas' missing values (NaN, NaT,
+pd.NA) and non-finite floats as null rather than the invalid NaN literal.
+
+Large payloads can also be streamed: stream encodes a payload piece by piece,
+taking the rows of each TableView in it a chunk at a time, so a response
+holds at most one chunk of rows in memory and its first bytes go out before
+its last rows are built. stream_lines does the same for newline-delimited
+JSON, one row per line.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None  # type: ignore[assignment]
+
+from views import TableView
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from flask import Flask, Response
+
+logger = logging.getLogger(__name__)
+
+# Accepted JSON_BACKEND settings; "auto" picks orjson when it is installed
+JSON_BACKENDS = ("auto", "orjson", "json")
+
+# Rows of a view built and encoded at a time when streaming
+STREAM_CHUNK_ROWS = 1000
+# Streamed pieces are gathered into writes of at least this many bytes
+STREAM_WRITE_BYTES = 64 * 1024
+
+
+def _default(value: Any) -> Any:
+    """Return a JSON-encodable stand-in for a value neither backend encodes natively."""
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+        return None if isinstance(value, float) and not math.isfinite(value) else value
+    if isinstance(value, np.ndarray):
+        return _finite(value.tolist())
+    return DefaultJSONProvider.default(value)
+
+
+def _finite(value: Any) -> Any:
+    """Return value with non-finite floats replaced by None, through nested dicts and lists."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+def _coalesce(pieces: Iterable[bytes]) -> Iterator[bytes]:
+    """Yield pieces joined into writes of at least STREAM_WRITE_BYTES, then whatever is left."""
+    buffered: list[bytes] = []
+    size = 0
+    for piece in pieces:
+        buffered.append(piece)
+        size += len(piece)
+        if size >= STREAM_WRITE_BYTES:
+            yield b"".join(buffered)
+            buffered, size = [], 0
+    if buffered:
+        yield b"".join(buffered)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider encoding with orjson, or the stdlib json module as a fallback.
+
+    Attributes:
+        backend: "orjson" or "json", the backend responses are encoded with
+    """
+
+    def __init__(self, app: Flask, backend: str = "auto") -> None:
+        """Create the provider for app.
+
+        Args:
+            app: The Flask application
+            backend: One of JSON_BACKENDS; "orjson" falls back to "json" with a
+                warning when orjson is not installed
+
+        Raises:
+            ValueError: If backend is not one of JSON_BACKENDS
+        """
+        super().__init__(app)
+        if backend not in JSON_BACKENDS:
+            raise ValueError(f"Unknown JSON backend {backend!r}; expected one of {', '.join(JSON_BACKENDS)}")
+        if backend == "orjson" and orjson is None:
+            logger.warning("orjson is not installed; encoding JSON with the json module")
+        self.backend = "orjson" if backend != "json" and orjson is not None else "json"
+
+    def encode(self, obj: Any) -> bytes:
+        """Serialize obj as compact UTF-8 JSON."""
+        if self.backend == "orjson":
+            options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+            if self.sort_keys:
+                options |= orjson.OPT_SORT_KEYS
+            try:
+                return orjson.dumps(obj, default=_default, option=options)
+            except orjson.JSONEncodeError:
+                # e.g. integers past 64 bits; the json module encodes anything it can
+                logger.debug("orjson could not encode a response; using the json module", exc_info=True)
+        return self._dumps_json(obj, separators=(",", ":")).encode("utf-8")
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serialize obj as JSON; compact unless kwargs ask for json.dumps formatting."""
+        if not kwargs or kwargs == {"separators": (",", ":")}:
+            return self.encode(obj).decode("utf-8")
+        return self._dumps_json(obj, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        """Serialize the arguments as JSON into a response, as DefaultJSONProvider.response does."""
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.encode(obj) + b"\n", mimetype=self.mimetype)
+
+    def stream(self, obj: Any, chunk_rows: int = STREAM_CHUNK_ROWS) -> Iterator[bytes]:
+        """Serialize obj as compact UTF-8 JSON, yielded in pieces.
+
+        TableViews and DataFrames are written as lists of row dicts, chunk_rows
+        rows at a time. Dicts are written key by key in their own order, so a
+        payload can lead with its small fields; everything else is encoded
+        whole, as encode does.
+        """
+        return _coalesce(self._pieces(obj, chunk_rows))
+
+    def stream_lines(self, rows: Any, fields: dict[str, Any] | None = None,
+                     chunk_rows: int = STREAM_CHUNK_ROWS) -> Iterator[bytes]:
+        """Serialize rows as newline-delimited JSON, one compact row dict per line, yielded in pieces.
+
+        Args:
+            rows: TableView, DataFrame or list of row dicts; anything else has no rows
+            fields: Fields added to every row
+            chunk_rows: Rows built and encoded at a time
+        """
+        if isinstance(rows, pd.DataFrame):
+            rows = TableView(rows)
+        if isinstance(rows, TableView):
+            chunks = (rows.records(start, start + chunk_rows) for start in range(0, len(rows), chunk_rows))
+        elif isinstance(rows, list):
+            chunks = (rows[start:start + chunk_rows] for start in range(0, len(rows), chunk_rows))
+        else:
+            chunks = iter(())
+        return _coalesce(
+            b"".join(self.encode({**row, **fields} if fields else row) + b"\n" for row in chunk) for chunk in chunks
+        )
+
+    def _pieces(self, obj: Any, chunk_rows: int) -> Iterator[bytes]:
+        """Yield the JSON of obj in pieces, unbuffered; see stream."""
+        if isinstance(obj, pd.DataFrame):
+            obj = TableView(obj)
+        if isinstance(obj, TableView):
+            yield b"["
+            for start in range(0, len(obj), chunk_rows):
+                # Each chunk is encoded as a list; its brackets are dropped to splice it into ours
+                yield (b"," if start else b"") + self.encode(obj.records(start, start + chunk_rows))[1:-1]
+            yield b"]"
+        elif isinstance(obj, dict):
+            yield b"{"
+            for position, (key, value) in enumerate(obj.items()):
+                yield (b"," if position else b"") + self.encode(str(key)) + b":"
+                yield from self._pieces(value, chunk_rows)
+            yield b"}"
+        else:
+            yield self.encode(obj)
+
+    def _dumps_json(self, obj: Any, **kwargs: Any) -> str:
+        """Serialize obj with the json module, writing non-finite floats as null."""
+        kwargs.setdefault("default", _default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        kwargs.setdefault("allow_nan", False)
+        try:
+            return json.dumps(obj, **kwargs)
+        except ValueError:
+            # Out-of-range floats; payloads rarely have any, so only then pay for a cleaning pass
+            return json.dumps(_finite(obj), **kwargs)
@@ -0,0 +1,250 @@
+"""Immutable data snapshots for the UK Government Scraper.
+
+Refreshed data is never written into structures readers are using. Instead a
+new Snapshot is built alongside the current one and published by replacing a
+single reference, so readers take no lock, never block behind a refresh and
+always see either the whole previous state or the whole new one.
+
+SnapshotStore persists fetched tables to disk, so a restarted process can
+reload its last snapshot instead of scraping everything again.
+
+Each table entry also carries a content hash, computed once when the table is
+published, from which responses derive their ETags without serializing rows.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
+
+import pandas as pd
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(data: Any) -> str | None:
+    """Return a hex digest of a table's contents, or None if it cannot be hashed.
+
+    Tables with the same column names, dtypes and values in the same row order
+    hash alike, whichever fetch or restore they came from; the index is
+    ignored. Dictionary-encoded columns hash by their values, not their codes.
+
+    Args:
+        data: Table data; only DataFrames are hashed
+    """
+    if not isinstance(data, pd.DataFrame):
+        return None
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(name), str(dtype)] for name, dtype in data.dtypes.items()]).encode("utf-8"))
+    try:
+        rows = pd.util.hash_pandas_object(data, index=False)
+    except TypeError:
+        # Cells holding lists or dicts have no stable hash
+        logger.debug("Could not hash table contents", exc_info=True)
+        return None
+    digest.update(rows.to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class Snapshot:
+    """Immutable view of the fetched tables and the last full scrape.
+
+    Attributes:
+        tables: Table entry by pdpy fetch function name; each entry is a
+            read-only mapping with "data", "timestamp", "version", "fetched_at"
+            (wall clock), "stored_at" (monotonic clock) and "content_hash"
+            (see content_hash)
+        all_data: Read-only entry for the last full scrape, with "data" and "stored_at", or None
+        last_updated: When the last full scrape finished, or None
+        generation: Number of snapshots published before this one
+    """
+
+    __slots__ = ("all_data", "generation", "last_updated", "tables")
+
+    def __init__(
+        self,
+        tables: Mapping[str, Mapping[str, Any]] | None = None,
+        all_data: Mapping[str, Any] | None = None,
+        last_updated: datetime | None = None,
+        generation: int = 0,
+    ) -> None:
+        """Create a snapshot, taking read-only copies of the given entries."""
+        frozen = {name: MappingProxyType(dict(entry)) for name, entry in (tables or {}).items()}
+        object.__setattr__(self, "tables", MappingProxyType(frozen))
+        object.__setattr__(self, "all_data", None if all_data is None else MappingProxyType(dict(all_data)))
+        object.__setattr__(self, "last_updated", last_updated)
+        object.__setattr__(self, "generation", generation)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Snapshot is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Snapshot is immutable")
+
+    def with_tables(self, tables: Mapping[str, Mapping[str, Any]]) -> Snapshot:
+        """Return the next snapshot with the given table entries added or replaced."""
+        return Snapshot({**self.tables, **tables}, self.all_data, self.last_updated, self.generation + 1)
+
+    def with_all_data(self, all_data: Mapping[str, Any], last_updated: datetime) -> Snapshot:
+        """Return the next snapshot with a new full scrape and its completion time."""
+        return Snapshot(self.tables, all_data, last_updated, self.generation + 1)
+
+
+class SnapshotHolder:
+    """Publishes snapshots by atomic reference swap.
+
+    Readers use ``current`` without locking. Writers are serialized only with
+    each other, and only while deriving the next snapshot from the current
+    one; slow work such as upstream fetches happens before publish is called.
+    """
+
+    def __init__(self, initial: Snapshot | None = None) -> None:
+        """Start from initial, or an empty snapshot."""
+        self._current = Snapshot() if initial is None else initial
+        self._write_lock = threading.Lock()
+
+    @property
+    def current(self) -> Snapshot:
+        """The most recently published snapshot."""
+        return self._current
+
+    def publish(self, update: Callable[[Snapshot], Snapshot]) -> Snapshot:
+        """Derive the next snapshot from the current one and swap it in."""
+        with self._write_lock:
+            self._current = update(self._current)
+            return self._current
+
+
+class SnapshotStore:
+    """Directory of persisted tables, each with its fetch time, row count and checksum.
+
+    Every saved table is a pickle file plus a JSON metadata file naming it,
+    both written atomically; the metadata is written last, so a table is only
+    visible once complete. Loading takes each table's newest copy whose size
+    and SHA-256 checksum match its metadata, falling back to older copies if
+    a file is truncated or corrupt. Only the newest ``keep`` copies are kept.
+    """
+
+    def __init__(self, directory: str | os.PathLike[str], keep: int = 2) -> None:
+        """Initialize a store in directory, creating it if needed.
+
+        Args:
+            directory: Directory holding the table files
+            keep: Copies kept of each table
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.keep = keep
+        # Metadata of the newest copies, read from disk once and kept until the next save
+        self._metadata: dict[str, dict[str, Any]] | None = None
+        self._metadata_lock = threading.Lock()
+
+    def _write_atomic(self, path: Path, payload: bytes) -> None:
+        """Write payload to path through a temporary file and rename."""
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            Path(tmp_name).replace(path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def save(self, name: str, data: Any, fetched_at: float) -> dict[str, Any]:
+        """Persist one table and return its metadata.
+
+        Args:
+            name: Table name
+            data: Table data (anything picklable, typically a DataFrame)
+            fetched_at: Wall-clock time the table was fetched upstream
+        """
+        payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        stem = f"{name}-{int(fetched_at * 1_000_000)}"
+        metadata = {
+            "name": name,
+            "file": f"{stem}.pkl",
+            "fetched_at": datetime.fromtimestamp(fetched_at, timezone.utc).isoformat(),
+            "fetched_at_epoch": fetched_at,
+            "rows": len(data) if hasattr(data, "__len__") else None,
+            "bytes": len(payload),
+            "sha256": hashlib.sha256(payload).hexdigest(),
+        }
+        self._write_atomic(self.directory / metadata["file"], payload)
+        self._write_atomic(self.directory / f"{stem}.json", json.dumps(metadata).encode("utf-8"))
+        self._prune(name)
+        with self._metadata_lock:
+            self._metadata = None
+        return metadata
+
+    def _copies(self, name: str | None = None) -> list[dict[str, Any]]:
+        """Return metadata of the saved copies of a table (or every table), newest first."""
+        copies = []
+        for path in self.directory.glob("*.json"):
+            try:
+                metadata = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                logger.warning("Ignoring unreadable snapshot metadata %s", path.name)
+                continue
+            if not isinstance(metadata, dict) or "name" not in metadata:
+                logger.warning("Ignoring snapshot metadata without a table name %s", path.name)
+                continue
+            if name is None or metadata["name"] == name:
+                metadata["_path"] = path
+                copies.append(metadata)
+        return sorted(copies, key=lambda m: m.get("fetched_at_epoch", 0), reverse=True)
+
+    def _prune(self, name: str) -> None:
+        """Delete all but the newest copies of a table."""
+        for metadata in self._copies(name)[self.keep:]:
+            metadata["_path"].unlink(missing_ok=True)
+            (self.directory / metadata["file"]).unlink(missing_ok=True)
+
+    def _read(self, metadata: Mapping[str, Any]) -> Any:
+        """Load a saved table, raising ValueError if it does not match its metadata."""
+        payload = (self.directory / metadata["file"]).read_bytes()
+        if len(payload) != metadata["bytes"] or hashlib.sha256(payload).hexdigest() != metadata["sha256"]:
+            raise ValueError(f"Checksum mismatch for {metadata['file']}")
+        return pickle.loads(payload)
+
+    def load(self) -> dict[str, tuple[Any, float]]:
+        """Load the newest valid copy of every saved table.
+
+        Returns:
+            (data, wall-clock fetch time) by table name
+        """
+        tables: dict[str, tuple[Any, float]] = {}
+        for metadata in self._copies():
+            name = metadata.get("name")
+            if name in tables:
+                continue
+            try:
+                tables[name] = (self._read(metadata), metadata["fetched_at_epoch"])
+            except Exception:
+                logger.warning("Skipping invalid snapshot file %s", metadata.get("file"), exc_info=True)
+        return tables
+
+    def metadata(self) -> dict[str, dict[str, Any]]:
+        """Return the metadata of the newest saved copy of each table.
+
+        The files are read once and the result is reused until the next save.
+        """
+        with self._metadata_lock:
+            if self._metadata is None:
+                newest: dict[str, dict[str, Any]] = {}
+                for metadata in self._copies():
+                    metadata.pop("_path")
+                    newest.setdefault(metadata["name"], metadata)
+                self._metadata = newest
+            return {name: dict(metadata) for name, metadata in self._metadata.items()}
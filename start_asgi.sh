@@ -0,0 +1 @@
+uvicorn --host=0.0.0.0 --port=$PORT asgi:app
\ No newline at end of file
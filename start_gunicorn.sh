@@ -1 +1 @@
-gunicorn --bind=0.0.0.0:$PORT --workers=1 --threads=1 --timeout=0 app:app
\ No newline at end of file
+gunicorn --bind=0.0.0.0:$PORT --timeout=0 app:app
\ No newline at end of file
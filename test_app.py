@@ -8,6 +8,7 @@ and unit tests for the UKGovernmentScraper class methods.
 
 import json
 import pytest
+from collections.abc import MutableMapping
 import tempfile
 from datetime import datetime, timezone
 from pathlib import Path
@@ -132,6 +133,7 @@ def mock_scraper() -> MagicMock:
     mock.scrape_all_data.return_value = sample_all_data
     mock.export_to_csv.return_value = ["test.csv", "test2.csv"]
     mock.cache = {}
+    mock.cached_all_data.return_value = None
     
     return mock
 
@@ -329,7 +331,7 @@ class TestScrapingEndpoints:
         """Test scraping all data with cache enabled."""
         # Set up cached data
         cached_data = mock_scraper.scrape_all_data.return_value
-        mock_scraper_instance.cache = {"all": cached_data}
+        mock_scraper_instance.cached_all_data.return_value = cached_data
         
         response = client.get('/scrape/all?cache=true')
         assert response.status_code == 200
@@ -447,7 +449,7 @@ class TestUKGovernmentScraperUnit:
     
     def test_scraper_initialization(self) -> None:
         """Test scraper initialization."""
-        assert isinstance(self.scraper.cache, dict)
+        assert isinstance(self.scraper.cache, MutableMapping)
         assert len(self.scraper.cache) == 0
         assert self.scraper.last_updated is None
     
@@ -502,37 +504,46 @@ class TestUKGovernmentScraperUnit:
     @patch('app.pdpy')
     def test_scrape_mps_with_date_filters(self, mock_pdpy: MagicMock) -> None:
         """Test MPs scraping with date filters."""
-        mock_df = pd.DataFrame({'name': ['MP1']})
+        mock_df = pd.DataFrame({'person_id': [1], 'name': ['MP1']})
         mock_pdpy.fetch_mps.return_value = mock_df
+        mock_pdpy.fetch_commons_memberships.return_value = pd.DataFrame({
+            'person_id': [1],
+            'seat_incumbency_start_date': ['2024-05-01'],
+            'seat_incumbency_end_date': [None],
+        })
         
-        self.scraper.scrape_mps(
+        result = self.scraper.scrape_mps(
             current=True,
             from_date="2024-01-01",
             to_date="2024-12-31",
             on_date="2024-06-01"
         )
         
-        # Should call with on_date since current=True and on_date is specified
-        mock_pdpy.fetch_mps.assert_called_once_with(
-            from_date="2024-01-01",
-            to_date="2024-12-31",
-            on_date="2024-06-01"
-        )
+        # Date filters are applied locally to one full fetch of each table
+        assert result == [{'person_id': 1, 'name': 'MP1'}]
+        mock_pdpy.fetch_mps.assert_called_once_with()
+        mock_pdpy.fetch_commons_memberships.assert_called_once_with()
     
     @patch('app.pdpy')
     def test_scrape_mps_current_without_on_date(self, mock_pdpy: MagicMock) -> None:
         """Test MPs scraping with current=True but no on_date."""
-        mock_df = pd.DataFrame({'name': ['MP1']})
+        mock_df = pd.DataFrame({'person_id': [1, 2], 'name': ['MP1', 'MP2']})
         mock_pdpy.fetch_mps.return_value = mock_df
+        mock_pdpy.fetch_commons_memberships.return_value = pd.DataFrame({
+            'person_id': [1, 2],
+            'seat_incumbency_start_date': ['2019-12-12', '2019-12-12'],
+            'seat_incumbency_end_date': [None, '2024-05-30'],
+        })
         
         with patch('app.datetime') as mock_datetime:
             mock_datetime.now.return_value.strftime.return_value = "2024-06-03"
             mock_datetime.now.return_value = datetime(2024, 6, 3, tzinfo=timezone.utc)
             
-            self.scraper.scrape_mps(current=True)
+            result = self.scraper.scrape_mps(current=True)
             
-            # Should add today's date as on_date
-            mock_pdpy.fetch_mps.assert_called_once_with(on_date="2024-06-03")
+            # Should keep only MPs serving on today's date
+            assert [r['name'] for r in result] == ['MP1']
+            mock_pdpy.fetch_mps.assert_called_once_with()
     
     def test_create_outputs_dir(self) -> None:
         """Test outputs directory creation."""
@@ -629,7 +640,7 @@ class TestCacheHandling:
         assert response.status_code == 200
         
         # Verify cache was used in subsequent request
-        mock_scraper_instance.cache = {"all": sample_data}
+        mock_scraper_instance.cached_all_data.return_value = sample_data
         response = client.get('/scrape/all?cache=true')
         assert response.status_code == 200
         
@@ -0,0 +1,187 @@
+"""
+Tests for the ASGI serving mode and the async scraper.
+"""
+
+import asyncio
+import json
+import threading
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+import asgi
+from app import UKGovernmentScraper
+from asgi import AsyncUKGovernmentScraper
+
+
+async def call(path, query='', method='GET'):
+    """Send one request to the ASGI app and return (status, headers, json body)."""
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {'type': 'http', 'path': path, 'method': method, 'query_string': query.encode()}
+    await asgi.app(scope, receive, send)
+    start, body = messages
+    headers = {name.decode(): value.decode() for name, value in start['headers']}
+    return start['status'], headers, json.loads(body['body']) if body['body'] else None
+
+
+def request(path, query='', method='GET'):
+    return asyncio.run(call(path, query, method))
+
+
+@pytest.mark.api
+class TestASGIRoutes:
+    """Test the ASGI routes mirror the WSGI app."""
+
+    def test_health(self):
+        status, headers, data = request('/health')
+        assert status == 200
+        assert headers['content-type'] == 'application/json'
+        assert data['status'] == 'healthy'
+        assert 'cache_stats' in data
+
+    def test_ready_is_unavailable_until_warm_up(self):
+        with patch('app.warm_up_done', threading.Event()):
+            status, _, data = request('/ready')
+        assert status == 503
+        assert data['status'] == 'warming_up'
+
+    def test_index_lists_endpoints(self):
+        status, _, data = request('/')
+        assert status == 200
+        assert '/scrape/mps' in data['endpoints']
+
+    @patch('app.scraper.scrape_mps')
+    def test_scrape_mps_forwards_filters(self, mock_scrape_mps):
+        mock_scrape_mps.return_value = [{'name': 'Test MP'}]
+
+        status, _, data = request('/scrape/mps', 'current=true&on_date=2024-01-01')
+
+        assert status == 200
+        assert data['members_of_parliament'] == [{'name': 'Test MP'}]
+        assert data['summary']['total_count'] == 1
+        assert data['metadata']['on_date'] == '2024-01-01'
+        mock_scrape_mps.assert_called_once_with(current=True, from_date=None, to_date=None, on_date='2024-01-01')
+
+    @patch('app.scraper.scrape_government_roles')
+    def test_scrape_government_roles_passes_only_given_dates(self, mock_scrape_gov):
+        mock_scrape_gov.return_value = {'mps_government_roles': [], 'lords_government_roles': []}
+
+        status, _, data = request('/scrape/government-roles', 'from_date=2019-01-01')
+
+        assert status == 200
+        assert data['metadata']['from_date'] == '2019-01-01'
+        mock_scrape_gov.assert_called_once_with(current=False, from_date='2019-01-01')
+
+    @patch('app.scraper.scrape_lords', side_effect=RuntimeError('upstream down'))
+    def test_scrape_error_returns_500(self, _mock_scrape_lords):
+        status, _, data = request('/scrape/lords')
+        assert status == 500
+        assert data['error'] == 'Failed to scrape Lords data'
+
+    def test_export_invalid_type(self):
+        status, _, data = request('/export/csv', 'type=bogus', method='POST')
+        assert status == 400
+        assert data['error'] == 'Invalid data type'
+
+    def test_unknown_path_returns_404(self):
+        status, _, data = request('/nope')
+        assert status == 404
+        assert data['error'] == 'Endpoint not found'
+
+    def test_wrong_method_returns_405(self):
+        status, headers, _ = request('/scrape/mps', method='POST')
+        assert status == 405
+        assert 'GET' in headers['allow']
+
+    def test_cache_headers(self):
+        fresh = UKGovernmentScraper(cache_timeout=3600)
+        with patch.object(asgi.async_scraper, 'scraper', fresh), patch('app.pdpy') as mock_pdpy:
+            mock_pdpy.fetch_mps.return_value = pd.DataFrame([{'name': 'Test MP'}])
+
+            _, first, _ = request('/scrape/mps')
+            _, second, _ = request('/scrape/mps')
+
+        assert first['x-cache'] == 'MISS'
+        assert second['x-cache'] == 'HIT'
+
+
+@pytest.mark.api
+class TestAsyncScraper:
+    """Test the async scraper runs blocking scrapes off the event loop."""
+
+    def test_identical_concurrent_scrapes_share_one_call(self):
+        release = threading.Event()
+        calls = []
+
+        def slow_scrape(**kwargs):
+            calls.append(kwargs)
+            release.wait(5)
+            return [{'name': 'Test MP'}]
+
+        async def main():
+            scraper = AsyncUKGovernmentScraper(max_workers=2)
+            with patch.object(scraper.scraper, 'scrape_mps', side_effect=slow_scrape):
+                waiters = [asyncio.ensure_future(scraper.scrape_mps(current=True)) for _ in range(50)]
+                await asyncio.sleep(0.05)
+                release.set()
+                return await asyncio.gather(*waiters)
+
+        results = asyncio.run(main())
+
+        assert len(calls) == 1
+        assert all(result == [{'name': 'Test MP'}] for result in results)
+
+    def test_health_payload_built_off_the_event_loop(self):
+        threads = []
+
+        def payload():
+            threads.append(threading.current_thread())
+            return {'status': 'healthy'}
+
+        with patch('asgi.health_payload', side_effect=payload):
+            status, _, data = request('/health')
+
+        assert (status, data) == (200, {'status': 'healthy'})
+        assert threads and threads[0] is not threading.main_thread()
+
+    def test_json_body_encoded_off_the_event_loop(self):
+        threads = []
+        encode = asgi.service.app.json.encode
+
+        def traced_encode(obj):
+            threads.append(threading.current_thread())
+            return encode(obj)
+
+        with patch.object(asgi.service.app.json, 'encode', side_effect=traced_encode):
+            status, _, data = request('/')
+
+        assert status == 200
+        assert '/scrape/mps' in data['endpoints']
+        assert threads and threads[0] is not threading.main_thread()
+
+    def test_health_answers_while_a_scrape_is_blocked(self):
+        release = threading.Event()
+
+        def slow_scrape(**kwargs):
+            release.wait(5)
+            return []
+
+        async def main():
+            with patch('app.scraper.scrape_lords', side_effect=slow_scrape):
+                slow = asyncio.ensure_future(call('/scrape/lords'))
+                await asyncio.sleep(0.01)
+                status, _, _ = await asyncio.wait_for(call('/health'), timeout=1)
+                assert not slow.done()
+                release.set()
+                await slow
+                return status
+
+        assert asyncio.run(main()) == 200
@@ -0,0 +1,661 @@
+"""
+Unit tests for the TTL- and size-bounded cache engine.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+import pytest
+import pandas as pd
+from unittest.mock import patch
+
+import asgi
+from app import DATASET_TABLES, UKGovernmentScraper, app
+from cache import FileCache, SingleFlight, TTLCache, estimate_size
+
+
+def wait_for_refreshes(scraper):
+    """Block until the scraper has no background refreshes queued or running."""
+    while scraper._refreshing:
+        time.sleep(0.001)
+
+
+class FakeClock:
+    """Manually advanced clock for expiry tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.cache
+class TestTTLCache:
+    """Test expiry, eviction and counters of TTLCache."""
+
+    def test_entries_expire_after_ttl(self):
+        """Test entries are dropped once their TTL has passed."""
+        clock = FakeClock()
+        cache = TTLCache(ttl=10, max_bytes=10_000, sizeof=lambda v: 1, clock=clock)
+        cache['a'] = 1
+
+        clock.now = 9
+        assert cache['a'] == 1
+
+        clock.now = 10
+        assert 'a' not in cache
+        assert cache.get('a') is None
+        assert cache.stats()['expirations'] == 1
+
+    def test_per_entry_ttl_override(self):
+        """Test set() accepts a TTL for a single entry."""
+        clock = FakeClock()
+        cache = TTLCache(ttl=10, max_bytes=10_000, sizeof=lambda v: 1, clock=clock)
+        cache.set('short', 1, ttl=1)
+        cache['long'] = 2
+
+        clock.now = 5
+        assert 'short' not in cache
+        assert cache['long'] == 2
+
+    def test_lru_eviction_respects_byte_budget(self):
+        """Test least recently used entries are evicted to fit the budget."""
+        cache = TTLCache(ttl=60, max_bytes=30, sizeof=lambda v: 10)
+        cache['a'] = 1
+        cache['b'] = 2
+        cache['c'] = 3
+
+        # Touch 'a' so 'b' becomes the least recently used entry
+        assert cache['a'] == 1
+        cache['d'] = 4
+
+        assert set(cache) == {'a', 'c', 'd'}
+        assert cache.total_bytes == 30
+        assert cache.stats()['evictions'] == 1
+
+    def test_oversized_values_are_not_stored(self):
+        """Test a value larger than the whole budget is rejected."""
+        cache = TTLCache(ttl=60, max_bytes=5, sizeof=lambda v: 10)
+        cache['big'] = 'value'
+        assert 'big' not in cache
+        assert cache.total_bytes == 0
+
+    def test_hit_and_miss_counters(self):
+        """Test lookups are counted as hits or misses."""
+        cache = TTLCache(ttl=60, max_bytes=10_000)
+        cache['a'] = 1
+        cache.get('a')
+        cache.get('missing')
+
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+
+    def test_peek_does_not_wait_for_the_lock(self):
+        """Test peek answers while another thread holds the lock, counting only when it is free."""
+        cache = TTLCache(ttl=60, max_bytes=10_000)
+        cache['a'] = 1
+        assert cache.peek('a') == 1
+
+        held, release = threading.Event(), threading.Event()
+
+        def hold_lock():
+            with cache._lock:
+                held.set()
+                release.wait()
+
+        holder = threading.Thread(target=hold_lock)
+        holder.start()
+        held.wait()
+        try:
+            assert cache.peek('a') == 1
+            assert cache.peek('missing') is None
+        finally:
+            release.set()
+            holder.join()
+
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 0
+
+    def test_estimate_size_of_dataframe_and_records(self):
+        """Test size estimation covers DataFrames and nested records."""
+        df = pd.DataFrame({'name': ['John', 'Jane'] * 100})
+        assert estimate_size(df) > 0
+        assert estimate_size(df.to_dict('records')) > estimate_size([])
+
+    def test_estimate_size_extrapolates_from_a_sample(self):
+        """Test large lists and dicts are sized from a sample scaled to their length."""
+        records = [{'name': 'Member'}] * 10_000
+        per_record = estimate_size(records[0])
+        assert estimate_size(records) == sys.getsizeof(records) + 10_000 * per_record
+
+        mapping = {i: 'x' for i in range(10_000)}
+        assert estimate_size(mapping) >= sys.getsizeof(mapping) + 10_000 * estimate_size('x')
+
+
+@pytest.mark.cache
+class TestScraperCacheReuse:
+    """Test the scraper reuses fresh cache entries."""
+
+    @patch('app.pdpy')
+    def test_fresh_entry_skips_upstream_fetch(self, mock_pdpy):
+        """Test a repeated scrape is answered from the cache."""
+        scraper = UKGovernmentScraper()
+        mock_pdpy.fetch_mps.return_value = pd.DataFrame([{'name': 'Test MP'}])
+
+        first = scraper.scrape_mps()
+        second = scraper.scrape_mps()
+
+        assert first == second
+        mock_pdpy.fetch_mps.assert_called_once_with()
+
+    @patch('app.pdpy')
+    def test_views_are_cached_as_row_positions(self, mock_pdpy):
+        """Test views reference the snapshot tables and each call builds its own row dicts."""
+        scraper = UKGovernmentScraper()
+        mock_pdpy.fetch_mps_committee_memberships.return_value = pd.DataFrame([{'name': 'Member'}])
+        mock_pdpy.fetch_lords_committee_memberships.return_value = pd.DataFrame([])
+
+        first = scraper.scrape_committee_memberships()
+        first['mps_committee_memberships'][0]['name'] = 'Changed'
+
+        view = scraper.cache['committees_current_False_from_None_to_None_on_None']['data']
+        table = scraper.snapshot.tables['fetch_mps_committee_memberships']['data']
+        assert view['mps_committee_memberships'].table is table
+        assert scraper.scrape_committee_memberships()['mps_committee_memberships'] == [{'name': 'Member'}]
+
+    @patch('app.pdpy')
+    def test_cached_views_are_read_without_the_cache_lock(self, mock_pdpy):
+        """Test a cached view is served while a writer holds the cache lock."""
+        scraper = UKGovernmentScraper()
+        mock_pdpy.fetch_mps_committee_memberships.return_value = pd.DataFrame([{'name': 'Member'}])
+        mock_pdpy.fetch_lords_committee_memberships.return_value = pd.DataFrame([])
+        scraper.committee_membership_views()
+
+        results = []
+        with scraper.cache._lock:
+            reader = threading.Thread(target=lambda: results.append(scraper.committee_membership_views()))
+            reader.start()
+            reader.join(timeout=5)
+            assert not reader.is_alive()
+        assert results[0]['mps_committee_memberships'].table is \
+            scraper.snapshot.tables['fetch_mps_committee_memberships']['data']
+
+    @patch('app.pdpy')
+    def test_expired_entry_refetches(self, mock_pdpy):
+        """Test a zero cache timeout always goes upstream."""
+        scraper = UKGovernmentScraper(cache_timeout=0, cache_max_stale=0)
+        mock_pdpy.fetch_mps_government_roles.return_value = pd.DataFrame([])
+        mock_pdpy.fetch_lords_government_roles.return_value = pd.DataFrame([])
+
+        scraper.scrape_government_roles()
+        scraper.scrape_government_roles()
+
+        assert mock_pdpy.fetch_mps_government_roles.call_count == 2
+
+
+
+@pytest.mark.cache
+class TestStaleWhileRevalidate:
+    """Test stale entries are served while one background refresh runs."""
+
+    @patch('app.pdpy')
+    def test_stale_entry_served_and_refreshed_once(self, mock_pdpy):
+        """Test a stale hit returns old data and schedules a single refresh."""
+        scraper = UKGovernmentScraper(cache_timeout=0, cache_max_stale=3600)
+        release = threading.Event()
+        mock_pdpy.fetch_lords.return_value = pd.DataFrame([{'name': 'Old Lord'}])
+        assert scraper.scrape_lords() == [{'name': 'Old Lord'}]
+
+        def slow_refresh(**kwargs):
+            release.wait(timeout=5)
+            return pd.DataFrame([{'name': 'New Lord'}])
+
+        mock_pdpy.fetch_lords.side_effect = slow_refresh
+        assert scraper.scrape_lords() == [{'name': 'Old Lord'}]
+        assert scraper.scrape_lords() == [{'name': 'Old Lord'}]
+
+        release.set()
+        wait_for_refreshes(scraper)
+
+        assert mock_pdpy.fetch_lords.call_count == 2
+        assert scraper.scrape_lords() == [{'name': 'New Lord'}]
+        wait_for_refreshes(scraper)
+
+    @patch('app.pdpy')
+    def test_failed_refresh_keeps_stale_data(self, mock_pdpy):
+        """Test a failing background refresh leaves the last good result."""
+        scraper = UKGovernmentScraper(cache_timeout=0, cache_max_stale=3600)
+        mock_pdpy.fetch_mps_committee_memberships.return_value = pd.DataFrame([{'name': 'Member'}])
+        mock_pdpy.fetch_lords_committee_memberships.return_value = pd.DataFrame([])
+        scraper.scrape_committee_memberships()
+
+        mock_pdpy.fetch_mps_committee_memberships.side_effect = Exception("API Error")
+        result = scraper.scrape_committee_memberships()
+        wait_for_refreshes(scraper)
+
+        assert result['mps_committee_memberships'] == [{'name': 'Member'}]
+        assert 'committees_current_False_from_None_to_None_on_None' in scraper.cache
+        assert 'fetch_mps_committee_memberships' in scraper.snapshot.tables
+
+    @patch('app.scraper')
+    def test_response_reports_cache_age(self, mock_scraper_instance, client):
+        """Test responses served from the cache carry Age and X-Cache headers."""
+        fresh = UKGovernmentScraper()
+        fresh._publish_tables({'fetch_mps': pd.DataFrame([])})
+        mock_scraper_instance.scrape_mps.side_effect = fresh.scrape_mps
+
+        response = client.get('/scrape/mps')
+
+        assert response.status_code == 200
+        assert response.headers['X-Cache'] == 'HIT'
+        assert int(response.headers['Age']) >= 0
+
+    @patch('app.pdpy')
+    def test_cached_full_scrape_reports_age_and_expires_at_soft_ttl(self, mock_pdpy):
+        """Test cache=true reports the cached full scrape's age and rebuilds it once it is stale."""
+        for tables in DATASET_TABLES.values():
+            for name in tables:
+                getattr(mock_pdpy, name).return_value = pd.DataFrame([{'name': 'Old'}])
+        scraper = UKGovernmentScraper(cache_timeout=60, cache_max_stale=3600)
+        scraper.scrape_all_data()
+        stored_at = scraper.snapshot.all_data['stored_at']
+
+        with patch('app.scraper', scraper), patch.object(asgi.async_scraper, 'scraper', scraper):
+            with patch('app.time.monotonic', return_value=stored_at + 5):
+                cached = app.test_client().get('/scrape/all?cache=true')
+                messages = asyncio.run(asgi_call('/scrape/all?cache=true'))
+            with patch('app.time.monotonic', return_value=stored_at + 61), \
+                 patch.object(scraper, '_schedule_refresh') as schedule_refresh:
+                stale = app.test_client().get('/scrape/all?cache=true')
+
+        assert (cached.headers['X-Cache'], cached.headers['Age']) == ('HIT', '5')
+        assert (dict(messages[0]['headers'])[b'x-cache'], dict(messages[0]['headers'])[b'age']) == (b'HIT', b'5')
+        # Rebuilt from the stale tables, each of which is refreshed in the background
+        assert stale.headers['X-Cache'] == 'STALE'
+        assert schedule_refresh.call_count == 6
+        assert scraper.snapshot.all_data['stored_at'] == stored_at + 61
+
+    def test_response_without_cache_lookup_has_no_marker(self, client):
+        """Test endpoints that do not read the cache add no cache headers."""
+        response = client.get('/health')
+        assert 'X-Cache' not in response.headers
+
+
+@pytest.mark.cache
+class TestSingleFlight:
+    """Test coalescing of identical concurrent calls."""
+
+    @staticmethod
+    def _run_concurrently(target, count):
+        threads = [threading.Thread(target=target) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def test_concurrent_callers_share_one_call(self):
+        """Test callers with the same key wait on the leader's result."""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def slow_fetch():
+            calls.append(1)
+            release.wait(timeout=5)
+            return ['shared']
+
+        threads = self._run_concurrently(lambda: results.append(flight.do('mps', slow_fetch)), 10)
+        while flight.shared < 9:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert len(calls) == 1
+        assert results == [['shared']] * 10
+        assert flight.in_flight() == 0
+
+    def test_waiters_receive_leader_exception(self):
+        """Test a failed call raises in every waiting caller."""
+        flight = SingleFlight()
+        release = threading.Event()
+        errors = []
+
+        def failing_fetch():
+            release.wait(timeout=5)
+            raise RuntimeError('upstream down')
+
+        def call():
+            try:
+                flight.do('lords', failing_fetch)
+            except RuntimeError as exc:
+                errors.append(exc)
+
+        threads = self._run_concurrently(call, 3)
+        while flight.shared < 2:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert len(errors) == 3
+
+    def test_sequential_calls_run_again(self):
+        """Test a finished call does not answer later calls."""
+        flight = SingleFlight()
+        assert flight.do('key', lambda: 1) == 1
+        assert flight.do('key', lambda: 2) == 2
+
+    @patch('app.pdpy')
+    def test_scraper_coalesces_concurrent_scrapes(self, mock_pdpy):
+        """Test concurrent identical scrapes make one upstream call."""
+        scraper = UKGovernmentScraper()
+        release = threading.Event()
+
+        def fetch_mps(**kwargs):
+            release.wait(timeout=5)
+            return pd.DataFrame([{'name': 'Test MP'}])
+
+        mock_pdpy.fetch_mps.side_effect = fetch_mps
+        results = []
+        threads = self._run_concurrently(lambda: results.append(scraper.scrape_mps()), 5)
+        while scraper.inflight.shared < 4:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert mock_pdpy.fetch_mps.call_count == 1
+        assert results == [[{'name': 'Test MP'}]] * 5
+
+
+    @patch('app.pdpy')
+    def test_late_caller_takes_table_published_by_finished_flight(self, mock_pdpy):
+        """Test a caller that saw a table missing reuses the copy its finished flight published."""
+        scraper = UKGovernmentScraper()
+        mock_pdpy.fetch_mps.return_value = pd.DataFrame([{'name': 'Test MP'}])
+        scraper.scrape_mps()
+        entry = scraper.snapshot.tables['fetch_mps']
+
+        # As if the caller found the table missing just before the first flight published it
+        published = scraper._publish_fetched(scraper._fetch_tables(['fetch_mps'], publish=True))
+
+        mock_pdpy.fetch_mps.assert_called_once_with()
+        assert published['fetch_mps'] is entry
+        assert scraper.snapshot.tables['fetch_mps'] is entry
+
+def _shared_fetch(directory, started, results):
+    """Fetch through a FileCache from a child process, recording whether fn ran."""
+    cache = FileCache(directory, ttl=60)
+    started.wait(timeout=5)
+
+    def fetch():
+        time.sleep(0.2)
+        return 'upstream'
+
+    value, _ = cache.do('fetch_mps', fetch)
+    results.put((value, cache.writes))
+
+
+@pytest.mark.cache
+class TestFileCache:
+    """Test the cross-process file cache."""
+
+    def test_entries_expire_after_ttl(self, tmp_path):
+        """Test per-key TTLs are applied with the shared clock."""
+        clock = FakeClock()
+        cache = FileCache(tmp_path, ttl=10, clock=clock)
+        cache.set('a', [1, 2])
+        cache.set('short', 'x', ttl=1)
+
+        clock.now = 5
+        assert cache.lookup('a') == ([1, 2], 0.0)
+        assert cache.lookup('short') is None
+
+        clock.now = 10
+        assert cache.lookup('a') is None
+        assert cache.stats()['entries'] == 0
+
+    def test_directory_is_created_private(self, tmp_path):
+        """Test a new cache directory is readable and writable only by its owner."""
+        FileCache(tmp_path / 'shared', ttl=10)
+        assert (tmp_path / 'shared').stat().st_mode & 0o777 == 0o700
+
+    def test_directory_writable_by_others_is_refused(self, tmp_path):
+        """Test a directory other users could plant entries in is not used."""
+        directory = tmp_path / 'shared'
+        directory.mkdir()
+        directory.chmod(0o777)
+        with pytest.raises(PermissionError):
+            FileCache(directory, ttl=10)
+
+    def test_directory_owned_by_another_user_is_refused(self, tmp_path):
+        """Test a directory created first by another user is not used."""
+        with patch('cache.os.geteuid', return_value=os.geteuid() + 1), pytest.raises(PermissionError):
+            FileCache(tmp_path, ttl=10)
+
+    def test_scraper_runs_without_refused_shared_cache(self, tmp_path):
+        """Test the scraper logs and skips a shared cache directory it refuses."""
+        tmp_path.chmod(0o777)
+        with patch('app.settings.SHARED_CACHE_DIR', str(tmp_path)):
+            assert UKGovernmentScraper().shared_cache is None
+
+    def test_expired_read_keeps_entry_replaced_meanwhile(self, tmp_path):
+        """Test a reader that finds an expired entry does not delete a fresh one written in its place."""
+        writer = FileCache(tmp_path, ttl=60, clock=lambda: 100)
+        FileCache(tmp_path, ttl=1, clock=lambda: 0).set('key', 'old')
+
+        def clock():
+            # Another process replaces the entry after the reader opened the old file
+            writer.set('key', 'fresh')
+            return 100
+
+        assert FileCache(tmp_path, ttl=60, clock=clock).lookup('key') is None
+        assert writer.lookup('key') == ('fresh', 100)
+
+    def test_newer_than_skips_older_entries(self, tmp_path):
+        """Test callers can ask only for entries stored after their own copy."""
+        clock = FakeClock()
+        cache = FileCache(tmp_path, ttl=60, clock=clock)
+        clock.now = 3
+        cache.set('fetch_lords', 'old')
+
+        assert cache.lookup('fetch_lords', newer_than=2) == ('old', 3)
+        assert cache.lookup('fetch_lords', newer_than=3) is None
+        assert cache.do('fetch_lords', lambda: 'new', newer_than=3) == ('new', 3)
+
+    def test_keys_are_escaped_into_file_names(self, tmp_path):
+        """Test keys with path separators stay inside the cache directory."""
+        cache = FileCache(tmp_path, ttl=60)
+        cache.set('../escape/key', 'value')
+        assert cache.lookup('../escape/key')[0] == 'value'
+        assert [p.parent for p in tmp_path.iterdir()] == [tmp_path]
+
+    def test_processes_share_one_computation(self, tmp_path):
+        """Test concurrent processes asking for a key run its computation once."""
+        context = multiprocessing.get_context('fork')
+        started = context.Event()
+        results = context.Queue()
+        processes = [
+            context.Process(target=_shared_fetch, args=(str(tmp_path), started, results)) for _ in range(3)
+        ]
+        for process in processes:
+            process.start()
+        started.set()
+        outcomes = [results.get(timeout=10) for _ in processes]
+        for process in processes:
+            process.join(timeout=5)
+
+        assert [value for value, _ in outcomes] == ['upstream'] * 3
+        assert sum(writes for _, writes in outcomes) == 1
+
+    @patch('app.pdpy')
+    def test_scrapers_share_fetched_tables(self, mock_pdpy, tmp_path):
+        """Test a second scraper loads a table another one fetched instead of going upstream."""
+        mock_pdpy.fetch_mps.return_value = pd.DataFrame([{'name': 'Test MP'}])
+        first = UKGovernmentScraper(shared_cache=FileCache(tmp_path, ttl=60))
+        second = UKGovernmentScraper(shared_cache=FileCache(tmp_path, ttl=60))
+
+        assert first.scrape_mps() == second.scrape_mps() == [{'name': 'Test MP'}]
+        mock_pdpy.fetch_mps.assert_called_once_with()
+        assert second.shared_cache.stats()['hits'] == 1
+
+    @patch('app.pdpy')
+    def test_refresh_adopts_newer_shared_copy(self, mock_pdpy, tmp_path):
+        """Test a refresh reuses a table another process refreshed after this one loaded it."""
+        mock_pdpy.fetch_lords.return_value = pd.DataFrame([{'name': 'Old Lord'}])
+        first = UKGovernmentScraper(shared_cache=FileCache(tmp_path, ttl=60))
+        second = UKGovernmentScraper(shared_cache=FileCache(tmp_path, ttl=60))
+        first.scrape_lords()
+        second.scrape_lords()
+
+        time.sleep(0.01)
+        mock_pdpy.fetch_lords.return_value = pd.DataFrame([{'name': 'New Lord'}])
+        first.refresh_tables(['fetch_lords'])
+        second.refresh_tables(['fetch_lords'])
+
+        assert mock_pdpy.fetch_lords.call_count == 2
+        assert second.scrape_lords() == [{'name': 'New Lord'}]
+
+        # With no newer shared copy, a refresh goes upstream
+        second.refresh_tables(['fetch_lords'])
+        assert mock_pdpy.fetch_lords.call_count == 3
+
+
+@pytest.mark.cache
+class TestConditionalRequests:
+    """Test content-hash ETags and 304 Not Modified on the dataset endpoints."""
+
+    @pytest.fixture
+    def mock_pdpy(self):
+        with patch('app.pdpy') as mock_pdpy:
+            for tables in DATASET_TABLES.values():
+                for name in tables:
+                    getattr(mock_pdpy, name).return_value = pd.DataFrame([])
+            mock_pdpy.fetch_mps.return_value = pd.DataFrame([{'name': 'A', 'party': 'Lab'}])
+            yield mock_pdpy
+
+    @pytest.fixture
+    def scraper(self, mock_pdpy):
+        scraper = UKGovernmentScraper(cache_timeout=3600)
+        with patch('app.scraper', scraper), patch.object(asgi.async_scraper, 'scraper', scraper):
+            yield scraper
+
+    def test_unchanged_data_not_modified(self, scraper):
+        client = app.test_client()
+        etag = client.get('/scrape/mps?current=true').headers['ETag']
+
+        with patch.object(app.json, 'response') as response, patch.object(scraper, 'scrape_mps') as scrape_mps:
+            conditional = client.get('/scrape/mps?current=true', headers={'If-None-Match': etag})
+
+        assert conditional.status_code == 304
+        assert conditional.data == b''
+        assert conditional.headers['ETag'] == etag
+        response.assert_not_called()
+        scrape_mps.assert_not_called()
+
+    def test_etag_is_weak_and_stable(self, scraper, mock_pdpy):
+        client = app.test_client()
+        etag = client.get('/scrape/mps').headers['ETag']
+
+        # Weak, as metadata.scraped_at differs between responses with the same rows
+        assert etag.startswith('W/"')
+        # An identical refresh leaves the ETag alone; changed data or parameters change it
+        scraper.refresh_tables(['fetch_mps'])
+        assert client.get('/scrape/mps').headers['ETag'] == etag
+        assert client.get('/scrape/mps?fields=name').headers['ETag'] != etag
+        mock_pdpy.fetch_mps.return_value = pd.DataFrame([{'name': 'B', 'party': 'Con'}])
+        scraper.refresh_tables(['fetch_mps'])
+        changed = client.get('/scrape/mps', headers={'If-None-Match': etag})
+        assert changed.status_code == 200
+        assert changed.headers['ETag'] != etag
+
+    def test_refresh_during_response_keeps_etag_of_rows_sent(self, scraper, mock_pdpy):
+        client = app.test_client()
+        etag = client.get('/scrape/mps').headers['ETag']
+        scraper.cache.clear()
+        scrape_mps = scraper.scrape_mps
+
+        def scrape_then_refresh(**kwargs):
+            rows = scrape_mps(**kwargs)
+            mock_pdpy.fetch_mps.return_value = pd.DataFrame([{'name': 'B', 'party': 'Con'}])
+            scraper.refresh_tables(['fetch_mps'])
+            return rows
+
+        with patch.object(scraper, 'scrape_mps', side_effect=scrape_then_refresh):
+            racing = client.get('/scrape/mps')
+
+        assert racing.get_json()['members_of_parliament'] == [{'name': 'A', 'party': 'Lab'}]
+        assert racing.headers['ETag'] == etag
+        assert client.get('/scrape/mps').headers['ETag'] != etag
+
+    def test_conditional_check_has_no_side_effects(self, scraper):
+        app.test_client().get('/scrape/mps')
+        entry = scraper.snapshot.tables['fetch_mps']
+
+        # Past the soft TTL, a read would schedule a refresh and record a STALE lookup
+        with patch('app.time.monotonic', return_value=entry['stored_at'] + scraper.soft_ttl + 1), \
+             patch.object(scraper, '_schedule_refresh') as schedule_refresh, \
+             patch('app._record_cache_lookup') as record_lookup:
+            assert scraper.content_etag('mps', {}) is not None
+
+        schedule_refresh.assert_not_called()
+        record_lookup.assert_not_called()
+
+    def test_not_modified_schedules_refresh_of_stale_tables(self, scraper):
+        etag = app.test_client().get('/scrape/mps').headers['ETag']
+        stored_at = scraper.snapshot.tables['fetch_mps']['stored_at']
+
+        with patch('app.time.monotonic', return_value=stored_at + scraper.soft_ttl + 1), \
+             patch.object(scraper, '_schedule_refresh') as schedule_refresh:
+            wsgi = app.test_client().get('/scrape/mps', headers={'If-None-Match': etag})
+            messages = asyncio.run(asgi_call('/scrape/mps', etag))
+
+        assert wsgi.status_code == messages[0]['status'] == 304
+        # Once per front end; the membership table was never loaded, so there is nothing to refresh
+        assert [name for (name,), _ in schedule_refresh.call_args_list] == ['fetch_mps', 'fetch_mps']
+
+    def test_no_etag_without_loaded_data(self, scraper):
+        assert scraper.content_etag('mps', {}) is None
+        assert scraper.content_etag('lords', {}) is None
+        assert 'ETag' not in app.test_client().get('/scrape/all').headers
+
+    def test_asgi_not_modified(self, scraper):
+        etag = app.test_client().get('/scrape/committees').headers['ETag']
+
+        messages = asyncio.run(asgi_call('/scrape/committees', etag))
+        fresh = asyncio.run(asgi_call('/scrape/committees', '"other"'))
+
+        assert messages[0]['status'] == 304
+        assert dict(messages[0]['headers'])[b'etag'] == etag.encode()
+        assert messages[1] == {'type': 'http.response.body', 'body': b''}
+        assert fresh[0]['status'] == 200
+        assert dict(fresh[0]['headers'])[b'etag'] == etag.encode()
+
+
+async def asgi_call(path, if_none_match=None):
+    """Send one GET, conditional if if_none_match is given, to the ASGI app and return every message it sent."""
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    path, _, query = path.partition('?')
+    headers = [] if if_none_match is None else [(b'if-none-match', if_none_match.encode())]
+    scope = {'type': 'http', 'path': path, 'method': 'GET', 'query_string': query.encode(), 'headers': headers}
+    await asgi.app(scope, receive, send)
+    return messages
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
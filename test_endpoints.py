@@ -223,6 +223,22 @@ class EndpointTests(unittest.TestCase):
         self.assertTrue(data['metadata']['filter_current'])
         mock_scrape_gov.assert_called_with(current=True)
 
+    @patch('app.scraper.scrape_government_roles')
+    def test_scrape_government_roles_date_filters(self, mock_scrape_gov):
+        """Test government roles passes date filters through to the scraper."""
+        mock_scrape_gov.return_value = {
+            'mps_government_roles': [],
+            'lords_government_roles': []
+        }
+
+        response = self.app.get('/scrape/government-roles?from_date=2019-01-01&to_date=2019-12-31')
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+
+        self.assertEqual(data['metadata']['from_date'], '2019-01-01')
+        self.assertEqual(data['metadata']['to_date'], '2019-12-31')
+        mock_scrape_gov.assert_called_with(current=False, from_date='2019-01-01', to_date='2019-12-31')
+
     # === Committees Tests ===
     
     @patch('app.scraper.scrape_committee_memberships')
@@ -304,7 +320,7 @@ class EndpointTests(unittest.TestCase):
             'members_of_parliament': [{'name': 'Cached MP'}],
             'metadata': {'cached': True}
         }
-        mock_scraper_instance.cache = {'all': cached_data}
+        mock_scraper_instance.cached_all_data.return_value = cached_data
         
         response = self.app.get('/scrape/all?cache=true')
         self.assertEqual(response.status_code, 200)
@@ -317,7 +333,7 @@ class EndpointTests(unittest.TestCase):
     @patch('app.scraper')
     def test_scrape_all_cache_miss(self, mock_scraper_instance):
         """Test cache behavior when cache is empty."""
-        mock_scraper_instance.cache = {}
+        mock_scraper_instance.cached_all_data.return_value = None
         mock_scraper_instance.scrape_all_data.return_value = {'test': 'data'}
         
         response = self.app.get('/scrape/all?cache=true')
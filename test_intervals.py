@@ -0,0 +1,94 @@
+"""
+Unit tests for the interval index over start/end date columns.
+"""
+
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cache import estimate_size
+from intervals import IntervalIndex
+
+
+def brute_force(starts, ends, low, high):
+    """Positions whose [start, end] overlaps [low, high], treating None as open."""
+    return [
+        i for i, (start, end) in enumerate(zip(starts, ends))
+        if (start is None or start <= high) and (end is None or end >= low) and
+        (start is None or end is None or start <= end)
+    ]
+
+
+@pytest.mark.unit
+class TestIntervalIndex:
+    """Test point-in-time and overlap queries."""
+
+    def setup_method(self):
+        self.table = pd.DataFrame({
+            'start': ['2010-05-06', '2015-05-07', '2019-12-12', None],
+            'end': ['2015-03-30', None, '2024-05-30', '2001-01-01'],
+        })
+        self.index = IntervalIndex.from_frame(self.table, 'start', 'end')
+
+    def test_len_counts_all_rows(self):
+        assert len(self.index) == 4
+
+    def test_at_includes_boundaries(self):
+        assert self.index.at('2015-03-30').tolist() == [0]
+        assert self.index.at('2015-05-07').tolist() == [1]
+        assert self.index.at('2020-01-01').tolist() == [1, 2]
+
+    def test_missing_start_is_open_ended(self):
+        assert self.index.at('1990-01-01').tolist() == [3]
+
+    def test_overlapping_window(self):
+        assert self.index.overlapping('2015-04-01', '2015-05-06').tolist() == []
+        assert self.index.overlapping('2014-01-01', '2016-01-01').tolist() == [0, 1]
+
+    def test_overlapping_open_bounds(self):
+        assert self.index.overlapping().tolist() == [0, 1, 2, 3]
+        assert self.index.overlapping(from_date='2024-06-01').tolist() == [1]
+        assert self.index.overlapping(to_date='2005-01-01').tolist() == [3]
+
+    def test_reversed_window_raises(self):
+        with pytest.raises(ValueError):
+            self.index.overlapping('2020-01-01', '2019-01-01')
+
+    def test_rows_ending_before_start_never_match(self):
+        index = IntervalIndex(['2020-01-01'], ['2019-01-01'])
+        assert index.overlapping().tolist() == []
+
+    def test_empty_index(self):
+        index = IntervalIndex([], [])
+        assert len(index) == 0
+        assert index.at('2020-01-01').tolist() == []
+        assert index.overlapping('2019-01-01', '2021-01-01').tolist() == []
+
+    def test_size_counts_every_node(self):
+        days = pd.date_range('2000-01-01', periods=20000, freq='D')
+        index = IntervalIndex(days, days + pd.Timedelta(days=30))
+
+        # Every row's start, end and position are held at least once in the tree and the start order
+        assert estimate_size(index) > 20000 * 8 * 5
+        assert estimate_size(index) < 20000 * 8 * 20
+
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        starts, ends = [], []
+        for _ in range(2000):
+            start = rng.randrange(0, 5000)
+            starts.append(None if rng.random() < 0.05 else start)
+            ends.append(None if rng.random() < 0.2 else start + rng.randrange(0, 800))
+
+        base = np.datetime64('2000-01-01')
+        to_date = lambda day: None if day is None else str(base + np.timedelta64(day, 'D'))
+        index = IntervalIndex([to_date(d) for d in starts], [to_date(d) for d in ends])
+
+        for _ in range(200):
+            low = rng.randrange(-100, 5900)
+            high = low + rng.randrange(0, 400)
+            expected = brute_force(starts, ends, low, high)
+            assert index.overlapping(to_date(low), to_date(high)).tolist() == expected
+            assert index.at(to_date(low)).tolist() == brute_force(starts, ends, low, low)
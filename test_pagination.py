@@ -0,0 +1,143 @@
+"""
+Unit tests for cursor pagination of the dataset endpoints.
+"""
+
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+import asgi
+from app import DATASET_TABLES, UKGovernmentScraper, app
+from pagination import InvalidCursorError, decode_cursor, encode_cursor, paginate
+from test_asgi import request as asgi_request
+from views import TableView, encode_categories
+
+
+@pytest.fixture
+def table():
+    return encode_categories(pd.DataFrame({
+        'person_id': [f'p{i}' for i in range(10)],
+        'party': ['Lab', 'Con'] * 5,
+    }))
+
+
+def all_pages(datasets, limit):
+    """Follow next cursors from the first page to the last, returning every page."""
+    pages = [paginate(datasets, limit)]
+    while pages[-1].next_cursor is not None:
+        pages.append(paginate(datasets, limit, pages[-1].next_cursor))
+    return pages
+
+
+@pytest.mark.unit
+class TestPaginate:
+    """Test paging through views with cursors."""
+
+    def test_pages_cover_view_once_in_order(self, table):
+        view = TableView(table).where(table['party'] == 'Lab')
+        pages = all_pages({'rows': view}, 2)
+
+        assert [len(page.rows['rows']) for page in pages] == [2, 2, 1]
+        assert [row for page in pages for row in page.rows['rows']] == view.records()
+        assert all(page.total_count == 5 for page in pages)
+
+    def test_exact_fit_has_no_next_page(self, table):
+        page = paginate({'rows': TableView(table)}, 10)
+        assert len(page.rows['rows']) == 10
+        assert page.next_cursor is None
+
+    def test_pages_span_datasets(self, table):
+        datasets = {'mps': TableView(table, [0, 1, 2]), 'empty': TableView(table, []), 'lords': TableView(table, [7, 8])}
+        pages = all_pages(datasets, 2)
+
+        assert [{name: [row['person_id'] for row in rows] for name, rows in page.rows.items()} for page in pages] == [
+            {'mps': ['p0', 'p1'], 'empty': [], 'lords': []},
+            {'mps': ['p2'], 'empty': [], 'lords': ['p7']},
+            {'mps': [], 'empty': [], 'lords': ['p8']},
+        ]
+
+    def test_page_builds_only_its_rows(self, table):
+        cursor = paginate({'rows': TableView(table)}, 3).next_cursor
+        with patch.object(TableView, 'records', autospec=True, return_value=[]) as records:
+            paginate({'rows': TableView(table)}, 3, cursor)
+
+        records.assert_called_once()
+        assert records.call_args.args[1:] == (3, 6)
+
+    def test_cursor_refused_when_row_changed(self, table):
+        cursor = paginate({'rows': TableView(table)}, 3).next_cursor
+        refreshed = table.iloc[1:].reset_index(drop=True)
+
+        with pytest.raises(InvalidCursorError, match='refreshed'):
+            paginate({'rows': TableView(refreshed)}, 3, cursor)
+
+    def test_bad_cursors_refused(self, table):
+        with pytest.raises(InvalidCursorError, match='Malformed'):
+            paginate({'rows': TableView(table)}, 3, 'not-a-cursor')
+        with pytest.raises(InvalidCursorError, match='another dataset'):
+            paginate({'rows': TableView(table)}, 3, encode_cursor('lords', 0, 'p0'))
+
+    def test_cursor_round_trip(self):
+        assert decode_cursor(encode_cursor('mps', 12, 'https://id.parliament.uk/43RHonMf')) == (
+            'mps', 12, 'https://id.parliament.uk/43RHonMf',
+        )
+
+
+@pytest.mark.api
+class TestPaginatedEndpoints:
+    """Test limit and after on the dataset endpoints."""
+
+    @pytest.fixture(autouse=True)
+    def paged_scraper(self, table):
+        with patch('app.pdpy') as mock_pdpy:
+            for tables in DATASET_TABLES.values():
+                for name in tables:
+                    getattr(mock_pdpy, name).return_value = pd.DataFrame([])
+            mock_pdpy.fetch_mps.return_value = table
+            mock_pdpy.fetch_mps_committee_memberships.return_value = table.iloc[:3]
+            mock_pdpy.fetch_lords_committee_memberships.return_value = table.iloc[3:5]
+            scraper = UKGovernmentScraper(cache_timeout=3600)
+            with patch('app.scraper', scraper), patch.object(asgi.async_scraper, 'scraper', scraper):
+                yield scraper
+
+    def test_members_pages(self):
+        client = app.test_client()
+        first = client.get('/scrape/mps?limit=4').get_json()
+        second = client.get(f"/scrape/mps?limit=4&after={first['pagination']['next_cursor']}").get_json()
+
+        assert [row['person_id'] for row in first['members_of_parliament']] == ['p0', 'p1', 'p2', 'p3']
+        assert [row['person_id'] for row in second['members_of_parliament']] == ['p4', 'p5', 'p6', 'p7']
+        assert first['summary']['total_count'] == 4
+        assert first['pagination']['total_count'] == 10
+        assert second['pagination']['after'] == first['pagination']['next_cursor']
+
+    def test_two_house_pages(self):
+        client = app.test_client()
+        first = client.get('/scrape/committees?limit=4').get_json()
+        second = client.get(f"/scrape/committees?limit=4&after={first['pagination']['next_cursor']}").get_json()
+
+        assert len(first['committee_memberships']['mps_committee_memberships']) == 3
+        assert len(first['committee_memberships']['lords_committee_memberships']) == 1
+        assert second['committee_memberships']['lords_committee_memberships'] == [{'person_id': 'p4', 'party': 'Lab'}]
+        assert second['pagination']['next_cursor'] is None
+
+    @pytest.mark.parametrize('query', ['limit=0', 'limit=abc', 'limit=100000', 'limit=²', 'limit=٣', 'after=garbage'])
+    def test_invalid_parameters(self, query):
+        response = app.test_client().get(f'/scrape/government-roles?{query}')
+
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Invalid pagination parameters'
+
+    def test_asgi_pages(self):
+        status, _, data = asgi_request('/scrape/lords', 'limit=2')
+        bad_status, _, _ = asgi_request('/scrape/mps', 'limit=-1')
+
+        assert status == 200
+        assert data['house_of_lords'] == []
+        assert data['pagination'] == {'limit': 2, 'after': None, 'next_cursor': None, 'total_count': 0}
+        assert bad_status == 400
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,178 @@
+"""
+Unit tests for the normalized person model.
+"""
+
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import asgi
+from app import DATASET_TABLES, PROFILE_SECTIONS, UKGovernmentScraper, app
+from test_asgi import request as asgi_request
+from persons import PersonModel
+from views import TableView
+
+
+def person(person_id, name):
+    return {'person_id': person_id, 'mnis_id': person_id[-1], 'display_name': name}
+
+
+@pytest.fixture
+def tables():
+    return {
+        'fetch_mps': pd.DataFrame([
+            {**person('p1', 'Alice'), 'full_title': 'Alice MP'},
+            {**person('p2', 'Bob'), 'full_title': 'Bob MP'},
+        ]),
+        'fetch_mps_committee_memberships': pd.DataFrame([
+            {**person('p2', 'Bob'), 'committee_name': 'Treasury', 'committee_membership_end_date': None},
+            {**person('p3', 'Cara'), 'committee_name': 'Defence', 'committee_membership_end_date': None},
+            {**person('p2', 'Bob'), 'committee_name': 'Defence', 'committee_membership_end_date': '2020-01-01'},
+        ]),
+        'no_people': pd.DataFrame([{'name': 'x'}]),
+    }
+
+
+@pytest.mark.unit
+class TestPersonModel:
+    """Test the persons table and per-person fact lookups."""
+
+    def test_each_person_listed_once(self, tables):
+        model = PersonModel(tables)
+
+        assert model.persons['person_id'].tolist() == ['p1', 'p2', 'p3']
+        # Identity comes from the first table listing the person; missing columns are None
+        assert model.persons.iloc[1]['full_title'] == 'Bob MP'
+        assert model.persons.iloc[2]['full_title'] is None
+        assert set(model.tables) == {'fetch_mps', 'fetch_mps_committee_memberships'}
+
+    def test_fact_columns_keep_only_person_id(self, tables):
+        model = PersonModel(tables)
+        columns = tables['fetch_mps_committee_memberships'].columns
+        assert model.fact_columns(columns) == ['person_id', 'committee_name', 'committee_membership_end_date']
+
+    def test_person_lookup(self, tables):
+        model = PersonModel(tables)
+        bob = model.person('p2')
+
+        assert bob['person']['display_name'] == 'Bob'
+        assert [row['committee_name'] for row in bob['facts']['fetch_mps_committee_memberships']] == [
+            'Treasury', 'Defence',
+        ]
+        assert 'display_name' not in bob['facts']['fetch_mps'][0]
+        assert model.person('missing') is None
+
+    def test_person_rows_of_views(self, tables):
+        model = PersonModel(tables)
+        committees = tables['fetch_mps_committee_memberships']
+        view = TableView(committees, np.array([1, 2]))
+
+        assert model.person_rows('fetch_mps_committee_memberships', view).tolist() == [2, 1]
+        # A view of another copy of the table is joined by person_id instead
+        copy = TableView(committees.copy(), np.array([1, 2]))
+        assert model.person_rows('fetch_mps_committee_memberships', copy).tolist() == [2, 1]
+
+
+@pytest.mark.unit
+class TestNormalizedPayload:
+    """Test the normalized all-data payload."""
+
+    @patch('app.pdpy')
+    def test_payload_lists_persons_once(self, mock_pdpy, tables):
+        for name in ('fetch_lords', 'fetch_mps_government_roles', 'fetch_lords_government_roles',
+                     'fetch_lords_committee_memberships'):
+            getattr(mock_pdpy, name).return_value = pd.DataFrame([])
+        mock_pdpy.fetch_mps.return_value = tables['fetch_mps']
+        mock_pdpy.fetch_mps_committee_memberships.return_value = tables['fetch_mps_committee_memberships']
+        scraper = UKGovernmentScraper()
+
+        data = scraper.scrape_normalized_data(current=False)
+
+        assert [p['person_id'] for p in data['persons']] == ['p1', 'p2', 'p3']
+        assert data['members_of_parliament'] == [{'person_id': 'p1'}, {'person_id': 'p2'}]
+        memberships = data['committee_memberships']['mps_committee_memberships']
+        assert memberships[0] == {
+            'person_id': 'p2', 'committee_name': 'Treasury', 'committee_membership_end_date': None,
+        }
+        assert data['summary']['total_persons'] == 3
+        assert data['metadata']['normalized'] is True
+
+    @patch('app.scraper')
+    def test_route_serves_normalized_payload(self, mock_scraper_instance):
+        mock_scraper_instance.scrape_normalized_data.return_value = {'persons': []}
+
+        response = app.test_client().get('/scrape/all?normalized=true&current=true')
+
+        assert response.status_code == 200
+        assert response.get_json() == {'persons': []}
+        mock_scraper_instance.scrape_normalized_data.assert_called_once_with(current=True)
+        mock_scraper_instance.scrape_all_data.assert_not_called()
+
+
+
+@pytest.fixture
+def profile_scraper(tables):
+    """Scraper over mocked pdpy tables where Bob sits in the Commons and on two committees."""
+    with patch('app.pdpy') as mock_pdpy:
+        for name in PROFILE_SECTIONS:
+            getattr(mock_pdpy, name).return_value = pd.DataFrame([])
+        mock_pdpy.fetch_mps.return_value = tables['fetch_mps']
+        mock_pdpy.fetch_commons_memberships.return_value = pd.DataFrame([
+            {**person('p2', 'Bob'), 'constituency_name': 'Leeds'},
+        ])
+        mock_pdpy.fetch_mps_committee_memberships.return_value = tables['fetch_mps_committee_memberships']
+        scraper = UKGovernmentScraper(cache_timeout=3600)
+        for fetch_names in DATASET_TABLES.values():
+            scraper.refresh_tables(fetch_names)
+        yield scraper
+
+
+@pytest.mark.unit
+class TestPersonProfile:
+    """Test the consolidated person profile and its endpoint."""
+
+    def test_profile_collects_every_table(self, profile_scraper):
+        profile = profile_scraper.person_profile('p2')
+
+        assert profile['person']['full_title'] == 'Bob MP'
+        assert profile['commons']['member'] == [{'person_id': 'p2'}]
+        assert profile['commons']['memberships'] == [{'person_id': 'p2', 'constituency_name': 'Leeds'}]
+        assert [row['committee_name'] for row in profile['committee_memberships']['commons']] == [
+            'Treasury', 'Defence',
+        ]
+        assert profile['lords'] == {'member': [], 'memberships': []}
+        assert profile['government_roles'] == {'commons': [], 'lords': []}
+
+    def test_unknown_person(self, profile_scraper):
+        assert profile_scraper.person_profile('nobody') is None
+
+    def test_model_built_at_refresh(self, profile_scraper):
+        model = profile_scraper.cache['person_model']['data']
+        assert profile_scraper.person_model() is model
+        assert model.row('p3') == 2
+
+    def test_endpoint(self, profile_scraper):
+        with patch('app.scraper', profile_scraper):
+            found = app.test_client().get('/person/p3')
+            missing = app.test_client().get('/person/https://id.parliament.uk/nobody')
+
+        assert found.status_code == 200
+        assert found.get_json()['committee_memberships']['commons'][0]['committee_name'] == 'Defence'
+        assert found.headers['X-Cache'] == 'HIT'
+        assert missing.status_code == 404
+        assert missing.get_json()['error'] == 'Person not found'
+
+    def test_asgi_endpoint(self, profile_scraper):
+        with patch.object(asgi.async_scraper, 'scraper', profile_scraper):
+            status, _, data = asgi_request('/person/p1')
+            missing_status, _, _ = asgi_request('/person/')
+
+        assert status == 200
+        assert data['person']['display_name'] == 'Alice'
+        assert missing_status == 404
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,294 @@
+"""
+Unit tests for the background refresh scheduler.
+"""
+
+import random
+import threading
+import time
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+import app as service
+from app import DATASET_TABLES, UKGovernmentScraper, app
+from cache import FileCache
+from scheduler import RefreshScheduler
+
+
+def wait_until(condition, timeout=2.0):
+    """Poll until condition() is true or the timeout passes."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+@pytest.mark.cache
+class TestRefreshScheduler:
+    """Test scheduling, status reporting and failure handling."""
+
+    def test_missing_schedule_rejected(self):
+        with pytest.raises(ValueError, match='mps'):
+            RefreshScheduler({'mps': lambda: None}, {})
+
+    def test_next_delay_adds_jitter_within_bounds(self):
+        scheduler = RefreshScheduler({'mps': lambda: None}, {'mps': (100, 10)}, rng=random.Random(1))
+        delays = [scheduler.next_delay('mps') for _ in range(100)]
+        assert all(100 <= delay <= 110 for delay in delays)
+        assert len(set(delays)) > 1
+
+    def test_refresh_records_success(self):
+        scheduler = RefreshScheduler({'mps': lambda: None}, {'mps': (100, 0)})
+
+        assert scheduler.refresh('mps') is True
+
+        status = scheduler.status()['mps']
+        assert status['last_refresh'] is not None
+        assert status['duration_seconds'] >= 0
+        assert status['last_failure'] is None
+        assert status['interval_seconds'] == 100
+
+    def test_refresh_records_failure(self):
+        def fail():
+            raise RuntimeError('upstream down')
+
+        scheduler = RefreshScheduler({'mps': fail}, {'mps': (100, 0)})
+
+        assert scheduler.refresh('mps') is False
+
+        status = scheduler.status()['mps']
+        assert status['last_refresh'] is None
+        assert status['last_failure'] is not None
+
+    def test_each_dataset_runs_on_its_own_cadence(self):
+        runs = {'fast': 0, 'slow': 0}
+        lock = threading.Lock()
+
+        def job(name):
+            def run():
+                with lock:
+                    runs[name] += 1
+            return run
+
+        scheduler = RefreshScheduler(
+            {'fast': job('fast'), 'slow': job('slow')},
+            {'fast': (0.02, 0), 'slow': (60, 0)},
+        )
+        assert scheduler.start() is True
+        assert scheduler.start() is False
+        try:
+            assert wait_until(lambda: runs['fast'] >= 4)
+        finally:
+            scheduler.stop(timeout=2)
+
+        assert not scheduler.running
+        assert runs['slow'] == 1
+
+    def test_start_without_immediate_run_waits_for_interval(self):
+        runs = []
+        scheduler = RefreshScheduler({'mps': lambda: runs.append(1)}, {'mps': (60, 0)})
+
+        scheduler.start(run_immediately=False)
+        time.sleep(0.05)
+        scheduler.stop(timeout=2)
+
+        assert runs == []
+
+    def test_start_runs_only_named_datasets_at_once(self):
+        runs = []
+        scheduler = RefreshScheduler({'mps': lambda: runs.append('mps'), 'lords': lambda: runs.append('lords')},
+                                     {'mps': (60, 0), 'lords': (60, 0)})
+
+        scheduler.start(run_immediately=['lords'])
+        assert wait_until(lambda: runs)
+        scheduler.stop(timeout=2)
+
+        assert runs == ['lords']
+
+    def test_on_refresh_called_after_success_only(self):
+        refreshed = []
+        outcomes = iter([None, RuntimeError('upstream down')])
+
+        def job():
+            outcome = next(outcomes)
+            if outcome is not None:
+                raise outcome
+
+        scheduler = RefreshScheduler({'mps': job}, {'mps': (60, 0)}, on_refresh=refreshed.append)
+        scheduler.refresh('mps')
+        scheduler.refresh('mps')
+
+        assert refreshed == ['mps']
+
+    def test_jobs_due_within_batch_window_run_as_one_cycle(self):
+        cycles = []
+        scheduler = RefreshScheduler(
+            {'mps': lambda: None, 'lords': lambda: None, 'committees': lambda: None},
+            {'mps': (60, 0), 'lords': (60, 0), 'committees': (60, 0)},
+            on_cycle=cycles.append, batch_window=30,
+        )
+
+        scheduler.start(run_immediately=['mps', 'lords'])
+        assert wait_until(lambda: cycles)
+        scheduler.stop(timeout=2)
+
+        assert cycles == [['mps', 'lords']]
+
+
+@pytest.mark.cache
+class TestScraperRefresh:
+    """Test the scheduler's refresh jobs on the scraper."""
+
+    @patch('app.pdpy')
+    def test_refresh_tables_replaces_cached_tables(self, mock_pdpy):
+        scraper = UKGovernmentScraper(cache_timeout=3600)
+        mock_pdpy.fetch_mps.return_value = pd.DataFrame([{'name': 'Old MP'}])
+        assert scraper.scrape_mps() == [{'name': 'Old MP'}]
+
+        mock_pdpy.fetch_mps.return_value = pd.DataFrame([{'name': 'New MP'}])
+        mock_pdpy.fetch_commons_memberships.return_value = pd.DataFrame([])
+        scraper.refresh_tables(DATASET_TABLES['mps'])
+
+        # Served from the refreshed table without another upstream call
+        assert scraper.scrape_mps() == [{'name': 'New MP'}]
+        assert mock_pdpy.fetch_mps.call_count == 2
+        assert set(scraper.fetch_durations) == set(DATASET_TABLES['mps'])
+
+    @patch('app.pdpy')
+    def test_failed_refresh_keeps_every_table(self, mock_pdpy):
+        scraper = UKGovernmentScraper(cache_timeout=3600)
+        mock_pdpy.fetch_mps.return_value = pd.DataFrame([{'name': 'Old MP'}])
+        assert scraper.scrape_mps() == [{'name': 'Old MP'}]
+        version = scraper.snapshot.tables['fetch_mps']['version']
+
+        mock_pdpy.fetch_mps.return_value = pd.DataFrame([{'name': 'New MP'}])
+        mock_pdpy.fetch_commons_memberships.side_effect = RuntimeError('upstream down')
+        with pytest.raises(RuntimeError):
+            scraper.refresh_tables(DATASET_TABLES['mps'])
+
+        assert scraper.snapshot.tables['fetch_mps']['version'] == version
+        assert scraper.scrape_mps() == [{'name': 'Old MP'}]
+
+    def test_health_reports_each_dataset(self):
+        response = app.test_client().get('/health')
+        refresh = response.get_json()['refresh']
+
+        assert set(refresh['datasets']) == set(DATASET_TABLES)
+        assert 'last_refresh' in refresh['datasets']['committees']
+        assert 'duration_seconds' in refresh['datasets']['committees']
+
+
+@pytest.mark.cache
+class TestPreforkedRefresh:
+    """Test the pre-fork deployment mode's master-side refresh."""
+
+    def test_warm_snapshot_refreshes_every_dataset(self):
+        scheduler = RefreshScheduler({name: lambda: None for name in DATASET_TABLES},
+                                     {name: (60, 0) for name in DATASET_TABLES})
+        with patch.object(service, 'refresh_scheduler', scheduler):
+            assert service.warm_snapshot() is True
+
+        assert all(status['last_refresh'] for status in scheduler.status().values())
+
+    def test_refresh_cycle_in_master_reloads_workers_once(self):
+        scheduler = RefreshScheduler({'mps': lambda: None, 'lords': lambda: None},
+                                     {'mps': (60, 5), 'lords': (60, 20)})
+        reloads = []
+        with patch.object(service, 'refresh_scheduler', scheduler), \
+             patch.object(service.settings, 'REFRESH_ENABLED', True), \
+             patch('app.gc.freeze'):
+            service.start_preforked_refresh(lambda: reloads.append(1))
+            try:
+                # Warm-up alone does not reload; the scheduler waits out the interval first
+                assert reloads == []
+                assert scheduler.refresh_cycle(['mps', 'lords']) == ['mps', 'lords']
+            finally:
+                scheduler.stop(timeout=2)
+
+        assert reloads == [1]
+        assert scheduler.batch_window == 20
+
+    def test_worker_replaces_locks_held_at_fork(self, tmp_path):
+        scraper = UKGovernmentScraper(cache_timeout=3600, shared_cache=FileCache(tmp_path, ttl=60))
+        scheduler = RefreshScheduler({'mps': lambda: None}, {'mps': (60, 0)})
+        # As if a master thread held them when the worker was forked
+        scraper.cache._lock.acquire()
+        scraper.shared_cache._local._lock.acquire()
+        scheduler._lock.acquire()
+        with patch.object(service, 'scraper', scraper), patch.object(service, 'refresh_scheduler', scheduler):
+            service.after_fork()
+
+        acquired = []
+        thread = threading.Thread(target=lambda: acquired.append((
+            'x' in scraper.cache, scraper.shared_cache.do('x', lambda: 1)[0], scheduler.status(),
+        )))
+        thread.start()
+        thread.join(timeout=2)
+        assert acquired == [(False, 1, scheduler.status())]
+
+
+@pytest.mark.cache
+class TestReadiness:
+    """Test startup warm-up and the readiness endpoint."""
+
+    @staticmethod
+    def _warm_scraper(mock_pdpy):
+        for tables in DATASET_TABLES.values():
+            for name in tables:
+                getattr(mock_pdpy, name).return_value = pd.DataFrame([])
+        scraper = UKGovernmentScraper(cache_timeout=3600)
+        scheduler = RefreshScheduler(
+            {name: lambda tables=tables: scraper.refresh_tables(tables) for name, tables in DATASET_TABLES.items()},
+            {name: (60, 0) for name in DATASET_TABLES},
+        )
+        return scraper, scheduler
+
+    def test_not_ready_before_warm_up(self):
+        with patch.object(service, 'warm_up_done', threading.Event()):
+            response = app.test_client().get('/ready')
+
+        assert response.status_code == 503
+        assert response.get_json()['status'] == 'warming_up'
+        assert app.test_client().get('/health').status_code == 200
+
+    @patch('app.pdpy')
+    def test_ready_once_every_dataset_is_loaded(self, mock_pdpy):
+        scraper, scheduler = self._warm_scraper(mock_pdpy)
+        with patch.object(service, 'scraper', scraper), \
+             patch.object(service, 'refresh_scheduler', scheduler), \
+             patch.object(service, 'warm_up_done', threading.Event()):
+            assert service.warm_up() is True
+            response = app.test_client().get('/ready')
+
+        assert response.status_code == 200
+        assert response.get_json()['ready'] is True
+
+    @patch('app.pdpy')
+    def test_failed_dataset_keeps_instance_unready(self, mock_pdpy):
+        scraper, scheduler = self._warm_scraper(mock_pdpy)
+        mock_pdpy.fetch_lords.side_effect = RuntimeError('upstream down')
+        with patch.object(service, 'scraper', scraper), \
+             patch.object(service, 'refresh_scheduler', scheduler), \
+             patch.object(service, 'warm_up_done', threading.Event()):
+            assert service.warm_up() is False
+            response = app.test_client().get('/ready')
+
+        assert response.status_code == 503
+        assert response.get_json()['status'] == 'not_ready'
+        assert response.get_json()['unavailable_datasets'] == ['lords']
+
+    @patch('app.pdpy')
+    def test_warm_up_skips_datasets_restored_fresh(self, mock_pdpy):
+        scraper, scheduler = self._warm_scraper(mock_pdpy)
+        scraper._publish_tables({name: pd.DataFrame([]) for name in DATASET_TABLES['committees']})
+        with patch.object(service, 'scraper', scraper), \
+             patch.object(service, 'refresh_scheduler', scheduler), \
+             patch.object(service, 'warm_up_done', threading.Event()):
+            service.warm_up()
+
+        mock_pdpy.fetch_mps_committee_memberships.assert_not_called()
+        mock_pdpy.fetch_mps.assert_called_once_with()
+
@@ -5,6 +5,7 @@ Tests the core scraping functionality, filtering, and data processing.
 
 import pytest
 import tempfile
+import threading
 import pandas as pd
 from datetime import datetime, timezone
 from pathlib import Path
@@ -117,6 +118,54 @@ class TestCurrentMemberFiltering:
         assert len(result) == 1
         assert result[0]['name'] == 'Member Without Field'
 
+    def test_filter_current_members_with_dataframe(self):
+        """Test filtering a DataFrame returns the matching rows as a DataFrame."""
+        scraper = UKGovernmentScraper()
+        data = pd.DataFrame([
+            {'name': 'Current Member', 'end_date': None},
+            {'name': 'Former Member', 'end_date': '2023-12-31'},
+            {'name': 'Another Current', 'end_date': ''},
+        ])
+
+        result = scraper._filter_current_members(data, 'end_date')
+        assert isinstance(result, pd.DataFrame)
+        assert result['name'].tolist() == ['Current Member', 'Another Current']
+
+    def test_filter_current_members_with_datetime_column(self):
+        """Test filtering a datetime end date column keeps NaT rows."""
+        scraper = UKGovernmentScraper()
+        data = pd.DataFrame({
+            'name': ['Current Member', 'Former Member'],
+            'end_date': pd.to_datetime([None, '2023-12-31']),
+        })
+
+        result = scraper._filter_current_members(data, 'end_date')
+        assert result['name'].tolist() == ['Current Member']
+
+    def test_filter_current_members_dataframe_missing_column(self):
+        """Test a DataFrame without the end date column is returned unchanged."""
+        scraper = UKGovernmentScraper()
+        data = pd.DataFrame([{'name': 'Member Without Field'}])
+
+        result = scraper._filter_current_members(data, 'end_date')
+        assert result['name'].tolist() == ['Member Without Field']
+
+    def test_filter_current_members_as_of_date(self):
+        """Test a reference date keeps records that had not ended by that date."""
+        scraper = UKGovernmentScraper()
+        data = [
+            {'name': 'Open Ended', 'end_date': None},
+            {'name': 'Ended Before', 'end_date': '2019-12-31'},
+            {'name': 'Ended On Date', 'end_date': '2020-06-01'},
+            {'name': 'Ended After', 'end_date': '2021-01-01'},
+        ]
+
+        result = scraper._filter_current_members(data, 'end_date', as_of='2020-06-01')
+        assert [r['name'] for r in result] == ['Open Ended', 'Ended On Date', 'Ended After']
+
+        frame = scraper._filter_current_members(pd.DataFrame(data), 'end_date', as_of='2020-06-01')
+        assert frame['name'].tolist() == ['Open Ended', 'Ended On Date', 'Ended After']
+
 
 class TestMPsScrapingMethods:
     """Test MPs scraping functionality."""
@@ -140,51 +189,87 @@ class TestMPsScrapingMethods:
         assert result[1]['name'] == 'Jane Doe'
         mock_pdpy.fetch_mps.assert_called_once_with()
     
+    @staticmethod
+    def _memberships():
+        """Commons memberships covering a former and a serving MP."""
+        return pd.DataFrame([
+            {'person_id': 1, 'seat_incumbency_start_date': '2010-05-06', 'seat_incumbency_end_date': '2019-11-06'},
+            {'person_id': 2, 'seat_incumbency_start_date': '2019-12-12', 'seat_incumbency_end_date': None},
+        ])
+
     @patch('app.pdpy')
     def test_scrape_mps_with_date_filters(self, mock_pdpy):
-        """Test MPs scraping with date filtering parameters."""
+        """Test MPs date filters are answered locally from the full tables."""
         scraper = UKGovernmentScraper()
-        mock_pdpy.fetch_mps.return_value = pd.DataFrame([])
+        mock_pdpy.fetch_mps.return_value = pd.DataFrame([
+            {'person_id': 1, 'name': 'Former MP'},
+            {'person_id': 2, 'name': 'Serving MP'},
+        ])
+        mock_pdpy.fetch_commons_memberships.return_value = self._memberships()
         
-        # Test all date parameters
-        scraper.scrape_mps(
+        # on_date takes priority over from_date and to_date, as in pdpy
+        result = scraper.scrape_mps(
             from_date="2024-01-01",
             to_date="2024-12-31", 
-            on_date="2024-06-01"
+            on_date="2015-06-01"
         )
+        assert [r['name'] for r in result] == ['Former MP']
+
+        result = scraper.scrape_mps(from_date="2018-01-01", to_date="2020-01-01")
+        assert [r['name'] for r in result] == ['Former MP', 'Serving MP']
+
+        result = scraper.scrape_mps(to_date="2019-01-01")
+        assert [r['name'] for r in result] == ['Former MP']
         
-        mock_pdpy.fetch_mps.assert_called_with(
-            from_date="2024-01-01",
-            to_date="2024-12-31",
-            on_date="2024-06-01"
-        )
+        # One full fetch per table regardless of how many date windows are queried
+        mock_pdpy.fetch_mps.assert_called_once_with()
+        mock_pdpy.fetch_commons_memberships.assert_called_once_with()
     
     @patch('app.pdpy')
     @patch('app.datetime')
     def test_scrape_mps_current_without_on_date(self, mock_datetime, mock_pdpy):
-        """Test MPs scraping with current=True adds today's date."""
+        """Test MPs scraping with current=True filters on today's date."""
         scraper = UKGovernmentScraper()
-        mock_pdpy.fetch_mps.return_value = pd.DataFrame([])
+        mock_pdpy.fetch_mps.return_value = pd.DataFrame([
+            {'person_id': 1, 'name': 'Former MP'},
+            {'person_id': 2, 'name': 'Serving MP'},
+        ])
+        mock_pdpy.fetch_commons_memberships.return_value = self._memberships()
         
         # Mock today's date
         mock_now = MagicMock()
         mock_now.strftime.return_value = "2024-06-03"
         mock_datetime.now.return_value = mock_now
         
-        scraper.scrape_mps(current=True)
+        result = scraper.scrape_mps(current=True)
         
-        mock_pdpy.fetch_mps.assert_called_with(on_date="2024-06-03")
+        assert [r['name'] for r in result] == ['Serving MP']
+        mock_pdpy.fetch_mps.assert_called_once_with()
     
     @patch('app.pdpy')
     def test_scrape_mps_current_with_on_date(self, mock_pdpy):
         """Test MPs scraping with current=True and specified on_date."""
         scraper = UKGovernmentScraper()
-        mock_pdpy.fetch_mps.return_value = pd.DataFrame([])
+        mock_pdpy.fetch_mps.return_value = pd.DataFrame([
+            {'person_id': 1, 'name': 'Former MP'},
+            {'person_id': 2, 'name': 'Serving MP'},
+        ])
+        mock_pdpy.fetch_commons_memberships.return_value = self._memberships()
         
-        scraper.scrape_mps(current=True, on_date="2024-05-01")
+        result = scraper.scrape_mps(current=True, on_date="2015-05-01")
         
         # Should use the specified on_date, not today's date
-        mock_pdpy.fetch_mps.assert_called_with(on_date="2024-05-01")
+        assert [r['name'] for r in result] == ['Former MP']
+
+    @patch('app.pdpy')
+    def test_scrape_mps_invalid_date_window(self, mock_pdpy):
+        """Test a to_date before from_date is rejected like pdpy does."""
+        scraper = UKGovernmentScraper()
+        mock_pdpy.fetch_mps.return_value = pd.DataFrame([{'person_id': 1}])
+        mock_pdpy.fetch_commons_memberships.return_value = self._memberships()
+
+        with pytest.raises(ValueError):
+            scraper.scrape_mps(from_date="2024-12-31", to_date="2024-01-01")
     
     @patch('app.pdpy')
     def test_scrape_mps_caching(self, mock_pdpy):
@@ -231,15 +316,24 @@ class TestLordsScrapingMethods:
     def test_scrape_lords_current_filter(self, mock_datetime, mock_pdpy):
         """Test Lords scraping with current filter."""
         scraper = UKGovernmentScraper()
-        mock_pdpy.fetch_lords.return_value = pd.DataFrame([])
+        mock_pdpy.fetch_lords.return_value = pd.DataFrame([
+            {'person_id': 1, 'name': 'Retired Lord'},
+            {'person_id': 2, 'name': 'Sitting Lord'},
+        ])
+        mock_pdpy.fetch_lords_memberships.return_value = pd.DataFrame([
+            {'person_id': 1, 'seat_incumbency_start_date': '1999-01-01', 'seat_incumbency_end_date': '2020-01-01'},
+            {'person_id': 2, 'seat_incumbency_start_date': '2015-01-01', 'seat_incumbency_end_date': None},
+        ])
         
         mock_now = MagicMock()
         mock_now.strftime.return_value = "2024-06-03"
         mock_datetime.now.return_value = mock_now
         
-        scraper.scrape_lords(current=True)
+        result = scraper.scrape_lords(current=True)
         
-        mock_pdpy.fetch_lords.assert_called_with(on_date="2024-06-03")
+        assert [r['name'] for r in result] == ['Sitting Lord']
+        mock_pdpy.fetch_lords.assert_called_once_with()
+        mock_pdpy.fetch_lords_memberships.assert_called_once_with()
 
 
 class TestGovernmentRolesMethods:
@@ -290,6 +384,32 @@ class TestGovernmentRolesMethods:
         assert result['mps_government_roles'][0]['name'] == 'Current Minister'
         assert result['lords_government_roles'][0]['name'] == 'Current Lord Minister'
 
+    @patch('app.pdpy')
+    def test_scrape_government_roles_date_window(self, mock_pdpy):
+        """Test government roles held at some point within a date window."""
+        scraper = UKGovernmentScraper()
+
+        mps_data = [
+            {'name': 'Old Minister', 'government_incumbency_start_date': '2010-05-12',
+             'government_incumbency_end_date': '2012-09-04'},
+            {'name': 'Overlapping Minister', 'government_incumbency_start_date': '2018-01-09',
+             'government_incumbency_end_date': '2019-07-24'},
+            {'name': 'Current Minister', 'government_incumbency_start_date': '2024-07-05',
+             'government_incumbency_end_date': None},
+        ]
+        lords_data = [
+            {'name': 'Lord Minister', 'government_incumbency_start_date': '2019-07-24',
+             'government_incumbency_end_date': '2022-09-06'},
+        ]
+
+        mock_pdpy.fetch_mps_government_roles.return_value = pd.DataFrame(mps_data)
+        mock_pdpy.fetch_lords_government_roles.return_value = pd.DataFrame(lords_data)
+
+        result = scraper.scrape_government_roles(from_date='2019-01-01', to_date='2019-12-31')
+
+        assert [r['name'] for r in result['mps_government_roles']] == ['Overlapping Minister']
+        assert [r['name'] for r in result['lords_government_roles']] == ['Lord Minister']
+
 
 class TestCommitteeMembershipMethods:
     """Test committee membership scraping functionality."""
@@ -331,6 +451,26 @@ class TestCommitteeMembershipMethods:
         assert len(result['mps_committee_memberships']) == 1
         assert result['mps_committee_memberships'][0]['name'] == 'Current Member'
 
+    @patch('app.pdpy')
+    def test_scrape_committee_memberships_on_date(self, mock_pdpy):
+        """Test committee memberships held on a specific date."""
+        scraper = UKGovernmentScraper()
+
+        mps_data = [
+            {'name': 'Early Member', 'committee_membership_start_date': '2015-01-01',
+             'committee_membership_end_date': '2017-12-31'},
+            {'name': 'Later Member', 'committee_membership_start_date': '2019-01-01',
+             'committee_membership_end_date': None},
+        ]
+
+        mock_pdpy.fetch_mps_committee_memberships.return_value = pd.DataFrame(mps_data)
+        mock_pdpy.fetch_lords_committee_memberships.return_value = pd.DataFrame([])
+
+        result = scraper.scrape_committee_memberships(on_date='2016-06-01')
+
+        assert [m['name'] for m in result['mps_committee_memberships']] == ['Early Member']
+        assert result['lords_committee_memberships'] == []
+
 
 class TestScrapeAllDataMethod:
     """Test the comprehensive scrape_all_data method."""
@@ -419,6 +559,52 @@ class TestScrapeAllDataMethod:
             assert summary['total_mps'] == 0  # safe_len(None) = 0
             assert summary['total_lords'] == 0  # safe_len("invalid") = 0
 
+    @patch('app.pdpy')
+    def test_scrape_all_data_fetches_concurrently(self, mock_pdpy):
+        """Test the six upstream fetches run at the same time."""
+        scraper = UKGovernmentScraper()
+        fetches = [
+            'fetch_mps', 'fetch_lords',
+            'fetch_mps_government_roles', 'fetch_lords_government_roles',
+            'fetch_mps_committee_memberships', 'fetch_lords_committee_memberships',
+        ]
+        # Each fetch only returns once all six have started
+        barrier = threading.Barrier(len(fetches), timeout=5)
+
+        def fetch():
+            barrier.wait()
+            return pd.DataFrame([{'name': 'Record'}])
+
+        for name in fetches:
+            getattr(mock_pdpy, name).side_effect = fetch
+
+        result = scraper.scrape_all_data()
+
+        assert result['summary']['total_mps'] == 1
+        assert result['summary']['total_lords_committee_memberships'] == 1
+        assert set(scraper.fetch_durations) == set(fetches)
+
+    def test_scrape_all_data_failure_cancels_pending_scrapes(self):
+        """Test a failing scrape is raised without waiting for the others."""
+        scraper = UKGovernmentScraper()
+        release = threading.Event()
+
+        def slow_scrape(current=False):
+            release.wait(5)
+            return {}
+
+        with patch.object(scraper, 'scrape_mps', side_effect=RuntimeError('upstream down')), \
+             patch.object(scraper, 'scrape_lords', side_effect=slow_scrape), \
+             patch.object(scraper, 'scrape_government_roles', side_effect=slow_scrape), \
+             patch.object(scraper, 'scrape_committee_memberships', side_effect=slow_scrape):
+            try:
+                with pytest.raises(RuntimeError, match='upstream down'):
+                    scraper.scrape_all_data()
+            finally:
+                release.set()
+
+        assert scraper.cached_all_data() is None
+
 
 class TestCSVExportMethods:
     """Test CSV export functionality."""
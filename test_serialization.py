@@ -0,0 +1,218 @@
+"""
+Unit tests for JSON serialization of responses.
+"""
+
+import asyncio
+import json
+from datetime import date, datetime
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from flask.json.provider import DefaultJSONProvider
+
+import asgi
+from app import DATASET_TABLES, UKGovernmentScraper, app
+from serialization import FastJSONProvider
+from views import TableView, encode_categories
+
+
+@pytest.fixture
+def payload():
+    return {
+        'rows': [
+            {'name': 'Diane Abbött', 'n': np.int64(3), 'score': np.float64('nan'), 'end': None},
+            {'name': 'B', 'n': 4, 'score': float('inf'), 'end': pd.NaT, 'missing': pd.NA},
+        ],
+        'fetched': pd.Timestamp('2024-01-02 03:04:05'),
+        'day': date(2024, 1, 2),
+        'values': np.array([1.5, np.nan]),
+        'count': 2,
+    }
+
+
+def strict_loads(encoded):
+    """Parse JSON, rejecting the NaN/Infinity literals the stdlib would otherwise accept."""
+    def reject(constant):
+        raise ValueError(constant)
+    return json.loads(encoded, parse_constant=reject)
+
+
+@pytest.mark.unit
+class TestFastJSONProvider:
+    """Test that both backends encode responses alike."""
+
+    def test_backends_agree(self, payload):
+        fast = FastJSONProvider(app)
+        fallback = FastJSONProvider(app, backend='json')
+        assert fast.backend == 'orjson'
+        assert fallback.backend == 'json'
+
+        decoded = strict_loads(fast.encode(payload))
+        assert decoded == strict_loads(fallback.encode(payload))
+        assert decoded['rows'][0] == {'name': 'Diane Abbött', 'n': 3, 'score': None, 'end': None}
+        assert decoded['rows'][1]['score'] is None
+        assert decoded['rows'][1]['end'] is None
+        assert decoded['rows'][1]['missing'] is None
+        assert decoded['values'] == [1.5, None]
+
+    def test_dates_encoded_as_flask_does(self, payload):
+        expected = DefaultJSONProvider.default(datetime(2024, 1, 2, 3, 4, 5))
+        decoded = strict_loads(FastJSONProvider(app).encode(payload))
+        assert decoded['fetched'] == expected == 'Tue, 02 Jan 2024 03:04:05 GMT'
+        assert decoded['day'] == 'Tue, 02 Jan 2024 00:00:00 GMT'
+
+    def test_keys_sorted_and_compact(self):
+        encoded = FastJSONProvider(app).encode({'b': 1, 'a': [1, 2]})
+        assert encoded == b'{"a":[1,2],"b":1}'
+        assert FastJSONProvider(app, backend='json').encode({'b': 1, 'a': [1, 2]}) == encoded
+
+    def test_falls_back_for_values_orjson_rejects(self):
+        assert FastJSONProvider(app).encode({'big': 2 ** 70}) == b'{"big":1180591620717411303424}'
+
+    def test_unknown_backend_rejected(self):
+        with pytest.raises(ValueError, match='simplejson'):
+            FastJSONProvider(app, backend='simplejson')
+
+    @patch('app.scraper.scrape_mps')
+    def test_scrape_response_has_no_nan_literals(self, mock_scrape_mps):
+        mock_scrape_mps.return_value = [{'name': 'A', 'majority': float('nan'), 'end': pd.NaT}]
+        response = app.test_client().get('/scrape/mps')
+
+        assert response.status_code == 200
+        assert strict_loads(response.data)['members_of_parliament'][0] == {'name': 'A', 'majority': None, 'end': None}
+
+
+@pytest.mark.unit
+class TestStreaming:
+    """Test streamed encoding of views and the streamed /scrape/all response."""
+
+    def test_stream_matches_encode(self):
+        table = encode_categories(pd.DataFrame({'party': ['Lab', None, 'Con'] * 5, 'n': range(15)}))
+        view = TableView(table).where(table['n'] % 2 == 0)
+        payload = {'meta': {'b': 1, 'a': 2}, 'rows': view, 'empty': TableView(table.iloc[:0]), 'count': len(view)}
+
+        pieces = list(FastJSONProvider(app).stream(payload, chunk_rows=3))
+        decoded = strict_loads(b''.join(pieces))
+
+        assert decoded == strict_loads(FastJSONProvider(app).encode({**payload, 'rows': view.records(), 'empty': []}))
+        assert list(decoded) == ['meta', 'rows', 'empty', 'count']
+
+    def test_stream_builds_one_chunk_at_a_time(self):
+        view = TableView(pd.DataFrame({'name': ['x' * 100] * 10000}))
+        records = TableView.records
+        built = []
+
+        def tracked(self, start, stop):
+            built.append(stop - start)
+            return records(self, start, stop)
+
+        with patch.object(TableView, 'records', autospec=True, side_effect=tracked):
+            pieces = FastJSONProvider(app).stream({'rows': view}, chunk_rows=1000)
+            first = next(pieces)
+            assert 0 < len(built) < 10
+            rest = list(pieces)
+
+        assert built == [1000] * 10
+        assert len(strict_loads(first + b''.join(rest))['rows']) == 10000
+
+    @patch('app.pdpy')
+    def test_streamed_scrape_all_matches_payload(self, mock_pdpy):
+        for tables in DATASET_TABLES.values():
+            for name in tables:
+                getattr(mock_pdpy, name).return_value = pd.DataFrame([])
+        mock_pdpy.fetch_mps.return_value = pd.DataFrame([
+            {'name': 'A', 'party': 'Lab'}, {'name': 'B', 'party': 'Lab'}, {'name': 'C', 'party': float('nan')},
+        ])
+        scraper = UKGovernmentScraper(cache_timeout=3600)
+        with patch('app.scraper', scraper), patch.object(asgi.async_scraper, 'scraper', scraper):
+            expected = app.test_client().get('/scrape/all').get_json()
+            streamed = app.test_client().get('/scrape/all?stream=true')
+            asgi_messages = asyncio.run(asgi_call('/scrape/all', 'stream=true'))
+
+        assert streamed.status_code == 200
+        assert streamed.is_streamed
+        assert streamed.mimetype == 'application/json'
+        for body in (streamed.data, b''.join(message.get('body', b'') for message in asgi_messages[1:])):
+            decoded = strict_loads(body)
+            assert list(decoded)[0] == 'metadata' and list(decoded)[-1] == 'summary'
+            assert {**decoded, 'metadata': None} == {**expected, 'metadata': None}
+        assert asgi_messages[0]['status'] == 200
+        assert asgi_messages[-1] == {'type': 'http.response.body', 'body': b''}
+
+
+@pytest.mark.unit
+class TestNDJSON:
+    """Test newline-delimited JSON streaming of the dataset endpoints."""
+
+    @pytest.fixture
+    def ndjson_scraper(self):
+        with patch('app.pdpy') as mock_pdpy:
+            for tables in DATASET_TABLES.values():
+                for name in tables:
+                    getattr(mock_pdpy, name).return_value = pd.DataFrame([])
+            mock_pdpy.fetch_mps.return_value = pd.DataFrame([
+                {'name': 'A', 'party': 'Lab'}, {'name': 'B', 'party': 'Lab'}, {'name': 'C', 'party': None},
+            ])
+            mock_pdpy.fetch_lords_committee_memberships.return_value = pd.DataFrame([
+                {'committee_name': 'Finance', 'committee_membership_end_date': None},
+            ])
+            scraper = UKGovernmentScraper(cache_timeout=3600)
+            with patch('app.scraper', scraper), patch.object(asgi.async_scraper, 'scraper', scraper):
+                yield scraper
+
+    def test_stream_lines(self):
+        table = encode_categories(pd.DataFrame({'party': ['Lab', None, 'Con'] * 5, 'n': range(15)}))
+        view = TableView(table).where(table['n'] > 4)
+
+        body = b''.join(FastJSONProvider(app).stream_lines(view, fields={'dataset': 'x'}, chunk_rows=4))
+
+        assert body.endswith(b'\n')
+        assert [strict_loads(line) for line in body.splitlines()] == [
+            {**row, 'dataset': 'x'} for row in view.records()
+        ]
+        assert list(FastJSONProvider(app).stream_lines(None)) == []
+
+    def test_members_endpoint(self, ndjson_scraper):
+        response = app.test_client().get('/scrape/mps?format=ndjson')
+
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.mimetype == 'application/x-ndjson'
+        lines = [strict_loads(line) for line in response.data.splitlines()]
+        assert lines == app.test_client().get('/scrape/mps').get_json()['members_of_parliament']
+
+    def test_two_house_endpoint_labels_rows(self, ndjson_scraper):
+        response = app.test_client().get('/scrape/committees?format=ndjson&current=true')
+
+        assert [strict_loads(line) for line in response.data.splitlines()] == [
+            {'committee_name': 'Finance', 'committee_membership_end_date': None,
+             'dataset': 'lords_committee_memberships'},
+        ]
+
+    def test_asgi_endpoint(self, ndjson_scraper):
+        messages = asyncio.run(asgi_call('/scrape/mps', 'format=ndjson'))
+
+        headers = dict(messages[0]['headers'])
+        assert headers[b'content-type'] == b'application/x-ndjson'
+        body = b''.join(message.get('body', b'') for message in messages[1:])
+        assert [strict_loads(line)['name'] for line in body.splitlines()] == ['A', 'B', 'C']
+
+
+async def asgi_call(path, query):
+    """Send one request to the ASGI app and return every message it sent."""
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await asgi.app({'type': 'http', 'path': path, 'method': 'GET', 'query_string': query.encode()}, receive, send)
+    return messages
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,256 @@
+"""
+Unit tests for immutable snapshots and their atomic publication.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from app import UKGovernmentScraper
+from snapshot import Snapshot, SnapshotHolder, SnapshotStore, content_hash
+from views import encode_categories
+
+
+@pytest.mark.cache
+class TestSnapshot:
+    """Test snapshots cannot change once built."""
+
+    def test_attributes_are_read_only(self):
+        snapshot = Snapshot()
+        with pytest.raises(AttributeError):
+            snapshot.last_updated = datetime.now(timezone.utc)
+        with pytest.raises(TypeError):
+            snapshot.tables['fetch_mps'] = {'data': []}
+
+    def test_entries_are_read_only_copies(self):
+        entry = {'data': [1], 'version': 1}
+        snapshot = Snapshot({'fetch_mps': entry})
+        entry['version'] = 2
+
+        assert snapshot.tables['fetch_mps']['version'] == 1
+        with pytest.raises(TypeError):
+            snapshot.tables['fetch_mps']['version'] = 3
+
+    def test_with_tables_leaves_original_untouched(self):
+        first = Snapshot({'fetch_mps': {'version': 1}})
+        second = first.with_tables({'fetch_lords': {'version': 2}})
+
+        assert set(first.tables) == {'fetch_mps'}
+        assert set(second.tables) == {'fetch_mps', 'fetch_lords'}
+        assert second.generation == first.generation + 1
+
+    def test_with_all_data_sets_data_and_time_together(self):
+        now = datetime.now(timezone.utc)
+        snapshot = Snapshot().with_all_data({'data': {'summary': {}}, 'stored_at': 0.0}, now)
+
+        assert snapshot.all_data['data'] == {'summary': {}}
+        assert snapshot.last_updated == now
+
+    def test_holder_publishes_by_swap(self):
+        holder = SnapshotHolder()
+        before = holder.current
+        after = holder.publish(lambda snapshot: snapshot.with_tables({'fetch_mps': {'version': 1}}))
+
+        assert holder.current is after
+        assert before.tables == {}
+
+
+@pytest.mark.cache
+class TestContentHash:
+    """Test table content hashes."""
+
+    def test_equal_tables_hash_alike(self):
+        table = pd.DataFrame({'name': ['A', 'B'] * 3, 'n': range(6)})
+        assert content_hash(table) == content_hash(table.copy().set_axis(range(10, 16)))
+        assert content_hash(encode_categories(table)) == content_hash(encode_categories(table.copy()))
+
+    def test_changes_change_hash(self):
+        table = pd.DataFrame({'name': ['A', 'B'], 'n': [1, 2]})
+        assert content_hash(table) != content_hash(table.assign(n=[1, 3]))
+        assert content_hash(table) != content_hash(table.rename(columns={'n': 'm'}))
+        assert content_hash(table) != content_hash(table.iloc[::-1])
+
+    def test_unhashable_data(self):
+        assert content_hash(pd.DataFrame({'roles': [['a'], ['b']]})) is None
+        assert content_hash(None) is None
+
+    def test_published_entries_carry_hash(self):
+        scraper = UKGovernmentScraper(cache_timeout=3600)
+        table = pd.DataFrame([{'name': 'A'}])
+        scraper._publish_tables({'fetch_mps': table})
+        assert scraper.snapshot.tables['fetch_mps']['content_hash'] == content_hash(table)
+
+
+@pytest.mark.cache
+class TestScraperSnapshots:
+    """Test the scraper publishes refreshed data as whole snapshots."""
+
+    @patch('app.pdpy')
+    def test_refresh_publishes_new_snapshot(self, mock_pdpy):
+        scraper = UKGovernmentScraper(cache_timeout=3600)
+        mock_pdpy.fetch_mps.return_value = pd.DataFrame([{'name': 'Old MP'}])
+        scraper.scrape_mps()
+        before = scraper.snapshot
+
+        mock_pdpy.fetch_mps.return_value = pd.DataFrame([{'name': 'New MP'}])
+        scraper.refresh_tables(['fetch_mps'])
+
+        assert scraper.snapshot is not before
+        assert before.tables['fetch_mps']['data']['name'].tolist() == ['Old MP']
+        assert scraper.snapshot.tables['fetch_mps']['data']['name'].tolist() == ['New MP']
+
+    @patch.object(UKGovernmentScraper, 'scrape_committee_memberships', return_value={})
+    @patch.object(UKGovernmentScraper, 'scrape_government_roles', return_value={})
+    @patch.object(UKGovernmentScraper, 'scrape_lords', return_value=[])
+    @patch.object(UKGovernmentScraper, 'scrape_mps', return_value=[{'name': 'Test MP'}])
+    def test_full_scrape_published_with_last_updated(self, *_mocks):
+        scraper = UKGovernmentScraper(cache_timeout=3600)
+        assert scraper.cached_all_data() is None
+
+        data = scraper.scrape_all_data()
+
+        assert scraper.cached_all_data() == data
+        assert scraper.snapshot.all_data['data'] is data
+        assert scraper.last_updated == scraper.snapshot.last_updated
+
+    @patch('app.pdpy')
+    def test_view_reads_tables_from_one_snapshot(self, mock_pdpy):
+        """Test a refresh landing mid-query cannot pair new members with old memberships."""
+        scraper = UKGovernmentScraper(cache_timeout=3600)
+        mock_pdpy.fetch_mps.return_value = pd.DataFrame([{'person_id': 1, 'name': 'Old MP'}])
+        mock_pdpy.fetch_commons_memberships.return_value = pd.DataFrame([{
+            'person_id': 1, 'seat_incumbency_start_date': '2019-12-12', 'seat_incumbency_end_date': None,
+        }])
+        scraper.scrape_mps(on_date='2024-01-01')
+
+        # Publish a refresh the moment the query has read its snapshot
+        original = scraper._live_table
+        refreshed = threading.Event()
+
+        def live_table(snapshot, name):
+            if not refreshed.is_set():
+                refreshed.set()
+                mock_pdpy.fetch_mps.return_value = pd.DataFrame([{'person_id': 2, 'name': 'New MP'}])
+                mock_pdpy.fetch_commons_memberships.return_value = pd.DataFrame([{
+                    'person_id': 2, 'seat_incumbency_start_date': '2019-12-12', 'seat_incumbency_end_date': None,
+                }])
+                scraper.refresh_tables(['fetch_mps', 'fetch_commons_memberships'])
+            return original(snapshot, name)
+
+        with patch.object(scraper, '_live_table', side_effect=live_table):
+            during = scraper.scrape_mps(on_date='2024-06-01')
+
+        assert [m['name'] for m in during] == ['Old MP']
+        assert [m['name'] for m in scraper.scrape_mps(on_date='2024-06-01')] == ['New MP']
+
+    @patch('app.pdpy')
+    def test_forked_worker_serves_inherited_snapshot(self, mock_pdpy):
+        """Test a forked child answers from the parent's snapshot without fetching."""
+        scraper = UKGovernmentScraper(cache_timeout=0, cache_max_stale=3600)
+        mock_pdpy.fetch_mps.return_value = pd.DataFrame([{'name': 'Shared MP'}])
+        scraper.refresh_tables(['fetch_mps'])
+        mock_pdpy.fetch_mps.side_effect = RuntimeError('workers must not fetch')
+
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                scraper.after_fork()
+                # Stale, but refreshed by the master rather than this worker
+                result = scraper.scrape_mps()
+                status = 0 if result == [{'name': 'Shared MP'}] and not scraper._refreshing else 1
+            finally:
+                os.write(write_end, bytes([status]))
+                os._exit(0)
+
+        os.close(write_end)
+        outcome = os.read(read_end, 1)
+        os.waitpid(pid, 0)
+        os.close(read_end)
+        assert outcome == bytes([0])
+
+
+@pytest.mark.cache
+class TestSnapshotStore:
+    """Test persisting tables to disk and loading them back."""
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        store = SnapshotStore(tmp_path)
+        df = pd.DataFrame({'name': ['John', 'Jane']})
+        metadata = store.save('fetch_mps', df, fetched_at=1_700_000_000.0)
+
+        assert metadata['rows'] == 2
+        assert len(metadata['sha256']) == 64
+        assert metadata['fetched_at'].startswith('2023-11-14')
+
+        data, fetched_at = SnapshotStore(tmp_path).load()['fetch_mps']
+        pd.testing.assert_frame_equal(data, df)
+        assert fetched_at == 1_700_000_000.0
+
+    def test_corrupt_copy_falls_back_to_older(self, tmp_path):
+        store = SnapshotStore(tmp_path)
+        store.save('fetch_lords', pd.DataFrame({'name': ['Old']}), fetched_at=100.0)
+        newest = store.save('fetch_lords', pd.DataFrame({'name': ['New']}), fetched_at=200.0)
+        (tmp_path / newest['file']).write_bytes(b'truncated')
+
+        data, fetched_at = store.load()['fetch_lords']
+        assert data['name'].tolist() == ['Old']
+        assert fetched_at == 100.0
+
+    def test_only_newest_copies_kept(self, tmp_path):
+        store = SnapshotStore(tmp_path, keep=2)
+        for fetched_at in (1.0, 2.0, 3.0):
+            store.save('fetch_mps', pd.DataFrame({'n': [fetched_at]}), fetched_at=fetched_at)
+
+        kept = sorted(json.loads(p.read_text())['fetched_at_epoch'] for p in tmp_path.glob('*.json'))
+        assert kept == [2.0, 3.0]
+        assert len(list(tmp_path.glob('*.pkl'))) == 2
+        assert store.metadata()['fetch_mps']['fetched_at_epoch'] == 3.0
+
+    def test_foreign_json_files_are_ignored(self, tmp_path):
+        store = SnapshotStore(tmp_path)
+        store.save('fetch_mps', pd.DataFrame({'n': [1]}), fetched_at=1.0)
+        (tmp_path / 'other.json').write_text('{"unrelated": true}')
+        (tmp_path / 'list.json').write_text('[1, 2]')
+        (tmp_path / 'partial.json').write_text('{"name": ')
+
+        assert list(store.metadata()) == ['fetch_mps']
+        assert list(store.load()) == ['fetch_mps']
+
+    def test_metadata_read_once_until_next_save(self, tmp_path):
+        store = SnapshotStore(tmp_path)
+        store.save('fetch_mps', pd.DataFrame({'n': [1]}), fetched_at=1.0)
+        assert store.metadata()['fetch_mps']['fetched_at_epoch'] == 1.0
+
+        with patch.object(store, '_copies', wraps=store._copies) as copies:
+            store.metadata()
+            copies.assert_not_called()
+            store.save('fetch_mps', pd.DataFrame({'n': [2]}), fetched_at=2.0)
+            assert store.metadata()['fetch_mps']['fetched_at_epoch'] == 2.0
+
+    @patch('app.pdpy')
+    def test_restarted_scraper_restores_without_upstream_calls(self, mock_pdpy, tmp_path):
+        mock_pdpy.fetch_mps.return_value = pd.DataFrame([{'name': 'Test MP'}])
+        UKGovernmentScraper(cache_timeout=3600, snapshot_store=SnapshotStore(tmp_path)).scrape_mps()
+
+        restarted = UKGovernmentScraper(cache_timeout=3600, snapshot_store=SnapshotStore(tmp_path))
+        assert restarted.restore_tables() == ['fetch_mps']
+        assert restarted.scrape_mps() == [{'name': 'Test MP'}]
+        mock_pdpy.fetch_mps.assert_called_once_with()
+        assert restarted.fresh_tables(['fetch_mps'])
+
+    def test_expired_tables_not_restored(self, tmp_path):
+        store = SnapshotStore(tmp_path)
+        store.save('fetch_mps', pd.DataFrame([]), fetched_at=time.time() - 120)
+        scraper = UKGovernmentScraper(cache_timeout=30, cache_max_stale=60, snapshot_store=store)
+
+        assert scraper.restore_tables() == []
+        assert 'fetch_mps' not in scraper.snapshot.tables
+
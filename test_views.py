@@ -0,0 +1,189 @@
+"""
+Unit tests for row views over snapshot tables.
+"""
+
+import sys
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import asgi
+import views
+from app import DATASET_TABLES, UKGovernmentScraper, app
+from test_asgi import request as asgi_request
+from views import InvalidFieldsError, TableView, decode_categories, encode_categories, project
+
+
+@pytest.fixture
+def table():
+    return pd.DataFrame({'name': ['A', 'B', 'C', 'D'], 'party': ['Lab', 'Con', 'Lab', 'LD'], 'n': [1, 2, 3, 4]})
+
+
+@pytest.mark.unit
+class TestTableView:
+    """Test selection, materialization and sizing of views."""
+
+    def test_unfiltered_view_returns_table(self, table):
+        view = TableView(table)
+        assert len(view) == 4
+        assert view.frame() is table
+        assert np.shares_memory(view.frame(1, 3)['n'].to_numpy(), table['n'].to_numpy())
+
+    def test_where_and_select_compose(self, table):
+        labour = TableView(table).where(table['party'] == 'Lab')
+        assert labour.positions.tolist() == [0, 2]
+        assert labour.select([1]).records() == [{'name': 'C', 'party': 'Lab', 'n': 3}]
+        assert labour.where(labour.column('n') > 1).column('name').tolist() == ['C']
+
+    def test_records_slice_takes_only_requested_rows(self, table):
+        view = TableView(table, np.array([1, 2, 3]))
+        assert view.records(1, 2) == [{'name': 'C', 'party': 'Lab', 'n': 3}]
+        assert view.frame().index.tolist() == [1, 2, 3]
+
+    def test_size_counts_positions_not_table(self, table):
+        large = pd.concat([table] * 10_000, ignore_index=True)
+        assert sys.getsizeof(TableView(large)) < 100
+        assert sys.getsizeof(TableView(large, np.arange(10))) < 200
+
+
+
+@pytest.mark.unit
+class TestCategoryEncoding:
+    """Test dictionary encoding of repetitive string columns."""
+
+    def test_repetitive_strings_encoded_and_decoded(self):
+        table = pd.DataFrame({'party': ['Lab', 'Con', 'Lab', None], 'name': ['A', 'B', 'C', 'D']})
+        encoded = encode_categories(table)
+
+        assert isinstance(encoded['party'].dtype, pd.CategoricalDtype)
+        assert encoded['name'].dtype == object
+        assert table['party'].dtype == object
+        assert decode_categories(encoded).to_dict('records') == table.to_dict('records')
+
+    def test_unsuitable_columns_left_alone(self):
+        table = pd.DataFrame({
+            'nan_missing': ['x', np.nan, 'x', 'x'],
+            'mixed': ['x', 1, 'x', 'x'],
+            'numbers': [1, 1, 1, 1],
+            'end_date': ['2020-01-01'] * 4,
+        })
+        encoded = encode_categories(table, exclude=('end_date',))
+        assert encoded is table
+
+    def test_view_records_decode_categories(self):
+        table = encode_categories(pd.DataFrame({'party': ['Lab', None, 'Lab', 'Lab']}))
+        view = TableView(table).where(table['party'] == 'Lab')
+        assert view.records() == [{'party': 'Lab'}] * 3
+        assert TableView(table).records(1, 2) == [{'party': None}]
+
+    def test_records_match_to_dict(self):
+        table = encode_categories(pd.DataFrame({
+            'party': ['Lab', None, 'Lab', 'Lab'],
+            'none': [None] * 4,
+            'n': [1, 2, 3, 4],
+            'when': pd.to_datetime(['2020-01-01', None, '2021-01-01', '2022-01-01']),
+        }))
+        positions = np.array([0, 1, 3])
+        expected = decode_categories(table.take(positions)).to_dict('records')
+        assert TableView(table, positions).records() == expected
+
+    @patch('app.pdpy')
+    def test_fetched_tables_are_encoded(self, mock_pdpy):
+        mock_pdpy.fetch_mps_government_roles.return_value = pd.DataFrame({
+            'position_name': ['Minister', 'Minister', 'Whip', 'Minister'],
+            'government_incumbency_end_date': [None, None, None, None],
+        })
+        mock_pdpy.fetch_lords_government_roles.return_value = pd.DataFrame([])
+        scraper = UKGovernmentScraper()
+
+        roles = scraper.scrape_government_roles()['mps_government_roles']
+        table = scraper.snapshot.tables['fetch_mps_government_roles']['data']
+
+        assert isinstance(table['position_name'].dtype, pd.CategoricalDtype)
+        assert table['government_incumbency_end_date'].dtype == object
+        assert roles[2] == {'position_name': 'Whip', 'government_incumbency_end_date': None}
+
+
+@pytest.mark.unit
+class TestProjection:
+    """Test narrowing views to some of their columns."""
+
+    def test_projected_records_read_only_requested_columns(self, table):
+        view = project(TableView(table).where(table['party'] == 'Lab'), ('n', 'missing', 'name', 'n'))
+        with patch('views.column_values', wraps=views.column_values) as column_values:
+            records = view.records()
+
+        assert records == [{'n': 1, 'name': 'A'}, {'n': 3, 'name': 'C'}]
+        assert [call.args[0].name for call in column_values.call_args_list] == ['n', 'name']
+        assert list(view.frame().columns) == ['n', 'name']
+        assert view.select([1]).records() == [{'n': 3, 'name': 'C'}]
+
+    def test_project_dicts_and_frames(self, table):
+        projected = project({'mps': table, 'lords': TableView(table), 'other': []}, ('name',))
+        assert projected['mps'].records(0, 1) == [{'name': 'A'}]
+        assert projected['lords'].columns.tolist() == ['name']
+        assert projected['other'] == []
+        assert project(table, None) is table
+
+    def test_project_row_lists(self):
+        rows = [{'name': 'A', 'n': 1}, {'name': 'B'}]
+        assert project(rows, ('n', 'name')) == [{'n': 1, 'name': 'A'}, {'name': 'B'}]
+
+    def test_unknown_fields_rejected(self, table):
+        with pytest.raises(InvalidFieldsError) as error:
+            project({'mps': TableView(table), 'lords': pd.DataFrame()}, ('nope',))
+        assert error.value.valid_fields == sorted(table.columns)
+        # Tables without columns give nothing to check the fields against
+        assert project(pd.DataFrame(), ('nope',)).records() == []
+
+
+@pytest.mark.api
+class TestFieldsParameter:
+    """Test fields= on the dataset endpoints."""
+
+    @pytest.fixture(autouse=True)
+    def projected_scraper(self, table):
+        with patch('app.pdpy') as mock_pdpy:
+            for tables in DATASET_TABLES.values():
+                for name in tables:
+                    getattr(mock_pdpy, name).return_value = pd.DataFrame([])
+            mock_pdpy.fetch_mps.return_value = table
+            mock_pdpy.fetch_lords_government_roles.return_value = table
+            scraper = UKGovernmentScraper(cache_timeout=3600)
+            with patch('app.scraper', scraper), patch.object(asgi.async_scraper, 'scraper', scraper):
+                yield scraper
+
+    def test_json_ndjson_and_pages_are_projected(self):
+        client = app.test_client()
+        rows = client.get('/scrape/mps?fields=name,%20n').get_json()['members_of_parliament']
+        lines = client.get('/scrape/mps?fields=name&format=ndjson').data.splitlines()
+        page = client.get('/scrape/mps?fields=party&limit=1').get_json()
+
+        assert rows[0] == {'name': 'A', 'n': 1}
+        assert lines[0] == b'{"name":"A"}'
+        assert page['members_of_parliament'] == [{'party': 'Lab'}]
+
+    def test_two_house_endpoint_is_projected(self):
+        data = app.test_client().get('/scrape/government-roles?fields=party').get_json()['government_roles']
+        assert data['lords_government_roles'][1] == {'party': 'Con'}
+        assert data['mps_government_roles'] == []
+
+    def test_unknown_fields_are_a_bad_request(self, table):
+        response = app.test_client().get('/scrape/mps?fields=nope,missing')
+        status, _, data = asgi_request('/scrape/government-roles', 'fields=nope&format=ndjson')
+
+        assert response.status_code == 400
+        assert response.get_json()['valid_fields'] == sorted(table.columns)
+        assert status == 400
+        assert data['error'] == 'Invalid fields parameter'
+
+    def test_asgi_is_projected(self):
+        status, _, data = asgi_request('/scrape/mps', 'fields=n')
+        assert status == 200
+        assert data['members_of_parliament'][-1] == {'n': 4}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
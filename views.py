@@ -0,0 +1,254 @@
+"""Row views over snapshot tables for the UK Government Scraper.
+
+A filtered query is cached as the row positions it selects from a snapshot
+table rather than as a copy of those rows. The rows are taken from the table
+only when a response needs them, and only the rows it returns, so every view
+and page of a table shares the table's column buffers. A view can also be
+narrowed to some of the table's columns, so the rest are never read.
+
+Repetitive string columns are stored dictionary-encoded (pandas categoricals),
+so filters compare integer codes and each distinct string is held once; rows
+are decoded back to plain strings only as they are serialized.
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+# Encode a string column when it has at most this many distinct values per row
+CATEGORY_MAX_RATIO = 0.5
+
+
+def encode_categories(table: pd.DataFrame, exclude: tuple[str, ...] = (),
+                      max_ratio: float = CATEGORY_MAX_RATIO) -> pd.DataFrame:
+    """Return table with its repetitive string columns dictionary-encoded.
+
+    A column is encoded when it holds only strings and None, and its distinct
+    values number at most max_ratio of its rows. Other columns are shared
+    with table, not copied; a table with nothing to encode is returned as is.
+
+    Args:
+        table: Table to encode
+        exclude: Columns to leave as they are
+        max_ratio: Largest distinct-to-total ratio worth encoding
+    """
+    if not isinstance(table, pd.DataFrame) or len(table) < 2:
+        return table
+    encoded = {}
+    for name in table.columns:
+        column = table[name]
+        if name in exclude or column.dtype != object:
+            continue
+        values = column.to_numpy()
+        missing = pd.isna(values)
+        present = values[~missing]
+        # Missing values must be None, which is what decoding restores
+        if any(value is not None for value in values[missing]):
+            continue
+        if not all(isinstance(value, str) for value in present):
+            continue
+        if pd.unique(present).size > max_ratio * len(values):
+            continue
+        encoded[name] = column.astype("category")
+    return _with_columns(table, encoded)
+
+
+def decode_categories(frame: pd.DataFrame) -> pd.DataFrame:
+    """Return frame with categorical columns decoded to objects, missing values as None."""
+    decoded = {
+        name: column.astype(object).where(column.notna(), None)
+        for name, column in frame.items()
+        if isinstance(column.dtype, pd.CategoricalDtype)
+    }
+    return _with_columns(frame, decoded)
+
+
+def column_values(column: pd.Series, rows: slice | np.ndarray) -> list[Any]:
+    """Return the values of a column at rows (a slice or positions) as Python objects.
+
+    Gives the values DataFrame.to_dict("records") would, with categories
+    decoded and missing categories as None, without building a DataFrame.
+    """
+    dtype = column.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        # The Categorical's own arrays; the .cat accessor would build a Series per call
+        codes = column.array.codes[rows]
+        categories = column.array.categories.to_numpy(dtype=object)
+        if not len(categories):
+            return [None] * len(codes)
+        return np.where(codes >= 0, categories.take(np.maximum(codes, 0)), None).tolist()
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufO":
+        return column.to_numpy()[rows].tolist()
+    values = column.iloc[rows].tolist()
+    if isinstance(dtype, np.dtype):
+        return values
+    return [None if value is pd.NA else value for value in values]
+
+
+def _with_columns(frame: pd.DataFrame, columns: dict[Any, pd.Series]) -> pd.DataFrame:
+    """Return frame with the given columns replaced, sharing the rest; frame itself if none."""
+    if not columns:
+        return frame
+    replaced = frame.copy(deep=False)
+    for name, column in columns.items():
+        replaced[name] = column
+    return replaced
+
+
+class InvalidFieldsError(ValueError):
+    """Raised for a fields projection naming none of the data's columns.
+
+    Attributes:
+        valid_fields: The columns the data has, sorted
+    """
+
+    def __init__(self, fields: list[str] | tuple[str, ...], valid_fields: list[str]) -> None:
+        """Create the error for the requested fields, listing the valid ones."""
+        super().__init__(f"None of the requested fields exist: {', '.join(fields)}")
+        self.valid_fields = valid_fields
+
+
+def project(data: Any, fields: list[str] | tuple[str, ...] | None) -> Any:
+    """Return data showing only the given columns, in that order.
+
+    data is a view, a DataFrame, a list of row dicts, or a dict of any of those
+    by name. DataFrames become views. Columns some of the data lacks are skipped
+    there, as tables need not share every column; anything else, or any data
+    when fields is None, is returned unchanged.
+
+    Raises:
+        InvalidFieldsError: If the data has columns but none of fields is among them
+    """
+    if fields is None:
+        return data
+    valid = _columns(data)
+    if valid and valid.isdisjoint(fields):
+        raise InvalidFieldsError(fields, sorted(valid, key=str))
+    return _project(data, fields)
+
+
+def _columns(data: Any) -> set[Any]:
+    """Return the columns of every table in data, which project accepts."""
+    if isinstance(data, (pd.DataFrame, TableView)):
+        return set(data.columns)
+    if isinstance(data, dict):
+        return set().union(*(_columns(value) for value in data.values()))
+    if isinstance(data, list):
+        return set().union(*(row.keys() for row in data if isinstance(row, dict)))
+    return set()
+
+
+def _project(data: Any, fields: list[str] | tuple[str, ...]) -> Any:
+    """Return data showing only the given columns; see project."""
+    if isinstance(data, pd.DataFrame):
+        data = TableView(data)
+    if isinstance(data, TableView):
+        return data.project(fields)
+    if isinstance(data, dict):
+        return {name: _project(value, fields) for name, value in data.items()}
+    if isinstance(data, list):
+        # Rows already built (e.g. by a scrape that returned no view) are narrowed row by row
+        names = list(dict.fromkeys(fields))
+        return [{name: row[name] for name in names if name in row} if isinstance(row, dict) else row for row in data]
+    return data
+
+
+class TableView:
+    """Rows of a table selected by position, materialized on demand.
+
+    Attributes:
+        table: The full table the rows are taken from; treat it as read-only
+        positions: Sorted row positions into table, or None for every row
+        fields: The table columns the view shows, in order, or None for every column
+    """
+
+    __slots__ = ("fields", "positions", "table")
+
+    def __init__(self, table: pd.DataFrame, positions: np.ndarray | None = None,
+                 fields: list[str] | None = None) -> None:
+        """Create a view of table's rows at positions (every row if None), showing fields (every column if None)."""
+        self.table = table
+        self.positions = None if positions is None else np.asarray(positions, dtype=np.intp)
+        self.fields = fields
+
+    def __len__(self) -> int:
+        return len(self.table) if self.positions is None else len(self.positions)
+
+    def __sizeof__(self) -> int:
+        # The table belongs to the snapshot; a view only owns its positions
+        return sys.getsizeof(object()) + (0 if self.positions is None else self.positions.nbytes)
+
+    @property
+    def columns(self) -> pd.Index:
+        """Column labels the view shows."""
+        return self.table.columns if self.fields is None else pd.Index(self.fields)
+
+    def project(self, fields: list[str] | tuple[str, ...]) -> TableView:
+        """Return the view showing only the given columns, in that order; columns the table lacks are skipped."""
+        present = set(self.columns)
+        return TableView(self.table, self.positions, list(dict.fromkeys(f for f in fields if f in present)))
+
+    def select(self, positions: np.ndarray) -> TableView:
+        """Return the view of this view's rows at the given positions within it."""
+        positions = np.asarray(positions, dtype=np.intp)
+        return TableView(self.table, positions if self.positions is None else self.positions[positions], self.fields)
+
+    def where(self, mask: np.ndarray | pd.Series) -> TableView:
+        """Return the view of this view's rows where mask, aligned with them, is true."""
+        return self.select(np.flatnonzero(np.asarray(mask, dtype=bool)))
+
+    def position(self, index: int) -> int:
+        """Return the table position of the view's row at index."""
+        return index if self.positions is None else int(self.positions[index])
+
+    def index_after(self, position: int) -> int:
+        """Return the index of the view's first row past table position, in O(log n)."""
+        if self.positions is None:
+            return min(max(position + 1, 0), len(self.table))
+        return int(np.searchsorted(self.positions, position, side="right"))
+
+    def frame(self, start: int = 0, stop: int | None = None, columns: list[str] | None = None) -> pd.DataFrame:
+        """Return rows start:stop of the view as a DataFrame.
+
+        Unfiltered views slice the table itself, which pandas does without
+        copying; filtered views take just the requested rows.
+
+        Args:
+            start: First row of the view to return
+            stop: Row of the view to stop before (defaults to the end)
+            columns: Columns to return, in order (defaults to the view's columns)
+        """
+        rows = slice(start, stop) if self.positions is None else self.positions[start:stop]
+        columns = self.fields if columns is None else columns
+        if columns is not None:
+            return self.table.iloc[rows, self.table.columns.get_indexer(columns)]
+        if self.positions is None:
+            if start == 0 and stop is None:
+                return self.table
+            return self.table.iloc[rows]
+        return self.table.take(rows)
+
+    def column(self, name: str) -> pd.Series:
+        """Return one column of the view."""
+        column = self.table[name]
+        return column if self.positions is None else column.take(self.positions)
+
+    def records(self, start: int = 0, stop: int | None = None,
+                columns: list[str] | None = None) -> list[dict[str, Any]]:
+        """Return rows start:stop of the view as row dicts, with categories decoded; see frame.
+
+        Values are gathered column by column straight from the table's arrays,
+        so only the requested cells are touched and no DataFrame is built.
+        """
+        rows = slice(start, stop) if self.positions is None else self.positions[start:stop]
+        names = list(self.columns) if columns is None else list(columns)
+        values = [column_values(self.table[name], rows) for name in names]
+        return [dict(zip(names, row)) for row in zip(*values)] if values else [{} for _ in range(self._count(rows))]
+
+    def _count(self, rows: slice | np.ndarray) -> int:
+        """Return how many rows a slice or positions array selects."""
+        return len(range(*rows.indices(len(self.table)))) if isinstance(rows, slice) else len(rows)